@@ -1,17 +1,43 @@
+from utlis import log_debug
+
 class MockGameState:
     def __init__(self):
         self.pot = None
         self.board = []
         self.hero_cards = []
+        self.bankrolls = {}
+        self.positions = {}
+        self.captured_at = None
 
     def update_pot(self, pot):
         self.pot = pot
-        print(f"[GameState] Updated Pot: {pot}")
+        log_debug(f"[GameState] Updated Pot: {pot}")
 
     def update_board(self, board):
         self.board = board
-        print(f"[GameState] Updated Board: {board}")
+        log_debug(f"[GameState] Updated Board: {board}")
 
     def update_hero_cards(self, hero_cards):
         self.hero_cards = hero_cards
-        print(f"[GameState] Updated Hero Cards: {hero_cards}")
+        log_debug(f"[GameState] Updated Hero Cards: {hero_cards}")
+
+    def update_bankrolls(self, bankrolls):
+        self.bankrolls = bankrolls
+        log_debug(f"[GameState] Updated Bankrolls: {bankrolls}")
+
+    def update_positions(self, positions):
+        self.positions = positions
+        log_debug(f"[GameState] Updated Positions: {positions}")
+
+    def update_captured_at(self, captured_at):
+        self.captured_at = captured_at
+        log_debug(f"[GameState] Captured At: {captured_at}")
+
+    def apply_state(self, state, captured_at=None):
+        self.update_pot(state["pot"])
+        self.update_board(state["board"])
+        self.update_hero_cards(state["hero_cards"])
+        self.update_bankrolls(state["bankrolls"])
+        self.update_positions(state["positions"])
+        if captured_at is not None:
+            self.update_captured_at(captured_at)
@@ -0,0 +1,235 @@
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from capture import Frame
+from card_templates import RankTemplateIndex
+from color_classifier import ColorClassifier, region_means
+from cards import Board, Hand
+from game_state import GameState
+from preprocess import FramePreprocessor
+from hand_evaluator import evaluate, evaluate_many, load_tables
+from equity import simulate, river_equities
+from equity_tables import EquityTables
+from config import *
+
+# Times every stage of a tick against fixture screenshots, plus the equity and hand
+# evaluation paths, and compares the result with a stored baseline:
+#   python benchmark.py --output baseline.json
+#   python benchmark.py --baseline baseline.json     (exit status 1 on a regression)
+FIELD_FAMILIES = {
+    "pot": ["POT_REGION"],
+    "cards": CARD_RANK_FIELDS,
+    "bankrolls": list(BANK_FIELDS.values()),
+    "vpips": list(VPIP_FIELDS.values()),
+    "actions": list(ACTION_FIELDS.values()),
+    "bets": list(BET_FIELDS.values()),
+}
+SAMPLE_STATE = {
+    "pot": "2",
+    "board": Board.from_labels(["A♠", "K♦", "7♥"]),
+    "hero_cards": Hand.from_labels(["Q♣", "Q♦"]),
+    "bankrolls": {p: "50.00" for p in PLAYERS},
+    "positions": {p: "BTN" for p in PLAYERS},
+}
+
+def measure(fn, runs, warmup=BENCHMARK_WARMUP):
+    for _ in range(warmup):
+        fn()
+    times = np.empty(runs)
+    for i in range(runs):
+        started = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - started
+    # Allocations come from a separate call so tracing does not skew the timings
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times *= 1000
+    return {
+        "runs": runs,
+        "mean_ms": float(times.mean()),
+        "p50_ms": float(np.percentile(times, 50)),
+        "p95_ms": float(np.percentile(times, 95)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "peak_alloc_kb": (peak - before) / 1024,
+        "retained_kb": (current - before) / 1024,
+    }
+
+def _frames(paths):
+    frames = []
+    for path in paths:
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            raise FileNotFoundError(f"Could not read fixture {path}")
+        frames.append(Frame(img, time.time(), origin=SCREEN_REGION[:2]))
+    return frames
+
+def frame_stages(paths):
+    frames = _frames(paths)
+    next_path = itertools.cycle(paths).__next__
+    next_frame = itertools.cycle(frames).__next__
+    stages = {"decode": lambda: cv2.imread(next_path(), cv2.IMREAD_COLOR)}
+
+    preprocessor = FramePreprocessor(REGIONS)
+    def preprocess():
+        # One cold tick of OCR preprocessing: grey conversion and every text field upscaled
+        preprocessor.use_frame(next_frame())
+        preprocessor.text_boxes(TEXT_FIELDS)
+    stages["preprocess"] = preprocess
+
+    def preprocess_per_roi():
+        # The original path, kept for comparison: every region grabbed on its own (a fresh
+        # RGB array, as ImageGrab returned), swapped to BGR, converted to grey and upscaled
+        # 2x. The screen grab itself cannot run here, so its own cost is not included.
+        frame = next_frame()
+        for field in TEXT_FIELDS:
+            img = np.array(frame.roi(REGIONS[field])[:, :, ::-1])
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            cv2.resize(img, (0, 0), fx=2, fy=2)
+    stages["preprocess_per_roi"] = preprocess_per_roi
+
+    classifier = ColorClassifier({**SUIT_PALETTE, "dealer": DEALER_COLOR})
+    color_regions = [REGIONS[f] for f in SUIT_CARD_FIELDS + SUIT_HERO_FIELDS + list(POSITION_FIELDS.values())]
+    stages["suits_and_dealer"] = lambda: classifier.distances(region_means(next_frame(), color_regions))
+
+    rank_index = RankTemplateIndex.load(RANK_TEMPLATES_PATH)
+    if rank_index is not None:
+        rank_regions = [REGIONS[f] for f in CARD_RANK_FIELDS]
+        stages["card_rank_templates"] = lambda: rank_index.classify([next_frame().roi(r) for r in rank_regions])
+
+    stages["state_update"] = lambda: GameState().apply_state(SAMPLE_STATE, time.time())
+    return stages
+
+def ocr_stages(paths):
+    # Needs easyocr and its models; returns (stages, reason skipped)
+    from ocr import OCR
+    from capture import FileFrameSource
+    from scheduler import ScanScheduler
+    try:
+        ocr = OCR(GameState(), frame_source=FileFrameSource(paths))
+    except ImportError as e:
+        return {}, str(e)
+    ocr.warm_up()
+    frames = _frames(paths)
+    next_frame = itertools.cycle(frames).__next__
+    stages = {}
+    for family, fields in FIELD_FAMILIES.items():
+        regions = {f: REGIONS[f] for f in fields}
+        def recognize(regions=regions):
+            ocr.preprocessor.use_frame(next_frame())
+            ocr.recognizer.recognize(ocr.preprocessor, regions, use_cache=False)
+        stages[f"recognize_{family}"] = recognize
+    # Every field seen before: a hash and a lookup each instead of an inference
+    def recognize_cached(regions={f: REGIONS[f] for f in TEXT_FIELDS}):
+        ocr.preprocessor.use_frame(next_frame())
+        ocr.recognizer.recognize(ocr.preprocessor, regions)
+    stages["recognize_cached"] = recognize_cached
+
+    def cold_tick(budget_ms=float("inf")):
+        # Every field changed and due, all read before (so the budget applies); the scan
+        # budget decides how many are read
+        ocr.change_tracker.invalidate()
+        ocr.cache.clear()
+        ocr.scheduler = ScanScheduler(budget_ms=budget_ms)
+        ocr.scheduler.seen.update(ocr.scheduler.order)
+        ocr.process_frame(next_frame())
+    stages["tick_cold"] = cold_tick
+    stages["tick_cold_budgeted"] = lambda: cold_tick(SCAN_BUDGET_MS)
+    # The same frame again: change detection leaves nothing to re-read
+    frame = frames[0]
+    stages["tick_unchanged"] = lambda: ocr.process_frame(frame)
+    return stages, None
+
+def equity_stages():
+    load_tables()
+    rng = np.random.default_rng(0)
+    hands = np.array([rng.choice(52, 7, replace=False) for _ in range(BENCHMARK_HANDS)], dtype=np.int8)
+    singles = itertools.cycle(hands[:1000].tolist()).__next__
+    board = [48, 45, 22, 9, 2]
+    stages = {
+        "hand_evaluate": lambda: evaluate(singles()),
+        f"hand_evaluate_many_{len(hands)}": lambda: evaluate_many(hands),
+        "river_equities": lambda: river_equities(board),
+        f"equity_monte_carlo_{EQUITY_BATCH}": lambda: simulate([51, 47], [], 1, EQUITY_BATCH, 0),
+    }
+    tables = EquityTables.load()
+    if tables is not None:
+        stages["equity_table_lookup"] = lambda: tables.lookup([51, 47], [48, 45, 22], 1)
+    return stages
+
+def run(paths, runs, only=None):
+    stages = frame_stages(paths)
+    ocr, skipped = ocr_stages(paths)
+    stages.update(ocr)
+    stages.update(equity_stages())
+    results = {}
+    for name, fn in stages.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, runs)
+        r = results[name]
+        print(f"{name:32s} p50 {r['p50_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  "
+              f"p99 {r['p99_ms']:9.3f} ms  alloc {r['peak_alloc_kb']:9.1f} KB")
+    if skipped:
+        print(f"OCR stages skipped: {skipped}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "fixtures": list(paths),
+            "runs": runs,
+            "ocr_skipped": skipped,
+            "created": time.time(),
+        },
+        "stages": results,
+    }
+
+def compare(result, baseline, threshold=BENCHMARK_THRESHOLD, metric="p95_ms", min_delta_ms=BENCHMARK_MIN_DELTA_MS):
+    # A stage regresses when it is slower than the baseline by more than threshold
+    # (a fraction) and by more than min_delta_ms, so sub-millisecond noise is ignored
+    regressions = []
+    for name, stats in result["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        new, old = stats[metric], base[metric]
+        change = new / old - 1 if old > 0 else 0.0
+        regressed = change > threshold and new - old > min_delta_ms
+        print(f"{name:32s} {old:9.3f} -> {new:9.3f} ms ({change:+.0%}){'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the OCR, equity and hand evaluation stages")
+    parser.add_argument("fixtures", nargs="*", default=BENCHMARK_FIXTURES, help="fixture screenshots")
+    parser.add_argument("--runs", type=int, default=BENCHMARK_RUNS)
+    parser.add_argument("--only", help="comma separated stage names")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_THRESHOLD)
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    args = parser.parse_args()
+    result = run(args.fixtures, args.runs, args.only.split(",") if args.only else None)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved results to '{args.output}'")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold, args.metric)
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed past {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
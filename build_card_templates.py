@@ -0,0 +1,46 @@
+import csv
+import sys
+import cv2
+import numpy as np
+from card_templates import RankTemplateIndex, normalize_glyph, EMPTY_LABEL
+from capture import Frame
+from cards import RANK_LABELS
+from config import REGIONS, SCREEN_REGION, RANK_TEMPLATES_PATH
+
+# Builds the rank template index from labelled screenshots.
+# Each CSV row is: screenshot path, card field (e.g. BOARD_CARD_3 or HERO_CARD_1), rank.
+# Use "none" as the rank for an empty slot. Board and hero glyphs get separate
+# templates since they are drawn at different sizes.
+def build(rows):
+    samples = {}
+    frames = {}
+    for path, field, rank in rows:
+        rank = rank.strip()
+        if rank not in RANK_LABELS and rank != EMPTY_LABEL:
+            raise ValueError(f"Unknown rank label {rank!r} for {path}:{field}")
+        if path not in frames:
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is None:
+                raise FileNotFoundError(f"Could not read screenshot {path}")
+            frames[path] = Frame(img, 0, origin=SCREEN_REGION[:2])
+        group = "hero" if field.startswith("HERO") else "board"
+        samples.setdefault((rank, group), []).append(normalize_glyph(frames[path].roi(REGIONS[field])))
+
+    labels, templates = [], []
+    for (rank, group), glyphs in sorted(samples.items()):
+        mean = np.mean(glyphs, axis=0)
+        mean -= mean.mean()
+        labels.append(rank)
+        templates.append(mean / max(np.linalg.norm(mean), 1e-6))
+    return RankTemplateIndex(labels, np.stack(templates))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python build_card_templates.py labels.csv [output.npz]")
+        sys.exit(1)
+    output = sys.argv[2] if len(sys.argv) > 2 else RANK_TEMPLATES_PATH
+    with open(sys.argv[1], newline="") as f:
+        rows = [row for row in csv.reader(f) if row and not row[0].startswith("#")]
+    index = build(rows)
+    index.save(output)
+    print(f"Saved {len(index.labels)} rank templates from {len(rows)} samples to '{output}'")
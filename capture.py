@@ -0,0 +1,146 @@
+import json
+import os
+import time
+import cv2
+import numpy as np
+from PIL import ImageGrab
+from config import SCREEN_REGION, RECORDING_INDEX, RECORD_PNG_COMPRESSION
+
+# One BGR capture of SCREEN_REGION; every ROI is a view into it
+class Frame:
+    def __init__(self, image, timestamp, origin=(0, 0), recorded_at=None):
+        self.image = image
+        self.timestamp = timestamp
+        self.origin = origin
+        # Original capture time when the frame is replayed from a recording
+        self.recorded_at = recorded_at
+
+    @property
+    def clock(self):
+        # The time the frame shows, for anything paced by the table rather than by how
+        # fast frames are processed: the recorded time in a replay
+        return self.recorded_at if self.recorded_at is not None else self.timestamp
+
+    def roi(self, region):
+        # Plain slicing, so no pixels are copied
+        x1, y1, x2, y2 = region
+        ox, oy = self.origin
+        return self.image[y1 - oy:y2 - oy, x1 - ox:x2 - ox]
+
+# Grabs the live screen once per call; region None grabs the whole screen
+class ScreenFrameSource:
+    def __init__(self, region=SCREEN_REGION):
+        self.region = region
+
+    def grab(self):
+        timestamp = time.time()
+        img = np.array(ImageGrab.grab(bbox=self.region))
+        # Channels are swapped in place rather than into a second full-frame array
+        cv2.cvtColor(img, cv2.COLOR_RGB2BGR, dst=img)
+        return Frame(img, timestamp, origin=self.region[:2] if self.region else (0, 0))
+
+# Serves frames from image files on disk, e.g. saved screenshots in tests
+class FileFrameSource:
+    def __init__(self, paths, loop=True, origin=SCREEN_REGION[:2]):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = list(paths)
+        self.loop = loop
+        self.origin = origin
+        self.index = 0
+        self._cache = {}
+
+    def grab(self):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return None
+            self.index = 0
+        path = self.paths[self.index]
+        self.index += 1
+        img = self._cache.get(path)
+        if img is None:
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is None:
+                raise FileNotFoundError(f"Could not read frame from {path}")
+            self._cache[path] = img
+        return Frame(img, time.time(), origin=self.origin)
+
+# Writes frames as a numbered PNG sequence plus index.jsonl with each frame's timestamp.
+# A frame identical to the previous one reuses its file instead of writing a new PNG.
+class FrameRecorder:
+    def __init__(self, directory, compression=RECORD_PNG_COMPRESSION):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compression = compression
+        self.count = 0
+        self.files = 0
+        self.previous = None
+        self.index = open(os.path.join(directory, RECORDING_INDEX), "w")
+
+    def write(self, frame):
+        if self.previous is None or not np.array_equal(frame.image, self.previous[1]):
+            name = f"frame_{self.files:06d}.png"
+            cv2.imwrite(os.path.join(self.directory, name), frame.image,
+                        [cv2.IMWRITE_PNG_COMPRESSION, self.compression])
+            self.files += 1
+            self.previous = (name, frame.image.copy())
+        entry = {"frame": self.count, "file": self.previous[0], "timestamp": frame.timestamp,
+                 "origin": list(frame.origin)}
+        self.index.write(json.dumps(entry) + "\n")
+        self.count += 1
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Plays back a FrameRecorder directory, as fast as possible or at the recorded pace
+class ReplayFrameSource:
+    def __init__(self, directory, realtime=False, loop=False):
+        with open(os.path.join(directory, RECORDING_INDEX)) as f:
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        self.directory = directory
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self._clock = None
+        self._last = (None, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def grab(self):
+        if self.index >= len(self.entries):
+            if not self.loop:
+                return None
+            self.index = 0
+            self._clock = None
+        entry = self.entries[self.index]
+        self.index += 1
+        if self.realtime:
+            if self._clock is None:
+                self._clock = (time.perf_counter(), entry["timestamp"])
+            else:
+                started, first = self._clock
+                delay = (entry["timestamp"] - first) - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        path = os.path.join(self.directory, entry["file"])
+        if path != self._last[0]:
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is None:
+                raise FileNotFoundError(f"Could not read frame from {path}")
+            self._last = (path, img)
+        return Frame(self._last[1], time.time(), tuple(entry["origin"]), recorded_at=entry["timestamp"])
+
+def open_frame_source(paths=(), realtime=False, loop=False):
+    # A recording directory, image files, or the live screen when nothing is given
+    if not paths:
+        return ScreenFrameSource()
+    if len(paths) == 1 and os.path.isdir(paths[0]):
+        return ReplayFrameSource(paths[0], realtime=realtime, loop=loop)
+    return FileFrameSource(paths, loop=loop)
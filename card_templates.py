@@ -0,0 +1,43 @@
+import os
+import cv2
+import numpy as np
+
+# Templates are stored and matched by rank label (cards.RANK_LABELS), never by index
+EMPTY_LABEL = "none"  # template for an empty card slot
+TEMPLATE_SIZE = (24, 32)  # (width, height) every glyph is resampled to
+
+def normalize_glyph(roi):
+    # Grey, fixed size, zero mean and unit norm, so a dot product is a normalized correlation
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+    glyph = cv2.resize(gray, TEMPLATE_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    glyph -= glyph.mean()
+    norm = np.linalg.norm(glyph)
+    return glyph / norm if norm > 0 else glyph
+
+# Classifies rank glyphs against a precomputed template index in a single matrix product
+class RankTemplateIndex:
+    def __init__(self, labels, templates):
+        self.labels = list(labels)
+        self.templates = np.asarray(templates, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if tuple(data["size"]) != TEMPLATE_SIZE:
+                return None
+            return cls(data["labels"].tolist(), data["templates"])
+
+    def save(self, path):
+        np.savez_compressed(path, labels=np.array(self.labels), templates=self.templates,
+                            size=np.array(TEMPLATE_SIZE))
+
+    def classify(self, rois):
+        # Returns the best label and its correlation score for each roi
+        if not rois:
+            return [], np.zeros(0, dtype=np.float32)
+        glyphs = np.stack([normalize_glyph(roi) for roi in rois])
+        scores = glyphs @ self.templates.T
+        best = scores.argmax(axis=1)
+        return [self.labels[i] for i in best], scores[np.arange(len(rois)), best]
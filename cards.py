@@ -0,0 +1,200 @@
+import functools
+from itertools import combinations, permutations
+import numpy as np
+
+# Compact card encoding shared by the evaluator and equity code:
+# a card is an int 0..51 equal to rank * 4 + suit, with ranks 0..12 for 2..A
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+SUIT_SYMBOLS = "♣♦♥♠"  # same order as SUITS, as produced by the OCR suit palette
+
+def make_card(rank, suit):
+    return rank * 4 + suit
+
+def card_rank(card):
+    return card >> 2
+
+def card_suit(card):
+    return card & 3
+
+def parse_rank(text):
+    text = text.strip().upper()
+    if text == "10":
+        return RANKS.index("T")
+    return RANKS.index(text)
+
+def parse_suit(text):
+    if text in SUIT_SYMBOLS:
+        return SUIT_SYMBOLS.index(text)
+    return SUITS.index(text.lower())
+
+def parse_card(text):
+    # Accepts "As", "Td", "10♦", "Q♥"
+    text = text.strip()
+    return make_card(parse_rank(text[:-1]), parse_suit(text[-1]))
+
+def parse_cards(cards):
+    # A list of card strings or ints, a CardSet, or one string like "AsKd" / "As Kd"
+    if isinstance(cards, CardSet):
+        return list(cards.cards)
+    if isinstance(cards, str):
+        text = cards.replace(",", " ").replace("10", "T")
+        text = "".join(text.split())
+        return [parse_card(text[i:i + 2]) for i in range(0, len(text), 2)]
+    return [c if isinstance(c, int) else parse_card(c) for c in cards]
+
+def card_str(card):
+    return RANKS[card_rank(card)] + SUITS[card_suit(card)]
+
+# ---------------------------------------------------------------------------#
+# Card types
+
+# Ranks and suits as the OCR reads them ("10", "♦"); a label is the two joined ("10♦")
+RANK_LABELS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+CARD_NAMES = [card_str(c) for c in range(52)]
+CARD_LABELS = [RANK_LABELS[card_rank(c)] + SUIT_SYMBOLS[card_suit(c)] for c in range(52)]
+
+# A card int that knows its rank, suit and mask. The 52 instances are built once
+# (CARDS) and shared, so converting OCR output is a dict lookup, not an allocation.
+class Card(int):
+    __slots__ = ()
+
+    @property
+    def rank(self):
+        return self >> 2
+
+    @property
+    def suit(self):
+        return self & 3
+
+    @property
+    def mask(self):
+        return 1 << self
+
+    @property
+    def label(self):
+        return CARD_LABELS[self]
+
+    def __str__(self):
+        return CARD_NAMES[self]
+
+    def __repr__(self):
+        return f"Card({CARD_NAMES[self]})"
+
+CARDS = tuple(Card(c) for c in range(52))
+LABEL_CARDS = {(RANK_LABELS[c.rank], SUIT_SYMBOLS[c.suit]): c for c in CARDS}
+
+def card_from_label(rank, suit):
+    # OCR rank and suit labels to a Card, None if either is not one
+    return LABEL_CARDS.get((rank, suit))
+
+# An ordered run of cards plus their 64-bit mask (bit c set for card c). Equal card
+# tuples compare and hash equal, so sets can be diffed and debounced directly.
+class CardSet:
+    __slots__ = ("cards", "mask")
+
+    def __init__(self, cards=()):
+        self.cards = tuple(CARDS[c] for c in cards)
+        mask = 0
+        for c in self.cards:
+            mask |= 1 << c
+        self.mask = mask
+
+    @classmethod
+    def from_labels(cls, labels):
+        return cls(parse_cards(labels))
+
+    @property
+    def valid(self):
+        # No card appears twice
+        return self.mask.bit_count() == len(self.cards)
+
+    def labels(self):
+        return [CARD_LABELS[c] for c in self.cards]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __contains__(self, card):
+        return bool(self.mask >> card & 1)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.cards == other.cards
+
+    def __hash__(self):
+        return hash(self.cards)
+
+    def __str__(self):
+        return " ".join(CARD_NAMES[c] for c in self.cards)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self)!r})"
+
+class Hand(CardSet):
+    __slots__ = ()
+
+class Board(CardSet):
+    __slots__ = ()
+
+EMPTY_HAND = Hand()
+EMPTY_BOARD = Board()
+
+# The 1326 two-card hands, as (low card, high card), and their index
+HOLE_COMBOS = list(combinations(range(52), 2))
+COMBO_INDEX = {combo: i for i, combo in enumerate(HOLE_COMBOS)}
+
+def combo_index(c1, c2):
+    return COMBO_INDEX[(c1, c2) if c1 < c2 else (c2, c1)]
+
+# The 169 starting-hand classes on the usual 13x13 grid: AA top left, suited above the
+# diagonal, offsuit below it
+def hand_class(c1, c2):
+    hi, lo = max(card_rank(c1), card_rank(c2)), min(card_rank(c1), card_rank(c2))
+    i, j = 12 - hi, 12 - lo
+    if card_suit(c1) == card_suit(c2) and hi != lo:
+        return i * 13 + j
+    return j * 13 + i
+
+def hand_class_name(index):
+    i, j = divmod(index, 13)
+    if i == j:
+        return RANKS[12 - i] * 2
+    if i < j:
+        return RANKS[12 - i] + RANKS[12 - j] + "s"
+    return RANKS[12 - j] + RANKS[12 - i] + "o"
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+def canonical_board(board):
+    # Suit-isomorphic representative of a board: the suit relabelling giving the smallest
+    # sorted card tuple. Returns (canonical cards, perm) where perm[old_suit] = new_suit.
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        mapped = tuple(sorted(make_card(card_rank(c), perm[card_suit(c)]) for c in board))
+        if best is None or mapped < best[0]:
+            best = (mapped, perm)
+    return best
+
+def remap_suits(cards, perm):
+    return [make_card(card_rank(c), perm[card_suit(c)]) for c in cards]
+
+def canonical_runout(board):
+    # Like canonical_board, but only the flop is unordered; turn and river keep their place
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        mapped = remap_suits(board, perm)
+        mapped = tuple(sorted(mapped[:3])) + tuple(mapped[3:])
+        if best is None or mapped < best[0]:
+            best = (mapped, perm)
+    return best
+
+@functools.lru_cache(maxsize=24)
+def remap_combos(perm):
+    # Index of every combo after relabelling its suits with perm
+    return np.array([combo_index(*remap_suits(combo, perm)) for combo in HOLE_COMBOS])
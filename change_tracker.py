@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+from config import CHANGE_TOLERANCE, CHANGE_MIN_PIXELS
+
+# Remembers a cheap fingerprint of each region so unchanged regions can skip OCR
+class RegionChangeTracker:
+    def __init__(self, tolerance=CHANGE_TOLERANCE, min_pixels=CHANGE_MIN_PIXELS):
+        self.tolerance = tolerance
+        self.min_pixels = min_pixels
+        self.fingerprints = {}
+        self.dirty_count = 0
+        self.clean_count = 0
+        self.total_dirty = 0
+        self.total_clean = 0
+
+    def fingerprint(self, roi):
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        return cv2.resize(gray, (0, 0), fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def is_changed(self, previous, current):
+        if previous is None or previous.shape != current.shape:
+            return True
+        return np.count_nonzero(np.abs(current - previous) > self.tolerance) > self.min_pixels
+
+    def update(self, frame, fields):
+        # fields maps a field name to its region; returns the names whose pixels changed
+        dirty = []
+        for name, region in fields.items():
+            current = self.fingerprint(frame.roi(region))
+            if self.is_changed(self.fingerprints.get(name), current):
+                self.fingerprints[name] = current
+                dirty.append(name)
+        self.dirty_count = len(dirty)
+        self.clean_count = len(fields) - len(dirty)
+        self.total_dirty += self.dirty_count
+        self.total_clean += self.clean_count
+        return dirty
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.fingerprints.clear()
+        else:
+            self.fingerprints.pop(name, None)
+
+    def stats(self):
+        return {"dirty": self.dirty_count, "clean": self.clean_count,
+                "total_dirty": self.total_dirty, "total_clean": self.total_clean}
@@ -0,0 +1,26 @@
+import numpy as np
+
+def region_means(frame, regions):
+    # Mean BGR color of every region, each from its own view of the frame. The suit and
+    # button regions are small and spread over the whole table, so a summed-area table
+    # of the frame (or of their bounding box) costs more than it saves.
+    h, w = frame.image.shape[:2]
+    ox, oy = frame.origin
+    means = np.zeros((len(regions), 3))
+    for i, (x1, y1, x2, y2) in enumerate(regions):
+        x1, x2 = min(max(x1 - ox, 0), w), min(max(x2 - ox, 0), w)
+        y1, y2 = min(max(y1 - oy, 0), h), min(max(y2 - oy, 0), h)
+        if x2 > x1 and y2 > y1:
+            means[i] = frame.image[y1:y2, x1:x2].reshape(-1, 3).mean(axis=0)
+    return means
+
+# Nearest-reference-color classifier over a palette of label -> BGR color
+class ColorClassifier:
+    def __init__(self, palette):
+        self.labels = list(palette)
+        self.colors = np.array([palette[label] for label in self.labels], dtype=np.float64)
+
+    def distances(self, means):
+        # (regions, palette) matrix of euclidean color distances
+        diff = np.asarray(means, dtype=np.float64)[:, None, :] - self.colors[None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=2))
@@ -70,3 +70,203 @@ ACTION_4=(287, 115, 344, 134)
 ACTION_5=(506, 117, 566, 134)
 ACTION_6=(729, 230, 792, 247)
 ACTION_7=(652, 477, 708, 491)
+
+# Seat names, in table order starting from hero
+PLAYERS = ["Hero", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6", "Player 7"]
+
+# Named region groups, keyed the same way as the constants above
+BOARD_CARD_FIELDS = ["BOARD_CARD_1", "BOARD_CARD_2", "BOARD_CARD_3", "BOARD_CARD_4", "BOARD_CARD_5"]
+SUIT_CARD_FIELDS = ["SUIT_CARD_1", "SUIT_CARD_2", "SUIT_CARD_3", "SUIT_CARD_4", "SUIT_CARD_5"]
+HERO_CARD_FIELDS = ["HERO_CARD_1", "HERO_CARD_2"]
+SUIT_HERO_FIELDS = ["SUIT_HERO_1", "SUIT_HERO_2"]
+BANK_FIELDS = dict(zip(PLAYERS, ["BANK_HERO", "BANK_PLAYER_2", "BANK_PLAYER_3", "BANK_PLAYER_4",
+                                 "BANK_PLAYER_5", "BANK_PLAYER_6", "BANK_PLAYER_7"]))
+VPIP_FIELDS = dict(zip(PLAYERS, ["VPIP_HERO", "VPIP_PLAYER_2", "VPIP_PLAYER_3", "VPIP_PLAYER_4",
+                                 "VPIP_PLAYER_5", "VPIP_PLAYER_6", "VPIP_PLAYER_7"]))
+POSITION_FIELDS = dict(zip(PLAYERS, ["POSITION_HERO", "POSITION_PLAYER_2", "POSITION_PLAYER_3", "POSITION_PLAYER_4",
+                                     "POSITION_PLAYER_5", "POSITION_PLAYER_6", "POSITION_PLAYER_7"]))
+BET_FIELDS = dict(zip(PLAYERS, ["BET_AMOUNT_HERO", "BET_AMOUNT_2", "BET_AMOUNT_3", "BET_AMOUNT_4",
+                                "BET_AMOUNT_5", "BET_AMOUNT_6", "BET_AMOUNT_7"]))
+ACTION_FIELDS = dict(zip(PLAYERS, ["ACTION_HERO", "ACTION_2", "ACTION_3", "ACTION_4",
+                                   "ACTION_5", "ACTION_6", "ACTION_7"]))
+
+# Every named region inside SCREEN_REGION, keyed by constant name
+REGIONS = {
+    name: globals()[name]
+    for name in ["POT_REGION"] + BOARD_CARD_FIELDS + SUIT_CARD_FIELDS + HERO_CARD_FIELDS + SUIT_HERO_FIELDS
+    + list(BANK_FIELDS.values()) + list(VPIP_FIELDS.values()) + list(POSITION_FIELDS.values())
+    + list(BET_FIELDS.values()) + list(ACTION_FIELDS.values())
+}
+
+# Regions read as text by the recognizer (the rest are classified by color)
+TEXT_FIELDS = (["POT_REGION"] + BOARD_CARD_FIELDS + HERO_CARD_FIELDS + list(BANK_FIELDS.values())
+               + list(VPIP_FIELDS.values()) + list(BET_FIELDS.values()) + list(ACTION_FIELDS.values()))
+
+# Batched recognition: crops are upscaled by OCR_SCALE and fed OCR_BATCH_SIZE at a time
+OCR_SCALE = 2
+OCR_BATCH_SIZE = 16
+# Per-family upscale, by field name prefix (others use OCR_SCALE). Board card crops are
+# 46 px tall, so 1.5x already exceeds the recognizer's 64 px input; hero cards (~30 px)
+# keep OCR_SCALE. Upscaled crops are packed into one canvas OCR_CANVAS_WIDTH pixels wide
+# (see preprocess.py).
+OCR_FIELD_SCALES = {"BOARD_CARD_": 1.5}
+OCR_CANVAS_WIDTH = 1024
+# Recognition cache (ocr_cache.py): text per binarized crop, the OCR_CACHE_SIZE most
+# recently used kept, saved to OCR_CACHE_PATH on exit (None keeps it in memory only)
+OCR_CACHE_SIZE = 4096
+OCR_CACHE_PATH = "ocr_cache.json"
+
+# Layout calibration (layout.py): grey crops of fixed parts of the reference window are
+# located on the screen by template matching over CALIBRATION_SCALES (searched at
+# CALIBRATION_DOWNSAMPLE resolution, then refined). Build them from a screenshot of the
+# window at SCREEN_REGION with "python layout.py build reference.png". While running,
+# the anchors are re-checked every CALIBRATION_CHECK_EVERY ticks.
+CALIBRATION_ANCHORS = {
+    "jackpot_logo": (12, 42, 88, 74),
+    "pot_label": (395, 236, 440, 250),
+    "window_controls": (625, 4, 850, 30),
+}
+CALIBRATION_ANCHORS_PATH = "layout_anchors.npz"
+CALIBRATION_SCALES = [0.5 + 0.05 * i for i in range(21)]
+CALIBRATION_DOWNSAMPLE = 0.5
+CALIBRATION_THRESHOLD = 0.8
+CALIBRATION_CHECK_EVERY = 5
+CALIBRATION_RETRY_SECONDS = 2.0
+
+# Scan scheduler (scheduler.py): every field family is read on its own policy.
+#   priority:      lower families are recognized first within the tick's budget
+#   interval:      seconds between checks (0 = every tick)
+#   hot_interval:  the interval while hero's turn is near, i.e. one of the SCAN_HOT_SEATS
+#                  seats before hero acted within the last SCAN_HOT_SECONDS
+#   until:         a card read holds until the next "street" (per board slot) or "hand"
+#                  (the dealer button moves), apart from a pixel check every `recheck` s
+# Changed fields are recognized while their estimated cost fits SCAN_BUDGET_MS per tick
+# (SCAN_DEFAULT_COST_MS until measured); the rest are skipped and stay due.
+SCAN_FAMILIES = {
+    "pot": ["POT_REGION"],
+    "actions": list(ACTION_FIELDS.values()),
+    "bets": list(BET_FIELDS.values()),
+    "hero_cards": HERO_CARD_FIELDS,
+    "board": BOARD_CARD_FIELDS,
+    "bankrolls": list(BANK_FIELDS.values()),
+    "vpips": list(VPIP_FIELDS.values()),
+}
+SCAN_POLICIES = {
+    "pot": {"priority": 0, "interval": 0.5, "hot_interval": 0.0},
+    "actions": {"priority": 0, "interval": 0.5, "hot_interval": 0.0},
+    "bets": {"priority": 0, "interval": 0.5, "hot_interval": 0.0},
+    "hero_cards": {"priority": 1, "interval": 0.0, "until": "hand", "recheck": 2.0},
+    "board": {"priority": 1, "interval": 0.0, "until": "street", "recheck": 2.0},
+    "bankrolls": {"priority": 2, "interval": 5.0},
+    "vpips": {"priority": 3, "interval": 30.0},
+}
+SCAN_BUDGET_MS = 120
+SCAN_DEFAULT_COST_MS = 10
+SCAN_HOT_SEATS = 2
+SCAN_HOT_SECONDS = 3.0
+
+# Multi-table mode (tables.py): every table is the REGIONS layout placed at a window
+# offset and scale. All tables share one model through RECOGNIZER_WORKERS threads.
+TABLES = {
+    "table1": {"offset": (0, 0), "scale": 1.0},
+}
+RECOGNIZER_WORKERS = 2
+
+# Change detection: a region is re-read only when more than CHANGE_MIN_PIXELS of its
+# half-resolution fingerprint differ by over CHANGE_TOLERANCE grey levels
+CHANGE_TOLERANCE = 24
+CHANGE_MIN_PIXELS = 2
+
+# Card rank template matching (build the index with build_card_templates.py)
+RANK_TEMPLATES_PATH = "rank_templates.npz"
+RANK_MATCH_THRESHOLD = 0.75
+CARD_RANK_FIELDS = BOARD_CARD_FIELDS + HERO_CARD_FIELDS
+
+# Reference colors (BGR) for suit and dealer button classification
+SUIT_PALETTE = {
+    '♣': (27, 108, 27),
+    '♥': (21, 82, 145),
+    '♦': (162, 32, 33),
+    '♠': (41, 43, 41),
+}
+DEALER_COLOR = (99, 182, 231)
+
+# Hand evaluator lookup tables, built on first use and cached here
+HAND_TABLES_PATH = "hand_tables.npz"
+
+# Monte Carlo equity: stop at EQUITY_SAMPLES runouts or EQUITY_TIME_BUDGET seconds,
+# whichever comes first (None disables the time limit). 0 workers = one per CPU core.
+EQUITY_SAMPLES = 50000
+EQUITY_TIME_BUDGET = 0.25
+EQUITY_WORKERS = 0
+EQUITY_BATCH = 4096
+
+# Precomputed preflop/flop equity tables (build with equity_tables.py)
+EQUITY_TABLES_PATH = "equity_tables.bin"
+
+# Range-vs-range equity (ranges.py): boards with more than RANGE_RUNOUT_SAMPLES runouts
+# are sampled; the RANGE_CACHE_SIZE most recent board matrices (~7 MB each) are kept.
+# VILLAIN_RANGE is the range advice assumes when nothing better is known.
+RANGE_RUNOUT_SAMPLES = 200
+RANGE_CACHE_SIZE = 8
+VILLAIN_RANGE = "22+, A2s+, K9s+, Q9s+, J9s+, T8s+, 97s+, 86s+, 75s+, 65s, 54s, A9o+, KTo+, QTo+, JTo"
+
+# Subgame solver bet abstraction, as fractions of the pot (all-in is always available)
+SOLVER_BET_SIZES = [0.5, 1.0]
+SOLVER_RAISE_SIZES = [1.0]
+SOLVER_MAX_RAISES = 2
+SOLVER_ITERATIONS = 300
+
+# Solved strategies served at table speed (build with strategy_store.py). Spots are keyed
+# by the subgame's stack-to-pot ratio bucketed at these edges, so a strategy solved for
+# one SPR is not served for a very different one.
+STRATEGY_STORE_PATH = "strategies.bin"
+STRATEGY_SPR_BUCKETS = [0.5, 1, 2, 4, 8]
+
+# Capture -> recognize -> publish pipeline: a frame is grabbed every CAPTURE_INTERVAL
+# seconds and each stage queue keeps only the newest PIPELINE_QUEUE_SIZE items
+CAPTURE_INTERVAL = 0.2
+PIPELINE_QUEUE_SIZE = 1
+PIPELINE_STATS_WINDOW = 200
+PIPELINE_REPORT_INTERVAL = 30
+
+# Frame recordings (replay.py): PNG sequence plus an index of capture timestamps
+RECORDING_INDEX = "index.jsonl"
+RECORD_PNG_COMPRESSION = 3
+
+# benchmark.py: a stage regresses when its p95 grows by more than BENCHMARK_THRESHOLD
+# (a fraction of the baseline) and by more than BENCHMARK_MIN_DELTA_MS
+BENCHMARK_FIXTURES = ["debug_overlay.png"]
+BENCHMARK_RUNS = 50
+BENCHMARK_WARMUP = 3
+BENCHMARK_HANDS = 100000
+BENCHMARK_THRESHOLD = 0.25
+BENCHMARK_MIN_DELTA_MS = 0.05
+
+# Hot-path instrumentation (instrumentation.py). Disabled it costs one attribute check
+# per call; enabled, metrics are logged and written as JSON and Prometheus text every
+# METRICS_EXPORT_INTERVAL seconds. Histogram buckets are in seconds.
+INSTRUMENTATION_ENABLED = False
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+METRICS_EXPORT_INTERVAL = 15
+METRICS_JSON_PATH = "metrics.json"
+METRICS_PROM_PATH = "metrics.prom"
+
+# GUI refresh: the window checks the GameState version every GUI_POLL_MS milliseconds
+GUI_POLL_MS = 100
+
+# Hand tracking: a read must repeat on HAND_DEBOUNCE_FRAMES consecutive frames to count.
+# The hand-history log is written every HAND_LOG_BATCH events or HAND_LOG_FLUSH_SECONDS,
+# and fsynced at most every HAND_LOG_FSYNC_SECONDS.
+HAND_DEBOUNCE_FRAMES = 2
+HAND_LOG_PATH = "hand_history.jsonl"
+HAND_LOG_BATCH = 64
+HAND_LOG_FLUSH_SECONDS = 2.0
+HAND_LOG_FSYNC_SECONDS = 10.0
+
+# Opponent stats (player_stats.py): finished hands are written every STATS_BATCH_HANDS
+# hands, per session and seat; the STATS_CACHE_SIZE most recently looked-up seats stay
+# in memory
+PLAYER_STATS_PATH = "player_stats.db"
+STATS_BATCH_HANDS = 50
+STATS_CACHE_SIZE = 256
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from cards import HOLE_COMBOS
+from hand_evaluator import evaluate_many
+from config import EQUITY_SAMPLES, EQUITY_TIME_BUDGET, EQUITY_WORKERS, EQUITY_BATCH
+
+COMBOS = np.array(HOLE_COMBOS, dtype=np.int8)
+# CARD_COMBOS[c] lists the 51 combo indices that contain card c
+CARD_COMBOS = np.array([[i for i, combo in enumerate(HOLE_COMBOS) if c in combo] for c in range(52)])
+# The pool starts lazily, from whichever thread first asks for equity, while the GUI,
+# pipeline and torch threads run. A forked worker could inherit one of their locks held,
+# so workers come from a fork server (or are spawned where there is none, e.g. Windows).
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+class EquityResult:
+    def __init__(self, equity, low, high, samples, tabulated=False):
+        self.equity = equity
+        self.low = low
+        self.high = high
+        self.samples = samples
+        # Read from precomputed tables (equity_tables.py); exact entries have low == high
+        self.tabulated = tabulated
+
+    @classmethod
+    def from_table(cls, equity, half_width=0.0, samples=None):
+        # half_width is the 95% interval the table stored for a simulated entry, 0 if exact
+        return cls(equity, max(equity - half_width, 0.0), min(equity + half_width, 1.0), samples, tabulated=True)
+
+    @property
+    def exact(self):
+        return self.low == self.high
+
+    def __repr__(self):
+        if self.tabulated and self.exact:
+            return f"EquityResult({self.equity:.4f}, tabulated, exact)"
+        return f"EquityResult({self.equity:.4f}, 95% CI [{self.low:.4f}, {self.high:.4f}], n={self.samples})"
+
+def simulate(hero, board, opponents, samples, seed, time_budget=None, batch=EQUITY_BATCH):
+    # Runs in a worker: returns (sum of hero's pot shares, sum of squares, runouts played)
+    rng = np.random.default_rng(seed)
+    dead = set(hero) | set(board)
+    deck = np.array([c for c in range(52) if c not in dead], dtype=np.int8)
+    missing = 5 - len(board)
+    hero = np.array(hero, dtype=np.int8)
+    board = np.array(board, dtype=np.int8)
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    total = total_sq = 0.0
+    played = 0
+    while played < samples and (deadline is None or time.perf_counter() < deadline):
+        n = min(batch, samples - played)
+        draws = rng.permuted(np.broadcast_to(deck, (n, len(deck))), axis=1)
+        full_board = np.concatenate([np.broadcast_to(board, (n, len(board))), draws[:, :missing]], axis=1)
+        hero_values = evaluate_many(np.concatenate([np.broadcast_to(hero, (n, 2)), full_board], axis=1))
+        opp_values = np.stack([
+            evaluate_many(np.concatenate([draws[:, missing + 2 * i:missing + 2 * i + 2], full_board], axis=1))
+            for i in range(opponents)
+        ], axis=1)
+        best = opp_values.max(axis=1)
+        tied = (opp_values == hero_values[:, None]).sum(axis=1)
+        share = np.where(hero_values > best, 1.0, np.where(hero_values == best, 1.0 / (tied + 1), 0.0))
+        total += share.sum()
+        total_sq += (share ** 2).sum()
+        played += n
+    return total, total_sq, played
+
+def river_equities(board):
+    # Exact equity of every combo against one random hand on a complete 5-card board.
+    # Wins and ties are counted over all live combos, then the ones sharing a card with
+    # the hero combo are removed per card, so no 1326 x 1326 matrix is needed.
+    board = np.asarray(board, dtype=np.int8)
+    live = ~np.isin(COMBOS, board).any(axis=1)
+    values = np.full(len(COMBOS), np.iinfo(np.int32).max, dtype=np.int64)
+    values[live] = evaluate_many(np.concatenate([COMBOS[live], np.broadcast_to(board, (live.sum(), 5))], axis=1))
+    hand_values = values[live]
+
+    ordered = np.sort(hand_values)
+    below = np.searchsorted(ordered, hand_values, side="left")
+    equal = np.searchsorted(ordered, hand_values, side="right") - below
+
+    # Same counts restricted to the combos holding each card, via one flattened search
+    per_card = np.sort(values[CARD_COMBOS], axis=1)
+    width = per_card.shape[1]
+    offset = np.int64(1 << 40)
+    flat = (per_card + np.arange(52)[:, None] * offset).ravel()
+    card_below, card_equal, card_live = [], [], []
+    for column in (0, 1):
+        cards = COMBOS[live, column].astype(np.int64)
+        query = hand_values + cards * offset
+        lo = np.searchsorted(flat, query, side="left") - cards * width
+        hi = np.searchsorted(flat, query, side="right") - cards * width
+        card_below.append(lo)
+        card_equal.append(hi - lo)
+        card_live.append(np.searchsorted(flat, cards * offset + np.iinfo(np.int32).max, side="left") - cards * width)
+
+    # The hero combo itself sits in both card groups, hence the +1 corrections
+    wins = below - card_below[0] - card_below[1]
+    ties = equal - card_equal[0] - card_equal[1] + 1
+    opponents = len(hand_values) - card_live[0] - card_live[1] + 1
+    equities = np.full(len(COMBOS), np.nan)
+    equities[live] = (wins + 0.5 * ties) / opponents
+    return equities
+
+# Hero equity against random opponent hands, spread over a process pool
+class EquityEngine:
+    def __init__(self, workers=EQUITY_WORKERS, samples=EQUITY_SAMPLES, time_budget=EQUITY_TIME_BUDGET):
+        self.workers = workers or os.cpu_count() or 1
+        self.samples = samples
+        self.time_budget = time_budget
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(START_METHOD))
+        return self._pool
+
+    def equity(self, hero, board, opponents, samples=None, time_budget=None, seed=None):
+        # hero and board are card ints; with a seed and no time budget the result is reproducible
+        samples = samples or self.samples
+        time_budget = self.time_budget if time_budget is None else time_budget
+        if len(hero) != 2 or len(board) > 5 or not 1 <= opponents <= (50 - len(board)) // 2:
+            raise ValueError(f"Cannot simulate {len(hero)} hero cards, {len(board)} board cards, {opponents} opponents")
+        seeds = np.random.SeedSequence(seed).spawn(self.workers)
+        shares = [samples // self.workers + (i < samples % self.workers) for i in range(self.workers)]
+        jobs = [(list(hero), list(board), opponents, n, s, time_budget) for n, s in zip(shares, seeds) if n]
+        if len(jobs) == 1:
+            results = [simulate(*jobs[0])]
+        else:
+            results = list(self._executor().map(simulate, *zip(*jobs)))
+        total = sum(r[0] for r in results)
+        total_sq = sum(r[1] for r in results)
+        played = sum(r[2] for r in results)
+        mean = total / played
+        half_width = 1.96 * np.sqrt(max(total_sq / played - mean ** 2, 0.0) / played)
+        return EquityResult(mean, max(mean - half_width, 0.0), min(mean + half_width, 1.0), played)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
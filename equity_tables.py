@@ -0,0 +1,219 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import numpy as np
+from cards import HOLE_COMBOS, combo_index, hand_class, canonical_board, remap_suits
+from equity import COMBOS, EquityEngine, EquityResult, river_equities
+from hand_evaluator import evaluate_many
+from config import EQUITY_TABLES_PATH
+
+# Binary layout, little endian, every section 8-byte aligned:
+#   magic (8 bytes) | header int32[6]: classes, max opponents, flops, combos,
+#                     runouts per preflop vs random entry, runouts per class matchup
+#   preflop_vs_random    float32[max opponents, 169]   equity of a class vs N random hands
+#   preflop_vs_random_ci float32[max opponents, 169]   its 95% half-width (simulated)
+#   preflop_vs_hand      float32[169, 169]             class vs class, averaged over their combos
+#   preflop_vs_hand_ci   float32[169, 169]             its 95% half-width (simulated)
+#   flop_index           int32[52 ** 3]                canonical flop key -> row, or -1
+#   flop_equity          float32[flops, 1326]          combo vs one random hand, NaN if blocked (exact)
+# A canonical flop key is c0 * 2704 + c1 * 52 + c2 over its sorted canonical cards.
+MAGIC = b"PKEQTBL2"
+HEADER_SIZE = 8 + 6 * 4
+N_CLASSES = 169
+N_COMBOS = len(HOLE_COMBOS)
+COMBO_CLASSES = np.array([hand_class(*combo) for combo in HOLE_COMBOS])
+
+def flop_key(cards):
+    c0, c1, c2 = cards
+    return c0 * 2704 + c1 * 52 + c2
+
+def canonical_flops():
+    return sorted({canonical_board(flop)[0] for flop in combinations(range(52), 3)})
+
+def class_combos():
+    combos = [[] for _ in range(N_CLASSES)]
+    for combo in HOLE_COMBOS:
+        combos[hand_class(*combo)].append(combo)
+    return [np.array(c, dtype=np.int8) for c in combos]
+
+def _section_sizes(max_opponents, n_flops):
+    return [
+        ("preflop_vs_random", np.float32, (max_opponents, N_CLASSES)),
+        ("preflop_vs_random_ci", np.float32, (max_opponents, N_CLASSES)),
+        ("preflop_vs_hand", np.float32, (N_CLASSES, N_CLASSES)),
+        ("preflop_vs_hand_ci", np.float32, (N_CLASSES, N_CLASSES)),
+        ("flop_index", np.int32, (52 ** 3,)),
+        ("flop_equity", np.float32, (n_flops, N_COMBOS)),
+    ]
+
+def _sections(max_opponents, n_flops):
+    offset = HEADER_SIZE + (-HEADER_SIZE % 8)
+    for name, dtype, shape in _section_sizes(max_opponents, n_flops):
+        yield name, dtype, shape, offset
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += size + (-size % 8)
+
+# ---------------------------------------------------------------------------#
+# Builder
+
+def _class_vs_class(args):
+    # Simulated: returns (equity, 95% half-width) over `samples` deals
+    a, b, samples, seed = args
+    rng = np.random.default_rng(seed)
+    hands_a = a[rng.integers(len(a), size=samples)]
+    hands_b = b[rng.integers(len(b), size=samples)]
+    clash = (hands_a[:, :, None] == hands_b[:, None, :]).any(axis=(1, 2))
+    hands_a, hands_b = hands_a[~clash], hands_b[~clash]
+    rows = np.arange(len(hands_a))[:, None]
+    keys = rng.random((len(hands_a), 52))
+    keys[rows, hands_a] = 2.0
+    keys[rows, hands_b] = 2.0
+    board = np.argpartition(keys, 5, axis=1)[:, :5]
+    va = evaluate_many(np.concatenate([hands_a, board], axis=1))
+    vb = evaluate_many(np.concatenate([hands_b, board], axis=1))
+    share = (va > vb) + 0.5 * (va == vb)
+    return float(share.mean()), float(1.96 * share.std() / np.sqrt(len(share)))
+
+def _flop_row(flop):
+    # Exact: every turn and river, and on each river every live opponent combo
+    total = np.zeros(N_COMBOS)
+    count = np.zeros(N_COMBOS)
+    deck = [c for c in range(52) if c not in flop]
+    for turn, river in combinations(deck, 2):
+        equities = river_equities(list(flop) + [turn, river])
+        live = ~np.isnan(equities)
+        total[live] += equities[live]
+        count[live] += 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (total / count).astype(np.float32)
+
+def build(path, samples=200000, vs_hand_samples=4000, max_opponents=6, workers=None, flops=True, seed=0):
+    workers = workers or os.cpu_count() or 1
+    started = time.time()
+    engine = EquityEngine(workers=workers, samples=samples, time_budget=None)
+    representatives = [combos[0].tolist() for combos in class_combos()]
+    vs_random = np.zeros((max_opponents, N_CLASSES), dtype=np.float32)
+    vs_random_ci = np.zeros((max_opponents, N_CLASSES), dtype=np.float32)
+    for n in range(1, max_opponents + 1):
+        for i, hero in enumerate(representatives):
+            result = engine.equity(hero, [], n, seed=seed + i)
+            vs_random[n - 1, i] = result.equity
+            vs_random_ci[n - 1, i] = (result.high - result.low) / 2
+        print(f"Preflop vs {n} random: done ({time.time() - started:.0f}s)")
+    engine.close()
+
+    combos = class_combos()
+    pairs = [(i, j) for i in range(N_CLASSES) for j in range(i, N_CLASSES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+    vs_hand = np.full((N_CLASSES, N_CLASSES), 0.5, dtype=np.float32)
+    vs_hand_ci = np.zeros((N_CLASSES, N_CLASSES), dtype=np.float32)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = ((combos[i], combos[j], vs_hand_samples, s) for (i, j), s in zip(pairs, seeds))
+        for (i, j), (equity, half_width) in zip(pairs, pool.map(_class_vs_class, jobs, chunksize=64)):
+            vs_hand[i, j] = equity
+            vs_hand[j, i] = 1.0 - equity
+            vs_hand_ci[i, j] = vs_hand_ci[j, i] = half_width
+    print(f"Preflop hand vs hand: done ({time.time() - started:.0f}s)")
+
+    flop_list = canonical_flops() if flops else []
+    flop_rows = np.full((len(flop_list), N_COMBOS), np.nan, dtype=np.float32)
+    if flop_list:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for row, equities in enumerate(pool.map(_flop_row, flop_list, chunksize=4)):
+                flop_rows[row] = equities
+                if row % 100 == 0:
+                    print(f"Flops: {row}/{len(flop_list)} ({time.time() - started:.0f}s)")
+    write(path, vs_random, vs_random_ci, vs_hand, vs_hand_ci, flop_list, flop_rows, samples, vs_hand_samples)
+    print(f"Saved equity tables to '{path}' ({time.time() - started:.0f}s)")
+
+def write(path, vs_random, vs_random_ci, vs_hand, vs_hand_ci, flop_list, flop_rows, samples, vs_hand_samples):
+    flop_index = np.full(52 ** 3, -1, dtype=np.int32)
+    for row, flop in enumerate(flop_list):
+        flop_index[flop_key(flop)] = row
+    data = {"preflop_vs_random": vs_random, "preflop_vs_random_ci": vs_random_ci,
+            "preflop_vs_hand": vs_hand, "preflop_vs_hand_ci": vs_hand_ci,
+            "flop_index": flop_index, "flop_equity": flop_rows}
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        header = [N_CLASSES, len(vs_random), len(flop_list), N_COMBOS, samples, vs_hand_samples]
+        f.write(np.array(header, dtype="<i4").tobytes())
+        for name, dtype, shape, offset in _sections(len(vs_random), len(flop_list)):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(data[name], dtype=np.dtype(dtype).newbyteorder("<")).tobytes())
+
+# ---------------------------------------------------------------------------#
+# Runtime loader
+
+# Memory-maps a table file; every lookup is a couple of array indexes, nothing is parsed
+class EquityTables:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic = f.read(8)
+            header = np.frombuffer(f.read(HEADER_SIZE - 8), dtype="<i4")
+        if magic != MAGIC or header[0] != N_CLASSES or header[3] != N_COMBOS:
+            raise ValueError(f"{path} is not an equity table file of this version (rebuild with equity_tables.py)")
+        self.max_opponents, self.n_flops = int(header[1]), int(header[2])
+        self.preflop_samples, self.matchup_samples = int(header[4]), int(header[5])
+        for name, dtype, shape, offset in _sections(self.max_opponents, self.n_flops):
+            if int(np.prod(shape)):
+                section = np.memmap(path, dtype=np.dtype(dtype).newbyteorder("<"), mode="r", offset=offset, shape=shape)
+            else:
+                section = np.zeros(shape, dtype=dtype)
+            setattr(self, name, section)
+
+    @classmethod
+    def load(cls, path=EQUITY_TABLES_PATH):
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def preflop_equity(self, hero, opponents=1):
+        if not 1 <= opponents <= self.max_opponents:
+            return None
+        index = opponents - 1, hand_class(*hero)
+        return EquityResult.from_table(float(self.preflop_vs_random[index]), float(self.preflop_vs_random_ci[index]),
+                                       self.preflop_samples)
+
+    def preflop_range_equity(self, hero, villain):
+        # Hero's hand against a 1326 weight vector (ranges.parse_range) from the class
+        # matchups: the villain combos hero does not block, weighted per class. Cards
+        # removed within a class are not accounted for, as in the matchup table itself;
+        # the interval is the weighted mean of the entries' (an upper bound).
+        live = ~np.isin(COMBOS, hero).any(axis=1)
+        weights = np.bincount(COMBO_CLASSES[live], villain[live], minlength=N_CLASSES)
+        total = weights.sum()
+        if total <= 0:
+            return None
+        row = hand_class(*hero)
+        equity = float(weights @ self.preflop_vs_hand[row] / total)
+        half_width = float(weights @ self.preflop_vs_hand_ci[row] / total)
+        return EquityResult.from_table(equity, half_width, self.matchup_samples)
+
+    def flop_vs_random(self, hero, flop):
+        canonical, perm = canonical_board(flop)
+        row = self.flop_index[flop_key(canonical)]
+        if row < 0:
+            return None
+        equity = self.flop_equity[row, combo_index(*remap_suits(hero, perm))]
+        return None if np.isnan(equity) else EquityResult.from_table(float(equity))
+
+    def lookup(self, hero, board, opponents):
+        # EquityResult for the spot if the tables cover it, else None
+        if len(board) == 0:
+            return self.preflop_equity(hero, opponents)
+        if len(board) == 3 and opponents == 1:
+            return self.flop_vs_random(hero, board)
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the preflop and flop equity tables")
+    parser.add_argument("output", nargs="?", default=EQUITY_TABLES_PATH)
+    parser.add_argument("--samples", type=int, default=200000, help="runouts per preflop hand vs random")
+    parser.add_argument("--matchup-samples", type=int, default=4000, help="runouts per preflop class matchup")
+    parser.add_argument("--max-opponents", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--skip-flops", action="store_true", help="leave out the exact flop tables")
+    args = parser.parse_args()
+    build(args.output, args.samples, args.matchup_samples, args.max_opponents, args.workers, not args.skip_flops)
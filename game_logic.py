@@ -1,14 +1,151 @@
+from equity import EquityEngine
+from equity_tables import EquityTables
+from ranges import RangeEngine, parse_range
+from solver import SubgameSolver, IP, OOP
+from strategy_store import StrategyStore
+from config import SOLVER_ITERATIONS, VILLAIN_RANGE
+
 class GameLogic:
-    def __init__(self, game_state):
+    def __init__(self, game_state, equity_engine=None, equity_tables=None, strategy_store=None, player_stats=None,
+                 range_engine=None, villain_range=VILLAIN_RANGE):
         self.game_state = game_state
+        self.equity_engine = equity_engine or EquityEngine()
+        self.equity_tables = equity_tables or EquityTables.load()
+        self.strategy_store = strategy_store or StrategyStore.load()
+        self.player_stats = player_stats
+        self.range_engine = range_engine or RangeEngine()
+        self.villain_range = parse_range(villain_range)
+        self.solved = {}
+
+    def dealt_cards(self, state):
+        # Hero's cards and the board as card ints, None when a card was read twice
+        hero, board = state.hero_cards, state.board
+        if hero.mask & board.mask or not hero.valid or not board.valid:
+            return None
+        return hero.cards, board.cards
+
+    def get_equity(self, state=None):
+        # Hero equity against every other seated player, on the board the OCR currently sees
+        state = state or self.game_state.snapshot()
+        cards = self.dealt_cards(state)
+        if cards is None:
+            return None
+        hero, board = cards
+        opponents = len(state.seated_players) - 1
+        if len(hero) != 2 or len(board) > 5 or opponents < 1:
+            return None
+        # Precomputed tables first; simulate only the spots they do not cover
+        if self.equity_tables is not None:
+            equity = self.equity_tables.lookup(hero, board, opponents)
+            if equity is not None:
+                return equity
+        return self.equity_engine.equity(hero, board, opponents)
+
+    def get_range_equity(self, state=None):
+        # Heads-up: hero's hand against the assumed villain range. Preflop comes from the
+        # class matchup tables when they are built; postflop from the range engine.
+        state = state or self.game_state.snapshot()
+        cards = self.dealt_cards(state)
+        if cards is None:
+            return None
+        hero, board = cards
+        if len(hero) != 2 or len(state.seated_players) != 2:
+            return None
+        if not board:
+            if self.equity_tables is None:
+                return None
+            result = self.equity_tables.preflop_range_equity(hero, self.villain_range)
+            return None if result is None else result.equity
+        if not 3 <= len(board) <= 5:
+            return None
+        return self.range_engine.hand_equity(hero, self.villain_range, board)
+
+    def parse_amount(self, text):
+        try:
+            return float(str(text).replace("$", "").replace(",", "").strip())
+        except ValueError:
+            return None
+
+    def river_history(self, state, player):
+        # The solver history at hero's decision, from the action labels and bets showing:
+        # first to act out of position, facing a check in position. None for any other
+        # spot (facing a bet, hero already acted, or nothing readable).
+        villain = next(p for p in state.seated_players if p != "Hero")
+        def bet(p):
+            return (self.parse_amount(state.bets.get(p)) or 0) > 0
+        if state.actions.get("Hero", "Unknown") != "Unknown" or bet("Hero") or bet(villain):
+            return None
+        villain_action = state.actions.get(villain, "Unknown")
+        if player == OOP:
+            return "" if villain_action == "Unknown" else None
+        return "x" if villain_action == "Check" else None
+
+    def get_solver_advice(self, state=None):
+        # Heads-up river only: solve the subgame once per spot and read hero's frequencies.
+        # Hero is in position on the button; the history comes from the observed actions.
+        state = state or self.game_state.snapshot()
+        cards = self.dealt_cards(state)
+        if cards is None:
+            return None
+        hero, board = cards
+        if len(hero) != 2 or len(board) != 5 or len(state.seated_players) != 2 or state.pot_size <= 0:
+            return None
+        if "Hero" not in state.seated_players:
+            return None
+        player = IP if state.positions.get("Hero") == "BTN" else OOP
+        history = self.river_history(state, player)
+        if history is None:
+            return None
+        stacks = [self.parse_amount(state.bankrolls.get(p)) for p in state.seated_players]
+        if None in stacks:
+            return None
+        # Presolved spots at a similar SPR are served from the store without solving
+        if self.strategy_store is not None:
+            advice = self.strategy_store.lookup(board, state.pot_size, min(stacks), "IP" if player == IP else "OOP",
+                                                history, hero)
+            if advice is not None:
+                return advice
+        key = (tuple(board), state.pot_size, min(stacks))
+        if key not in self.solved:
+            solver = SubgameSolver(board, state.pot_size, min(stacks))
+            solver.solve(SOLVER_ITERATIONS, report_every=SOLVER_ITERATIONS)
+            self.solved = {key: solver}
+        return self.solved[key].hand_strategy(hero, history)
+
+    def get_opponent_stats(self, state=None):
+        # Stats of every seated opponent, served from the store's in-memory cache when hot
+        state = state or self.game_state.snapshot()
+        if self.player_stats is None:
+            return {}
+        return {p: self.player_stats.get(p) for p in state.seated_players if p != "Hero"}
+
+    def get_gto_feedback(self, state=None):
+        # Basic GTO feedback logic (expandable); every value comes from one snapshot
+        state = state or self.game_state.snapshot()
+        feedback = self.get_action_feedback(state)
+        reads = [f"{s.name} {s.vpip:.0%}/{s.pfr:.0%}" for s in self.get_opponent_stats(state).values() if s.hands]
+        if reads:
+            feedback += " | VPIP/PFR: " + ", ".join(reads)
+        return feedback
 
-    def get_gto_feedback(self):
-        # Basic GTO feedback logic (expandable)
-        pot = self.game_state.pot_size
-        board = self.game_state.board
-        hero_hand = self.game_state.players[6]
+    def get_action_feedback(self, state):
+        pot = state.pot_size
+        board = state.board
+        hero_hand = state.players[6]
+        advice = self.get_solver_advice(state)
+        if advice is not None:
+            return "GTO: " + ", ".join(f"{action} {freq:.0%}" for action, freq in advice.items())
+        equity = self.get_equity(state)
 
-        if pot > 100:
+        if equity is not None:
+            feedback = f"Equity vs {len(state.seated_players) - 1}: {equity.equity:.1%}"
+            if not equity.exact:
+                feedback += f" (95% CI {equity.low:.1%}-{equity.high:.1%})"
+            range_equity = self.get_range_equity(state)
+            if range_equity is not None and range_equity == range_equity:
+                feedback += f", vs range {range_equity:.1%}"
+            return feedback
+        elif pot > 100:
             return "Big pot - consider cautious play."
         elif len(board) >= 3:
             return "Board is built - time to evaluate ranges."
@@ -1,21 +1,138 @@
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from cards import EMPTY_BOARD, EMPTY_HAND, Board, Hand, parse_cards
+
+# An immutable view of the table. Every change produces a new snapshot with the next
+# version, swapped in under a lock, so a reader holding a snapshot always sees one
+# consistent tick and never a half-applied update.
+GameSnapshot = namedtuple("GameSnapshot", [
+    "version", "pot_size", "board", "hero_cards", "bankrolls", "seated_players",
+    "positions", "actions", "bets", "players", "captured_at",
+])
+
+EMPTY_SNAPSHOT = GameSnapshot(
+    version=0, pot_size=0, board=EMPTY_BOARD, hero_cards=EMPTY_HAND, bankrolls=MappingProxyType({}), seated_players=(),
+    positions=MappingProxyType({}), actions=MappingProxyType({}), bets=MappingProxyType({}),
+    players=("",) * 7, captured_at=None,  # 7 players max
+)
+
+def changed_fields(old, new):
+    # Names of the fields that differ between two snapshots, version aside
+    return {name for name in GameSnapshot._fields[1:] if getattr(old, name) != getattr(new, name)}
+
+def parse_pot(line):
+    try:
+        return float(str(line).split("$")[-1].replace(",", "").strip())
+    except ValueError:
+        return 0
+
+# Boards and hands are kept as Board / Hand (see cards.py); OCR output already is one,
+# other callers may pass labels, card names or card ints
+def parse_board(line):
+    if isinstance(line, Board):
+        return line
+    if isinstance(line, str):
+        line = line.replace("Board:", "")
+    return Board(parse_cards(line))
+
+def parse_hand(cards):
+    return cards if isinstance(cards, Hand) else Hand(parse_cards(cards))
+
 class GameState:
     def __init__(self):
-        self.pot_size = 0
-        self.board = []
-        self.players = [""] * 7  # 7 players max
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def snapshot(self):
+        # A plain attribute read, so readers never wait on the lock
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    # Read access to the current snapshot's fields, for code that reads one value
+    pot_size = property(lambda self: self._snapshot.pot_size)
+    board = property(lambda self: self._snapshot.board)
+    hero_cards = property(lambda self: self._snapshot.hero_cards)
+    bankrolls = property(lambda self: self._snapshot.bankrolls)
+    seated_players = property(lambda self: self._snapshot.seated_players)
+    positions = property(lambda self: self._snapshot.positions)
+    players = property(lambda self: self._snapshot.players)
+    captured_at = property(lambda self: self._snapshot.captured_at)
+
+    def subscribe(self, callback):
+        # callback(old, new, changed) runs on the updating thread after every change;
+        # returns a function that removes the subscription
+        with self._lock:
+            self._subscribers.append(callback)
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def update(self, **fields):
+        # Swaps in a new snapshot with the given fields; a no-op when nothing changes
+        with self._lock:
+            old = self._snapshot
+            changes = {name: value for name, value in fields.items() if getattr(old, name) != value}
+            if not changes:
+                return old
+            new = old._replace(version=old.version + 1, **changes)
+            self._snapshot = new
+            subscribers = list(self._subscribers)
+        changed = set(changes)
+        for callback in subscribers:
+            callback(old, new, changed)
+        return new
+
+    def apply_state(self, state, captured_at=None):
+        # One OCR tick (see OCR.build_state) as a single version
+        bankrolls = dict(state["bankrolls"])
+        fields = {
+            "pot_size": parse_pot(state["pot"]),
+            "board": parse_board(state["board"]),
+            "hero_cards": parse_hand(state["hero_cards"]),
+            "bankrolls": MappingProxyType(bankrolls),
+            "seated_players": tuple(p for p, v in bankrolls.items() if v != "N/A"),
+            "positions": MappingProxyType(dict(state["positions"])),
+            # The action label and bet showing at each seat
+            "actions": MappingProxyType(dict(state.get("actions", {}))),
+            "bets": MappingProxyType(dict(state.get("bets", {}))),
+        }
+        if captured_at is not None:
+            fields["captured_at"] = captured_at
+        return self.update(**fields)
 
     def update_pot(self, line):
-        try:
-            self.pot_size = int(line.split("$")[1].strip())
-        except (IndexError, ValueError):
-            self.pot_size = 0
+        self.update(pot_size=parse_pot(line))
 
     def update_board(self, line):
-        self.board = line.replace("Board:", "").strip().split()
+        self.update(board=parse_board(line))
+
+    def update_hero_cards(self, cards):
+        self.update(hero_cards=parse_hand(cards))
+
+    def update_bankrolls(self, bankrolls):
+        bankrolls = dict(bankrolls)
+        self.update(bankrolls=MappingProxyType(bankrolls),
+                    seated_players=tuple(p for p, v in bankrolls.items() if v != "N/A"))
+
+    def update_positions(self, positions):
+        self.update(positions=MappingProxyType(dict(positions)))
+
+    def update_captured_at(self, timestamp):
+        # Capture time (time.time()) of the frame the current state was read from
+        self.update(captured_at=timestamp)
 
     def update_players(self, line):
         parts = line.split(":")
         if len(parts) == 2:
             player_index = int(parts[0].replace("Player", "").strip()) - 1
             if 0 <= player_index < len(self.players):
-                self.players[player_index] = parts[1].strip()
+                players = list(self.players)
+                players[player_index] = parts[1].strip()
+                self.update(players=tuple(players))
@@ -1,5 +1,13 @@
+import time
 import tkinter as tk
 from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
+from game_state import EMPTY_SNAPSHOT, GameSnapshot, changed_fields
+from instrumentation import metrics
+from config import GUI_POLL_MS
+
+# Snapshot fields the GTO feedback depends on
+FEEDBACK_FIELDS = {"pot_size", "board", "hero_cards", "bankrolls", "seated_players", "positions", "actions", "bets"}
 
 class PokerApp:
     def __init__(self, game_state, game_logic):
@@ -7,7 +15,15 @@ class PokerApp:
         self.game_logic = game_logic
         self.root = tk.Tk()
         self.root.title("Poker GTO Overlay")
+        # Set from the warm-up thread; the Tk loop picks it up in poll
+        self.status = "Warming up OCR models..."
+        self.shown = EMPTY_SNAPSHOT
+        # Feedback can mean a solver run, so it is computed off the Tk thread
+        self.feedback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feedback")
+        self.feedback_future = None
+        self.feedback_stale = False
         self.create_widgets()
+        self.poll()
 
     def create_widgets(self):
         # Main frame
@@ -21,6 +37,12 @@ class PokerApp:
         self.board_label = ttk.Label(frame, text="Board: ")
         self.board_label.grid(row=1, column=0, sticky=tk.W)
 
+        self.age_label = ttk.Label(frame, text="State age: --")
+        self.age_label.grid(row=12, column=0, sticky=tk.W)
+
+        self.status_label = ttk.Label(frame, text=f"Status: {self.status}")
+        self.status_label.grid(row=13, column=0, sticky=tk.W)
+
         # Player info
         self.player_labels = []
         for i in range(7):
@@ -36,16 +58,60 @@ class PokerApp:
         self.refresh_button = ttk.Button(frame, text="Refresh", command=self.update_display)
         self.refresh_button.grid(row=11, column=0, sticky=tk.W)
 
-    def update_display(self):
-        # Update labels with game state
-        self.pot_label.config(text=f"Pot: ${self.game_state.pot_size}")
-        self.board_label.config(text=f"Board: {self.game_state.board}")
+    def set_text(self, widget, name, text):
+        if widget.cget("text") != text:
+            widget.config(text=text)
+            metrics.count("gui_widget_redraws", widget=name)
 
-        for i, player in enumerate(self.game_state.players):
-            self.player_labels[i].config(text=f"Player {i+1}: {player}")
+    def redraw(self, state, changed):
+        # Only the widgets backed by a changed field are touched
+        if "pot_size" in changed:
+            self.set_text(self.pot_label, "pot", f"Pot: ${state.pot_size}")
+        if "board" in changed:
+            self.set_text(self.board_label, "board", f"Board: {' '.join(state.board.labels())}")
+        if "players" in changed:
+            for i, player in enumerate(state.players):
+                self.set_text(self.player_labels[i], "player", f"Player {i+1}: {player}")
+        if changed & FEEDBACK_FIELDS:
+            self.request_feedback(state)
 
-        feedback = self.game_logic.get_gto_feedback()
-        self.feedback_label.config(text=f"GTO Feedback: {feedback}")
+    def request_feedback(self, state):
+        if self.feedback_future is None:
+            self.feedback_future = self.feedback_executor.submit(self.game_logic.get_gto_feedback, state)
+            self.feedback_stale = False
+        else:
+            self.feedback_stale = True
+
+    def collect_feedback(self):
+        if self.feedback_future is None or not self.feedback_future.done():
+            return
+        try:
+            feedback = self.feedback_future.result()
+        except Exception as e:
+            feedback = f"unavailable ({e})"
+        self.feedback_future = None
+        self.set_text(self.feedback_label, "feedback", f"GTO Feedback: {feedback}")
+        if self.feedback_stale:
+            self.request_feedback(self.game_state.snapshot())
+
+    def poll(self):
+        # Cheap when nothing changed: one version comparison per tick
+        state = self.game_state.snapshot()
+        if state.version != self.shown.version:
+            self.redraw(state, changed_fields(self.shown, state))
+            self.shown = state
+        self.collect_feedback()
+        if state.captured_at is not None:
+            self.set_text(self.age_label, "age", f"State age: {time.time() - state.captured_at:.1f}s")
+        self.set_text(self.status_label, "status", f"Status: {self.status}")
+        self.root.after(GUI_POLL_MS, self.poll)
+
+    def update_display(self):
+        # Redraw everything and recompute the feedback
+        state = self.game_state.snapshot()
+        self.redraw(state, set(GameSnapshot._fields))
+        self.shown = state
 
     def run(self):
         self.root.mainloop()
+        self.feedback_executor.shutdown(wait=False)
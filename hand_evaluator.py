@@ -0,0 +1,151 @@
+import os
+from itertools import combinations_with_replacement
+import numpy as np
+from cards import card_rank, card_suit
+from config import HAND_TABLES_PATH
+
+# Hand values are dense ints from 1 (7-5-4-3-2 offsuit) to 7462 (royal flush); higher is better.
+# A non-flush hand is keyed by the sum of 5**rank over its cards, which is unique per rank
+# multiset. The key splits into a low part (ranks 2-8) and a high part (ranks 9-A), each
+# mapped to a small dense id, so the lookup is a perfect hash into a 2D value table.
+# A flush is looked up by the 13-bit rank mask of its suit; all four suit masks are packed
+# 16 bits apart into one int64 so a single sum over the cards yields them.
+HAND_CATEGORIES = ["High Card", "Pair", "Two Pair", "Trips", "Straight",
+                   "Flush", "Full House", "Quads", "Straight Flush"]
+
+CARD_KEYS = np.array([5 ** card_rank(c) for c in range(52)], dtype=np.int64)
+CARD_SUIT_BITS = np.array([1 << (card_rank(c) + 16 * card_suit(c)) for c in range(52)], dtype=np.int64)
+LOW_KEY_SPACE = 5 ** 7
+
+_tables = None
+
+def _pack(category, ranks):
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[i] + 1 if i < len(ranks) else 0)
+    return value
+
+def _straight_high(mask):
+    for high in range(12, 3, -1):
+        run = 0b11111 << (high - 4)
+        if mask & run == run:
+            return high
+    wheel = (1 << 12) | 0b1111
+    if mask & wheel == wheel:
+        return 3
+    return None
+
+def _score_ranks(counts):
+    # Best non-flush five-card score of a rank multiset
+    present = [r for r in range(12, -1, -1) if counts[r]]
+    mask = sum(1 << r for r in present)
+    quads = [r for r in present if counts[r] == 4]
+    trips = [r for r in present if counts[r] >= 3]
+    pairs = [r for r in present if counts[r] >= 2]
+    if quads:
+        return _pack(7, [quads[0], next(r for r in present if r != quads[0])])
+    if trips:
+        others = [r for r in pairs if r != trips[0]]
+        if others:
+            return _pack(6, [trips[0], others[0]])
+    straight = _straight_high(mask)
+    if straight is not None:
+        return _pack(4, [straight])
+    if trips:
+        return _pack(3, [trips[0]] + [r for r in present if r != trips[0]][:2])
+    if len(pairs) >= 2:
+        kicker = [r for r in present if r not in pairs[:2]][:1]
+        return _pack(2, pairs[:2] + kicker)
+    if pairs:
+        return _pack(1, [pairs[0]] + [r for r in present if r != pairs[0]][:3])
+    return _pack(0, present[:5])
+
+def _score_flush(mask):
+    straight = _straight_high(mask)
+    if straight is not None:
+        return _pack(8, [straight])
+    return _pack(5, [r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+def build_tables():
+    keys, scores = [], []
+    for n in (5, 6, 7):
+        for ranks in combinations_with_replacement(range(13), n):
+            counts = [0] * 13
+            for r in ranks:
+                counts[r] += 1
+            if max(counts) > 4:
+                continue
+            keys.append(sum(5 ** r for r in ranks))
+            scores.append(_score_ranks(counts))
+    flush_scores = np.zeros(1 << 13, dtype=np.int64)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            flush_scores[mask] = _score_flush(mask)
+
+    # Replace the packed scores with dense ranks 1..7462
+    keys = np.array(keys, dtype=np.int64)
+    scores = np.array(scores, dtype=np.int64)
+    distinct = np.unique(np.concatenate([scores, flush_scores[flush_scores > 0]]))
+    flush_values = np.where(flush_scores > 0, np.searchsorted(distinct, flush_scores) + 1, 0)
+
+    low, high = keys % LOW_KEY_SPACE, keys // LOW_KEY_SPACE
+    low_ids = np.zeros(LOW_KEY_SPACE, dtype=np.int32)
+    high_ids = np.zeros(5 ** 6, dtype=np.int32)
+    low_unique, high_unique = np.unique(low), np.unique(high)
+    low_ids[low_unique] = np.arange(len(low_unique))
+    high_ids[high_unique] = np.arange(len(high_unique))
+    noflush_values = np.zeros((len(low_unique), len(high_unique)), dtype=np.int16)
+    noflush_values[low_ids[low], high_ids[high]] = np.searchsorted(distinct, scores) + 1
+    return {
+        "low_ids": low_ids,
+        "high_ids": high_ids,
+        "noflush_values": noflush_values,
+        "flush_values": flush_values.astype(np.int16),
+        "category_bounds": np.array([np.searchsorted(distinct, c << 20) + 1 for c in range(1, 9)], dtype=np.int32),
+    }
+
+def load_tables(path=HAND_TABLES_PATH):
+    # Built once, then cached on disk so later startups only pay for np.load
+    global _tables
+    if _tables is None:
+        if path and os.path.exists(path):
+            with np.load(path) as data:
+                tables = {name: data[name] for name in data.files}
+        else:
+            tables = build_tables()
+            if path:
+                np.savez(path, **tables)
+        _tables = tables
+    return _tables
+
+def evaluate(cards):
+    # Value of one 5, 6 or 7 card hand given as card ints
+    tables = load_tables()
+    key = sum(5 ** (c >> 2) for c in cards)
+    high, low = divmod(key, LOW_KEY_SPACE)
+    value = int(tables["noflush_values"][tables["low_ids"][low], tables["high_ids"][high]])
+    suit_bits = sum(1 << ((c >> 2) + 16 * (c & 3)) for c in cards)
+    flush_values = tables["flush_values"]
+    for shift in (0, 16, 32, 48):
+        value = max(value, int(flush_values[(suit_bits >> shift) & 0x1FFF]))
+    return value
+
+def evaluate_many(cards):
+    # Values of many hands at once; cards is an (N, 5..7) integer array
+    tables = load_tables()
+    cards = np.asarray(cards)
+    # Column by column gathers are much faster than a gather plus a reduction over axis 1
+    keys = CARD_KEYS[cards[:, 0]]
+    suit_bits = CARD_SUIT_BITS[cards[:, 0]]
+    for i in range(1, cards.shape[1]):
+        keys += CARD_KEYS[cards[:, i]]
+        suit_bits += CARD_SUIT_BITS[cards[:, i]]
+    high, low = np.divmod(keys, LOW_KEY_SPACE)
+    values = tables["noflush_values"][tables["low_ids"][low], tables["high_ids"][high]]
+    flush_values = tables["flush_values"]
+    for shift in (0, 16, 32, 48):
+        np.maximum(values, flush_values[(suit_bits >> shift) & 0x1FFF], out=values)
+    return values
+
+def hand_category(value):
+    return HAND_CATEGORIES[int(np.searchsorted(load_tables()["category_bounds"], value, side="right"))]
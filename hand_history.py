@@ -0,0 +1,273 @@
+import json
+import os
+import time
+import numpy as np
+from cards import EMPTY_BOARD, EMPTY_HAND
+from game_state import parse_board, parse_hand
+from utlis import log_info
+from config import (HAND_DEBOUNCE_FRAMES, HAND_LOG_PATH, HAND_LOG_BATCH, HAND_LOG_FLUSH_SECONDS,
+                    HAND_LOG_FSYNC_SECONDS)
+
+STREETS = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}
+INDEX_DTYPE = np.dtype([("hand", "<u8"), ("offset", "<u8"), ("time", "<f8")])
+
+def parse_amount(text):
+    try:
+        return float(str(text).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+
+# A value is accepted only after it was read the same way on `frames` consecutive frames
+class Debounced:
+    def __init__(self, frames=HAND_DEBOUNCE_FRAMES, value=None):
+        self.frames = frames
+        self.value = value
+        self.candidate = value
+        self.seen = 0
+
+    def update(self, value):
+        # Returns True when the accepted value changes
+        if value == self.value:
+            self.candidate, self.seen = value, 0
+            return False
+        if value != self.candidate:
+            self.candidate, self.seen = value, 0
+        self.seen += 1
+        if self.seen >= self.frames:
+            self.value, self.seen = value, 0
+            return True
+        return False
+
+# ---------------------------------------------------------------------------#
+# Append-only log
+
+# Events are JSON lines buffered in memory and written in chunks. A sidecar index of
+# (hand id, byte offset of its first event, time) is appended after the data it points
+# to, so on startup only the bytes past the last indexed hand need scanning.
+class HandHistoryLog:
+    def __init__(self, path=HAND_LOG_PATH, batch=HAND_LOG_BATCH, flush_seconds=HAND_LOG_FLUSH_SECONDS,
+                 fsync_seconds=HAND_LOG_FSYNC_SECONDS):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self.fsync_seconds = fsync_seconds
+        self.file = open(path, "ab")
+        self.size = self.file.tell()
+        self.index = self._load_index()
+        self.index_file = open(self.index_path, "ab")
+        self.buffer = []
+        self.pending_index = []
+        self.last_flush = self.last_fsync = time.monotonic()
+
+    def _load_index(self):
+        index = np.fromfile(self.index_path, dtype=INDEX_DTYPE) if os.path.exists(self.index_path) else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+        # Entries past the end of the data (a crash between the two writes) are dropped,
+        # and the file rewritten so later starts do not drop them again
+        stored = len(index)
+        index = index[index["offset"] < self.size]
+        start = int(index["offset"][-1]) if len(index) else 0
+        tail = self._scan(start, skip=set(index["hand"][-1:].tolist()))
+        if len(tail) or len(index) < stored or not os.path.exists(self.index_path):
+            index = np.concatenate([index, np.array(tail, dtype=INDEX_DTYPE)])
+            index.tofile(self.index_path)
+            if tail:
+                log_info(f"Re-indexed {len(tail)} hands from {self.size - start} bytes of '{self.path}'")
+        return index
+
+    def _scan(self, start, skip=()):
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if b'"new_hand"' in line:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        event = None
+                    if event and event.get("type") == "new_hand" and event["hand"] not in skip:
+                        entries.append((event["hand"], offset, event["time"]))
+                offset += len(line)
+        return entries
+
+    def next_hand_id(self):
+        return int(self.index["hand"].max()) + 1 if len(self.index) else 1
+
+    def append(self, event):
+        line = (json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        if event["type"] == "new_hand":
+            self.pending_index.append((event["hand"], self.size, event["time"]))
+        self.buffer.append(line)
+        self.size += len(line)
+        if len(self.buffer) >= self.batch or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self, sync=False):
+        if self.buffer:
+            self.file.write(b"".join(self.buffer))
+            self.file.flush()
+            self.buffer = []
+        if self.pending_index:
+            entries = np.array(self.pending_index, dtype=INDEX_DTYPE)
+            self.index_file.write(entries.tobytes())
+            self.index_file.flush()
+            self.index = np.concatenate([self.index, entries])
+            self.pending_index = []
+        now = time.monotonic()
+        self.last_flush = now
+        if sync or now - self.last_fsync >= self.fsync_seconds:
+            os.fsync(self.file.fileno())
+            os.fsync(self.index_file.fileno())
+            self.last_fsync = now
+
+    def close(self):
+        self.flush(sync=True)
+        self.file.close()
+        self.index_file.close()
+
+    def hand_ids(self, since=None, until=None):
+        times = self.index["time"]
+        mask = np.ones(len(times), dtype=bool)
+        if since is not None:
+            mask &= times >= since
+        if until is not None:
+            mask &= times < until
+        return self.index["hand"][mask].tolist()
+
+    def hand(self, hand_id):
+        # Every logged event of one hand, read from its indexed byte range
+        self.flush()
+        rows = np.nonzero(self.index["hand"] == hand_id)[0]
+        if not len(rows):
+            return []
+        row = rows[-1]
+        start = int(self.index["offset"][row])
+        end = int(self.index["offset"][row + 1]) if row + 1 < len(self.index) else self.size
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [e for e in (json.loads(line) for line in data.splitlines() if line) if e.get("hand") == hand_id]
+
+    def __len__(self):
+        return len(self.index)
+
+# ---------------------------------------------------------------------------#
+# Tracker
+
+# Turns successive parsed OCR states (OCR.build_state) into hand events. Every input
+# is debounced first, so a single misread frame cannot start a hand or deal a street.
+class HandTracker:
+    def __init__(self, log=None, table=None, debounce=HAND_DEBOUNCE_FRAMES, on_event=None):
+        self.log = log
+        self.table = table
+        self.debounce = debounce
+        self.on_event = on_event
+        self.next_hand = log.next_hand_id() if log is not None else 1
+        self.hand = None
+        self.street = None
+        # Whether the current hand saw an action or a street since it started
+        self.progressed = False
+        self.players = []
+        self.dealt = EMPTY_BOARD
+        self.folded = set()
+        self.hero_cards = Debounced(debounce, EMPTY_HAND)
+        self.board = Debounced(debounce, EMPTY_BOARD)
+        self.dealer = Debounced(debounce)
+        self.actions = {}
+        self.acted = {}
+
+    def emit(self, events, event_type, captured_at, **fields):
+        event = {"type": event_type, "hand": self.hand, "time": captured_at, **fields}
+        if self.table is not None:
+            event["table"] = self.table
+        events.append(event)
+
+    def observe(self, state, captured_at=None):
+        # Feeds one parsed frame; returns the events it produced
+        captured_at = time.time() if captured_at is None else captured_at
+        events = []
+        hero_changed = self.hero_cards.update(parse_hand(state.get("hero_cards", EMPTY_HAND)))
+        board_changed = self.board.update(parse_board(state.get("board", EMPTY_BOARD)))
+        dealer = next((p for p, label in state.get("positions", {}).items() if label == "BTN"), None)
+        dealer_changed = self.dealer.update(dealer)
+        bankrolls = state.get("bankrolls", {})
+
+        # The button moving starts a hand, or new hero cards while the button cannot be
+        # read. The board clearing, the button and the cards settle on different frames
+        # at a hand boundary, so once a hand starts, nothing starts another until it saw
+        # an action or a street.
+        if self.dealer.value is not None:
+            started = dealer_changed
+        else:
+            started = hero_changed and bool(self.hero_cards.value)
+        if started and (self.hand is None or self.progressed):
+            self.end_hand(events, captured_at)
+            self.hand = self.next_hand
+            self.next_hand += 1
+            self.street = "preflop"
+            self.progressed = False
+            self.dealt = EMPTY_BOARD
+            self.folded = set()
+            self.reset_actions(state)
+            self.players = [p for p, v in bankrolls.items() if v != "N/A"]
+            self.emit(events, "new_hand", captured_at, hero_cards=self.hero_cards.value.labels(),
+                      dealer=self.dealer.value, players=self.players,
+                      stacks={p: parse_amount(bankrolls[p]) for p in self.players})
+        elif hero_changed and self.hero_cards.value and self.hand is not None and not self.progressed:
+            # Dealt after the button moved
+            self.emit(events, "hero_cards", captured_at, hero_cards=self.hero_cards.value.labels())
+
+        if self.hand is not None:
+            street = STREETS.get(len(self.board.value))
+            if board_changed and street and street != self.street and street != "preflop":
+                self.street = street
+                self.progressed = True
+                self.dealt = self.board.value
+                self.reset_actions(state)
+                self.emit(events, "street", captured_at, street=street, board=self.board.value.labels(),
+                          pot=parse_amount(state.get("pot")))
+            self.track_actions(state, events, captured_at)
+
+        for event in events:
+            if self.log is not None:
+                self.log.append(event)
+            if self.on_event is not None:
+                self.on_event(event)
+        return events
+
+    def reset_actions(self, state):
+        # Labels still showing from the previous street are not new actions
+        self.actions = {p: Debounced(self.debounce, (a, state.get("bets", {}).get(p)))
+                        for p, a in state.get("actions", {}).items()}
+        self.acted = {p: d.value for p, d in self.actions.items()}
+
+    def track_actions(self, state, events, captured_at):
+        bets = state.get("bets", {})
+        for player, action in state.get("actions", {}).items():
+            debounced = self.actions.setdefault(player, Debounced(self.debounce))
+            debounced.update((action, bets.get(player)))
+            value = debounced.value
+            if value is None or value[0] == "Unknown" or value == self.acted.get(player):
+                continue
+            self.acted[player] = value
+            self.progressed = True
+            if value[0] == "Fold":
+                self.folded.add(player)
+            self.emit(events, "action", captured_at, street=self.street, player=player, action=value[0],
+                      amount=parse_amount(value[1]))
+
+    def end_hand(self, events, captured_at):
+        # OCR cannot see who won; a hand that reached the river with two or more players
+        # still in is logged as going to showdown
+        if self.hand is None:
+            return
+        if self.street == "river":
+            players = [p for p in self.players if p not in self.folded]
+            if len(players) >= 2:
+                self.emit(events, "showdown", captured_at, board=self.dealt.labels(), players=players)
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
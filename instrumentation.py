@@ -0,0 +1,213 @@
+import bisect
+import json
+import os
+import threading
+import time
+from utlis import log_info
+from config import (INSTRUMENTATION_ENABLED, LATENCY_BUCKETS, METRICS_EXPORT_INTERVAL,
+                    METRICS_JSON_PATH, METRICS_PROM_PATH)
+
+# Counters, timers and histograms for the hot path. While disabled every call returns
+# before touching a lock or the clock, so instrumented code pays one attribute check.
+#   from instrumentation import metrics
+#   metrics.count("ocr_readtext_calls", field=name)
+#   with metrics.timer("ocr_stage_seconds", stage="recognize"): ...
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+def _label_text(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+class Metrics:
+    def __init__(self, enabled=INSTRUMENTATION_ENABLED):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name, **labels):
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        self.histogram(name, **labels).observe(value)
+
+    def timer(self, name, **labels):
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self.histogram(name, **labels))
+
+    def snapshot(self):
+        with self.lock:
+            counters = list(self.counters.items())
+            histograms = list(self.histograms.items())
+        return {
+            "started": self.started,
+            "written": time.time(),
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters)],
+            "histograms": [{"name": name, "labels": dict(labels), **h.snapshot()}
+                           for (name, labels), h in sorted(histograms, key=lambda item: item[0])],
+        }
+
+    def to_prometheus(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            metric = name if name.endswith("_total") else f"{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_label_text(labels)} {value}")
+        for (name, labels), h in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(h.buckets + ["+Inf"], h.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels)} {h.sum}")
+            lines.append(f"{name}_count{_label_text(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path=METRICS_JSON_PATH, prom_path=METRICS_PROM_PATH):
+        # Written to a temporary file and renamed, so a scraper never sees half a file
+        for path, text in ((json_path, lambda: json.dumps(self.snapshot(), indent=2)),
+                           (prom_path, self.to_prometheus)):
+            if path:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(text())
+                os.replace(path + ".tmp", path)
+
+    def log_summary(self):
+        snapshot = self.snapshot()
+        for c in snapshot["counters"]:
+            log_info(f"{c['name']}{_label_text(c['labels'].items())}: {c['value']}")
+        for h in snapshot["histograms"]:
+            log_info(f"{h['name']}{_label_text(h['labels'].items())}: n={h['count']} "
+                     f"mean {h['mean'] * 1000:.2f} ms, p95 <= {h['p95'] * 1000:.1f} ms")
+
+# Writes the metrics files and logs a summary every interval seconds
+class MetricsExporter:
+    def __init__(self, metrics, interval=METRICS_EXPORT_INTERVAL, json_path=METRICS_JSON_PATH,
+                 prom_path=METRICS_PROM_PATH, log=True):
+        self.metrics = metrics
+        self.interval = interval
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.log = log
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+
+    def export(self):
+        self.metrics.write(self.json_path, self.prom_path)
+        if self.log:
+            self.metrics.log_summary()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.export()
+
+metrics = Metrics()
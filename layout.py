@@ -0,0 +1,251 @@
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from capture import FileFrameSource, ScreenFrameSource
+from instrumentation import metrics
+from utlis import log_info
+from config import (REGIONS, SCREEN_REGION, CALIBRATION_ANCHORS, CALIBRATION_ANCHORS_PATH, CALIBRATION_SCALES,
+                    CALIBRATION_DOWNSAMPLE, CALIBRATION_THRESHOLD, CALIBRATION_CHECK_EVERY, CALIBRATION_RETRY_SECONDS)
+
+REFERENCE_SIZE = (SCREEN_REGION[2] - SCREEN_REGION[0], SCREEN_REGION[3] - SCREEN_REGION[1])
+
+def normalize(region):
+    # A reference region as fractions of the reference window
+    bx, by = SCREEN_REGION[:2]
+    w, h = REFERENCE_SIZE
+    x1, y1, x2, y2 = region
+    return (x1 - bx) / w, (y1 - by) / h, (x2 - bx) / w, (y2 - by) / h
+
+# The window-independent layout every TableLayout is derived from
+NORMALIZED_REGIONS = {name: normalize(region) for name, region in REGIONS.items()}
+
+# REGIONS describe one table window at its reference position and size (SCREEN_REGION).
+# A TableLayout places the normalized layout at another window's offset and scale; its
+# ROI index is built once and reused for every tick until the geometry changes.
+class TableLayout:
+    def __init__(self, offset=SCREEN_REGION[:2], scale=1.0):
+        self.offset = tuple(int(v) for v in offset)
+        self.scale = scale
+        self.size = (round(REFERENCE_SIZE[0] * scale), round(REFERENCE_SIZE[1] * scale))
+        self._regions = None
+
+    def place(self, normalized):
+        ox, oy = self.offset
+        w, h = self.size
+        x1, y1, x2, y2 = normalized
+        return ox + round(x1 * w), oy + round(y1 * h), ox + round(x2 * w), oy + round(y2 * h)
+
+    def point(self, x, y):
+        return self.place(normalize((x, y, x, y)))[:2]
+
+    def region(self, region):
+        return self.place(normalize(region))
+
+    def screen_region(self):
+        return self.offset + (self.offset[0] + self.size[0], self.offset[1] + self.size[1])
+
+    def regions(self):
+        if self._regions is None:
+            self._regions = {name: self.place(n) for name, n in NORMALIZED_REGIONS.items()}
+        return self._regions
+
+    def __eq__(self, other):
+        return isinstance(other, TableLayout) and (self.offset, self.size) == (other.offset, other.size)
+
+    def __hash__(self):
+        return hash((self.offset, self.size))
+
+    def __repr__(self):
+        return f"TableLayout(offset={self.offset}, scale={self.scale:.3f})"
+
+# ---------------------------------------------------------------------------#
+# Calibration
+
+def grey(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+def best_match(image, template):
+    if template.shape[0] > image.shape[0] or template.shape[1] > image.shape[1]:
+        return -1.0, (0, 0)
+    _, score, _, location = cv2.minMaxLoc(cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED))
+    return score, location
+
+def resized(template, scale):
+    h, w = template.shape
+    size = (max(round(w * scale), 1), max(round(h * scale), 1))
+    return cv2.resize(template, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+# Finds the table window on a full-screen frame from grey crops of fixed parts of the
+# reference window (CALIBRATION_ANCHORS). The search runs over CALIBRATION_SCALES on a
+# downsampled screen, then is refined at full resolution around the best hit.
+class LayoutCalibrator:
+    def __init__(self, anchors, threshold=CALIBRATION_THRESHOLD, scales=CALIBRATION_SCALES,
+                 downsample=CALIBRATION_DOWNSAMPLE):
+        # anchors maps a name to (reference region, grey template)
+        self.anchors = anchors
+        self.threshold = threshold
+        self.scales = scales
+        self.downsample = downsample
+        self._scaled = {}
+
+    @classmethod
+    def build(cls, frame, regions=CALIBRATION_ANCHORS):
+        # frame is a capture of the window at its reference position (SCREEN_REGION)
+        return cls({name: (region, grey(frame.roi(region)).copy()) for name, region in regions.items()})
+
+    @classmethod
+    def load(cls, path=CALIBRATION_ANCHORS_PATH):
+        if not path or not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            names = data["names"].tolist()
+            return cls({name: (tuple(data["regions"][i].tolist()), data[f"template_{i}"]) for i, name in enumerate(names)})
+
+    def save(self, path=CALIBRATION_ANCHORS_PATH):
+        names = list(self.anchors)
+        np.savez_compressed(path, names=np.array(names), regions=np.array([self.anchors[n][0] for n in names]),
+                            **{f"template_{i}": self.anchors[n][1] for i, n in enumerate(names)})
+
+    def locate(self, screen, small, template):
+        # Best (score, x, y, scale) of one anchor on the grey screen and its downsampled copy
+        best = (-1.0, 0, 0, 1.0)
+        for scale in self.scales:
+            score, (x, y) = best_match(small, resized(template, scale * self.downsample))
+            if score > best[0]:
+                best = (score, x / self.downsample, y / self.downsample, scale)
+        _, cx, cy, coarse = best
+        step = (self.scales[1] - self.scales[0]) if len(self.scales) > 1 else 0.0
+        margin = int(max(template.shape) * coarse / 2) + int(1 / self.downsample) + 2
+        refined = (-1.0, cx, cy, coarse)
+        for scale in np.linspace(coarse - step / 2, coarse + step / 2, 5):
+            scaled = resized(template, scale)
+            x0, y0 = max(int(cx) - margin, 0), max(int(cy) - margin, 0)
+            window = screen[y0:int(cy) + scaled.shape[0] + margin, x0:int(cx) + scaled.shape[1] + margin]
+            score, (x, y) = best_match(window, scaled)
+            if score > refined[0]:
+                refined = (score, x0 + x, y0 + y, float(scale))
+        return refined
+
+    def calibrate(self, frame):
+        # The TableLayout of the window on the frame, None when too few anchors match
+        started = time.perf_counter()
+        screen = grey(frame.image)
+        small = cv2.resize(screen, None, fx=self.downsample, fy=self.downsample, interpolation=cv2.INTER_AREA)
+        bx, by = SCREEN_REGION[:2]
+        fx, fy = frame.origin
+        found = []
+        for name, (region, template) in self.anchors.items():
+            score, x, y, scale = self.locate(screen, small, template)
+            if score >= self.threshold:
+                found.append((region[0] - bx, region[1] - by, fx + x, fy + y, scale))
+        elapsed = time.perf_counter() - started
+        metrics.observe("layout_calibration_seconds", elapsed)
+        if not found:
+            log_info(f"Layout calibration found no anchor in {elapsed:.2f}s")
+            return None
+        found = np.array(found)
+        if len(found) == 1:
+            rx, ry, x, y, scale = found[0]
+            x, y = x - rx * scale, y - ry * scale
+        else:
+            # Several anchors pin the scale far better than one template's size does:
+            # least squares for screen = origin + scale * reference over all their corners
+            n = len(found)
+            a = np.zeros((2 * n, 3))
+            a[:n, 0] = a[n:, 1] = 1
+            a[:n, 2], a[n:, 2] = found[:, 0], found[:, 1]
+            (x, y, scale), *_ = np.linalg.lstsq(a, np.concatenate([found[:, 2], found[:, 3]]), rcond=None)
+        layout = TableLayout((round(x), round(y)), float(scale))
+        log_info(f"Calibrated {layout} from {len(found)}/{len(self.anchors)} anchors in {elapsed:.2f}s")
+        return layout
+
+    def scaled_template(self, name, scale):
+        key = (name, scale)
+        if key not in self._scaled:
+            self._scaled[key] = resized(self.anchors[name][1], scale)
+        return self._scaled[key]
+
+    def verify(self, frame, layout, pad=3):
+        # Cheap per-tick check: does any anchor still sit where the layout puts it.
+        # The crop is padded a few pixels so rounding in the placement does not matter.
+        h, w = frame.image.shape[:2]
+        ox, oy = frame.origin
+        for name, (region, _) in self.anchors.items():
+            x1, y1, x2, y2 = layout.region(region)
+            x1, y1 = max(x1 - pad, ox), max(y1 - pad, oy)
+            x2, y2 = min(x2 + pad, ox + w), min(y2 + pad, oy + h)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            if best_match(grey(frame.roi((x1, y1, x2, y2))), self.scaled_template(name, layout.scale))[0] >= self.threshold:
+                return True
+        return False
+
+# Keeps a table's layout current: every CALIBRATION_CHECK_EVERY ticks the anchors are
+# verified on the tick's frame, and only when that fails is the whole screen searched again
+class LayoutTracker:
+    def __init__(self, calibrator, screen_source=None, layout=None, check_every=CALIBRATION_CHECK_EVERY,
+                 retry_seconds=CALIBRATION_RETRY_SECONDS):
+        self.calibrator = calibrator
+        self.screen_source = screen_source or ScreenFrameSource(None)
+        self.layout = layout or TableLayout()
+        self.check_every = check_every
+        self.retry_seconds = retry_seconds
+        self.ticks = 0
+        self.retry_at = 0.0
+        self.calibrations = 0
+        self.failures = 0
+
+    def calibrate(self):
+        # Searches a full-screen grab; returns that frame, or None when the table was not found
+        screen = self.screen_source.grab()
+        layout = self.calibrator.calibrate(screen)
+        if layout is None:
+            self.failures += 1
+            metrics.count("layout_calibration_failures")
+            self.retry_at = time.monotonic() + self.retry_seconds
+            return None
+        self.calibrations += 1
+        self.layout = layout
+        return screen
+
+    def update(self, frame):
+        # The frame to read this tick: the given one, or the calibration grab when the
+        # window moved (it covers the new position)
+        self.ticks += 1
+        if self.ticks % self.check_every:
+            return frame
+        with metrics.timer("layout_check_seconds"):
+            ok = self.calibrator.verify(frame, self.layout)
+        if ok or time.monotonic() < self.retry_at:
+            return frame
+        log_info(f"Table anchors lost at {self.layout}, recalibrating")
+        return self.calibrate() or frame
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build layout anchors or calibrate against a screenshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="crop the anchors from a reference window capture")
+    build_parser.add_argument("reference", help="screenshot of the window at SCREEN_REGION")
+    build_parser.add_argument("--output", default=CALIBRATION_ANCHORS_PATH)
+    run_parser = commands.add_parser("calibrate", help="locate the table on a full-screen capture")
+    run_parser.add_argument("screenshot", nargs="?", help="full-screen screenshot (default: live screen)")
+    run_parser.add_argument("--checks", type=int, default=1000)
+    args = parser.parse_args()
+    if args.command == "build":
+        LayoutCalibrator.build(FileFrameSource(args.reference).grab()).save(args.output)
+        print(f"Saved {len(CALIBRATION_ANCHORS)} anchors to '{args.output}'")
+    else:
+        calibrator = LayoutCalibrator.load()
+        if calibrator is None:
+            raise SystemExit(f"No anchors at '{CALIBRATION_ANCHORS_PATH}', run 'python layout.py build' first")
+        source = FileFrameSource(args.screenshot, origin=(0, 0)) if args.screenshot else ScreenFrameSource(None)
+        frame = source.grab()
+        layout = calibrator.calibrate(frame)
+        print(f"Layout: {layout}")
+        if layout is not None:
+            started = time.perf_counter()
+            for _ in range(args.checks):
+                calibrator.verify(frame, layout)
+            print(f"Per-tick anchor check: {(time.perf_counter() - started) / args.checks * 1e6:.0f} us")
@@ -1,21 +1,78 @@
+import time
+STARTED = time.perf_counter()
 import threading
 from gui import PokerApp
-from ocr import OCR
+from pipeline import Pipeline
 from game_state import GameState
 from game_logic import GameLogic
+from hand_history import HandHistoryLog, HandTracker
+from player_stats import PlayerStatsStore
+from instrumentation import metrics, MetricsExporter
+from utlis import log_info, log_error
+
+def report_startup(phase, seconds):
+    log_info(f"Startup: {phase} {seconds:.2f}s")
+    metrics.observe("startup_seconds", seconds, phase=phase)
+
+def start_ocr(app, game_state, hand_tracker, running):
+    # Heavy imports, model loading and the warm-up inference happen here, off the Tk thread
+    try:
+        started = time.perf_counter()
+        from ocr import OCR
+        from layout import LayoutCalibrator, LayoutTracker
+        report_startup("ocr_imports", time.perf_counter() - started)
+        # With anchors built (layout.py build), the table is located on screen first
+        calibrator = LayoutCalibrator.load()
+        layout_tracker = None
+        if calibrator is not None:
+            app.status = "Locating table..."
+            layout_tracker = LayoutTracker(calibrator)
+            if layout_tracker.calibrate() is None:
+                log_info("Table not found on screen, using the reference layout until it is")
+        ocr = OCR(game_state, layout_tracker=layout_tracker)
+        app.status = "Warming up recognizer..."
+        ocr.warm_up()
+    except Exception as e:
+        log_error(f"OCR startup failed: {e}")
+        app.status = f"OCR unavailable: {e}"
+        return
+
+    first_state = threading.Event()
+    def on_publish(state, captured_at):
+        hand_tracker.observe(state, captured_at)
+        if not first_state.is_set():
+            first_state.set()
+            report_startup("time_to_first_state", time.perf_counter() - STARTED)
+            app.status = "Live"
+
+    # Capture, recognition and publication run on their own threads
+    running["ocr"] = ocr
+    running["pipeline"] = Pipeline(ocr, on_publish=on_publish).start()
+    app.status = "Waiting for the first frame..."
 
 def main():
+    report_startup("imports", time.perf_counter() - STARTED)
     game_state = GameState()
-    ocr = OCR(game_state)
-    game_logic = GameLogic(game_state)
-
-    # Start OCR in a separate thread
-    ocr_thread = threading.Thread(target=ocr.start, daemon=True)
-    ocr_thread.start()
+    player_stats = PlayerStatsStore()
+    game_logic = GameLogic(game_state, player_stats=player_stats)
+    exporter = MetricsExporter(metrics).start() if metrics.enabled else None
+    # Opponent stats are aggregated from the tracker's events as each hand finishes
+    hand_tracker = HandTracker(HandHistoryLog(), on_event=player_stats.on_event)
 
-    # Launch GUI
+    # The window comes up right away; OCR loads in the background
     app = PokerApp(game_state, game_logic)
+    report_startup("window", time.perf_counter() - STARTED)
+    running = {}
+    threading.Thread(target=start_ocr, args=(app, game_state, hand_tracker, running), name="ocr-startup", daemon=True).start()
     app.run()
 
+    if "pipeline" in running:
+        running["pipeline"].stop()
+        running["ocr"].close()
+    hand_tracker.close()
+    player_stats.close()
+    if exporter is not None:
+        exporter.stop()
+
 if __name__ == "__main__":
     main()
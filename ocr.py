@@ -1,15 +1,61 @@
 import cv2
-import numpy as np
-import easyocr
-from PIL import ImageGrab
 import time
+import numpy as np
+from capture import Frame, ScreenFrameSource
+from recognizer import BatchRecognizer
+from ocr_cache import RecognitionCache, crop_key
+from preprocess import FramePreprocessor
+from scheduler import ScanScheduler
+from change_tracker import RegionChangeTracker
+from card_templates import RankTemplateIndex, EMPTY_LABEL
+from cards import RANK_LABELS, EMPTY_BOARD, Board, Hand, card_from_label
+from color_classifier import ColorClassifier, region_means
+from instrumentation import metrics
+from utlis import log_info, log_debug
 from config import *
 
+def load_reader():
+    # easyocr pulls in torch, so it is imported only when a reader is actually built
+    started = time.perf_counter()
+    import easyocr
+    imported = time.perf_counter()
+    reader = easyocr.Reader(['en'])
+    loaded = time.perf_counter()
+    log_info(f"easyocr import {imported - started:.2f}s, model load {loaded - imported:.2f}s")
+    metrics.observe("startup_seconds", imported - started, phase="easyocr_import")
+    metrics.observe("startup_seconds", loaded - imported, phase="model_load")
+    return reader
+
 class OCR:
-    def __init__(self, game_state):
+    def __init__(self, game_state, frame_source=None, suit_palette=None, dealer_color=None, reader=None,
+                 recognizer=None, regions=None, layout_tracker=None, scheduler=None):
         self.game_state = game_state
-        self.reader = easyocr.Reader(['en'])
-        self.previous_board = []
+        # Several tables can share one reader and recognizer (see tables.py); regions
+        # are the screen regions of this table's window. With a layout tracker (see
+        # layout.py) they follow the calibrated window instead.
+        self.reader = reader or load_reader()
+        self.recognizer = recognizer or BatchRecognizer(self.reader, cache=RecognitionCache.load())
+        # Shared with the recognizer, so both recognition paths fill one cache
+        self.cache = getattr(self.recognizer, "cache", None)
+        self.layout_tracker = layout_tracker
+        if layout_tracker is not None:
+            regions = layout_tracker.layout.regions()
+            frame_source = frame_source or ScreenFrameSource(layout_tracker.layout.screen_region())
+        self.regions = regions or REGIONS
+        self.preprocessor = FramePreprocessor(self.regions)
+        self.texts = {}
+        self.last_texts = {}
+        self.change_tracker = RegionChangeTracker()
+        self.scheduler = scheduler or ScanScheduler()
+        self.rank_index = RankTemplateIndex.load(RANK_TEMPLATES_PATH)
+        self.suit_palette = suit_palette or SUIT_PALETTE
+        # Suits and the dealer button share one palette so a tick needs one distance matrix
+        self.color_classifier = ColorClassifier({**self.suit_palette, "dealer": dealer_color or DEALER_COLOR})
+        self.suits = {}
+        self.dealer_distances = {}
+        self.frame_source = frame_source or ScreenFrameSource()
+        self.frame = None
+        self.previous_board = EMPTY_BOARD
         self.previous_pot = None
         self.bankrolls = {}
         self.vpips = {}
@@ -17,23 +63,120 @@ class OCR:
         self.actions = {}
         self.bets = {}
 
+    def warm_up(self):
+        # One inference on a dummy crop through both recognition paths, so the first
+        # real frame does not pay for torch's lazy initialization
+        started = time.perf_counter()
+        img = np.zeros((40, 120), dtype=np.uint8)
+        cv2.putText(img, "0.50", (8, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, 255, 2)
+        frame = Frame(cv2.cvtColor(img, cv2.COLOR_GRAY2BGR), time.time())
+        self.recognizer.recognize(frame, {"WARM_UP": (0, 0, 120, 40)}, use_cache=False)
+        self.reader.readtext(img, detail=0)
+        elapsed = time.perf_counter() - started
+        log_info(f"OCR warm-up inference {elapsed:.2f}s")
+        metrics.observe("startup_seconds", elapsed, phase="warm_up")
+
+    def grab_frame(self):
+        # One capture per tick; every extractor slices its ROI out of this frame
+        return self.use_frame(self.frame_source.grab())
+
+    def use_frame(self, frame):
+        if self.layout_tracker is not None:
+            frame = self.layout_tracker.update(frame)
+            if self.layout_tracker.layout.regions() is not self.regions:
+                self.set_layout(self.layout_tracker.layout)
+        self.frame = frame
+        self.preprocessor.use_frame(frame)
+        self.texts = {}
+        self.suits = {}
+        self.dealer_distances = {}
+        return frame
+
+    def set_layout(self, layout):
+        # The window moved or was resized: new ROIs, so every region is read afresh
+        self.regions = layout.regions()
+        self.preprocessor = FramePreprocessor(self.regions)
+        self.change_tracker = RegionChangeTracker()
+        if isinstance(self.frame_source, ScreenFrameSource):
+            self.frame_source.region = layout.screen_region()
+
+    def read_fields(self, fields=TEXT_FIELDS):
+        # Recognize, in one batched pass, the fields the scheduler wants this tick whose
+        # pixels changed; the rest keep the text read on an earlier tick
+        if self.frame is None:
+            self.grab_frame()
+        now = self.frame.clock
+        due = self.scheduler.due(now, fields)
+        dirty = self.change_tracker.update(self.preprocessor.gray_frame, {f: self.regions[f] for f in due})
+        metrics.count("ocr_field_cache_hits", len(due) - len(dirty))
+        metrics.count("ocr_field_cache_misses", len(dirty))
+        dirty = self.match_card_ranks(dirty)
+        selected, skipped = self.scheduler.plan(due, dirty, now)
+        # Skipped fields must still read as changed on a later tick
+        for field in skipped:
+            self.change_tracker.invalidate(field)
+        with metrics.timer("ocr_stage_seconds", stage="recognize"):
+            started = time.perf_counter()
+            self.last_texts.update(self.recognizer.recognize(self.preprocessor, {f: self.regions[f] for f in selected}))
+            self.scheduler.record(selected, time.perf_counter() - started)
+        self.texts.update({f: self.last_texts.get(f, []) for f in fields})
+        return self.texts
+
+    def match_card_ranks(self, fields):
+        # Card ranks go through the template index; low-confidence slots fall back to easyocr
+        if self.rank_index is None:
+            return fields
+        cards = [f for f in fields if f in CARD_RANK_FIELDS]
+        with metrics.timer("ocr_stage_seconds", stage="rank_templates"):
+            labels, scores = self.rank_index.classify([self.preprocessor.gray_frame.roi(self.regions[f]) for f in cards])
+        matched = set()
+        for field, label, score in zip(cards, labels, scores):
+            if score >= RANK_MATCH_THRESHOLD:
+                self.last_texts[field] = [] if label == EMPTY_LABEL else [label]
+                matched.add(field)
+        metrics.count("card_rank_template_matches", len(matched))
+        metrics.count("card_rank_template_fallbacks", len(cards) - len(matched))
+        return [f for f in fields if f not in matched]
+
+    def field_text(self, field):
+        if field not in self.texts:
+            with metrics.timer("ocr_region_seconds", region=field):
+                if self.frame is None:
+                    self.grab_frame()
+                if field in self.preprocessor.boxes:
+                    img = self.preprocessor.field_image(field)
+                else:
+                    img = self.capture_screen(self.regions[field])
+                self.texts[field] = self.extract_text(img)
+        return self.texts[field]
+
     def capture_screen(self, region, color=False):
-        img = np.array(ImageGrab.grab(bbox=region))
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        if not color:
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        img = cv2.resize(img, (0, 0), fx=2, fy=2)
-        return img
+        if self.frame is None:
+            self.grab_frame()
+        img = self.frame.roi(region) if color else self.preprocessor.gray_frame.roi(region)
+        return cv2.resize(img, (0, 0), fx=OCR_SCALE, fy=OCR_SCALE)
 
     def extract_text(self, img):
-        results = self.reader.readtext(img, detail=0)
-        print("Raw OCR Output:", results)
-        return results
+        key = None
+        if self.cache is not None:
+            key = crop_key(img, kind="readtext")
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        metrics.count("ocr_readtext_calls")
+        texts = self.reader.readtext(img, detail=0)
+        if key is not None:
+            self.cache.put(key, texts)
+        return texts
 
     def extract_single_value(self, region):
         text = self.extract_text(self.capture_screen(region))
         return text[0] if text else "N/A"
 
+    def extract_field_value(self, field):
+        text = self.field_text(field)
+        return text[0] if text else "N/A"
+
     def extract_pot_value(self, text_list):
         for text in text_list:
             text = text.replace(",", "").strip()
@@ -46,95 +189,58 @@ class OCR:
                     continue
         return None
 
-    def detect_suit_from_region(self, region):
-        img = self.capture_screen(region, color=True)
-        avg_color = np.mean(img.reshape(-1, 3), axis=0)
-        suit_colors = {
-            '♣': (27, 108, 27),
-            '♥': (21, 82, 145),
-            '♦': (162, 32, 33),
-            '♠': (41, 43, 41)
-        }
-        def color_distance(c1, c2):
-            return np.sqrt(sum((e1 - e2) ** 2 for e1, e2 in zip(c1, c2)))
-        return min(suit_colors, key=lambda k: color_distance(avg_color, suit_colors[k]))
+    def classify_colors(self):
+        # Mean colors of all suit and dealer button regions in one pass, classified together
+        if self.frame is None:
+            self.grab_frame()
+        suit_fields = SUIT_CARD_FIELDS + SUIT_HERO_FIELDS
+        button_fields = list(POSITION_FIELDS.values())
+        means = region_means(self.frame, [self.regions[f] for f in suit_fields + button_fields])
+        distances = self.color_classifier.distances(means)
+        n_suits = len(self.suit_palette)
+        best = distances[:len(suit_fields), :n_suits].argmin(axis=1)
+        self.suits = {f: self.color_classifier.labels[i] for f, i in zip(suit_fields, best)}
+        self.dealer_distances = dict(zip(button_fields, distances[len(suit_fields):, n_suits]))
+
+    def field_suit(self, field):
+        if not self.suits:
+            self.classify_colors()
+        return self.suits[field]
 
-    def extract_cards_with_suits(self, text_list, suit_region, max_cards=1):
-        valid_values = ["A", "K", "Q", "J", "10", "9", "8", "7", "6", "5", "4", "3", "2"]
+    def extract_card(self, text_list, suit_field):
+        # The first text that reads as a rank, combined with the region's suit into a Card
         for text in text_list:
             clean = text.strip()
             if clean == '0':
                 clean = 'Q'
-            if clean in valid_values:
-                suit = self.detect_suit_from_region(suit_region)
-                return [f"{clean}{suit}"]
-        return []
+            if clean in RANK_LABELS:
+                return card_from_label(clean, self.field_suit(suit_field))
+        return None
 
     def extract_hero_cards(self):
-        def extract_card(region):
-            text = self.extract_text(self.capture_screen(region))
-            for val in text:
-                val = val.strip()
-                if val == '0': val = 'Q'
-                if val in ["A", "K", "Q", "J", "10", "9", "8", "7", "6", "5", "4", "3", "2"]:
-                    return val
-            return None
-
-        card1 = extract_card(HERO_CARD_1)
-        card2 = extract_card(HERO_CARD_2)
-        suit1 = self.detect_suit_from_region(SUIT_HERO_1) if card1 else ""
-        suit2 = self.detect_suit_from_region(SUIT_HERO_2) if card2 else ""
         cards = []
-        if card1: cards.append(f"{card1}{suit1}")
-        if card2: cards.append(f"{card2}{suit2}")
-        return cards
+        for field, suit_field in (("HERO_CARD_1", "SUIT_HERO_1"), ("HERO_CARD_2", "SUIT_HERO_2")):
+            text = self.field_text(field)
+            card = self.extract_card(text, suit_field)
+            if card is None:
+                self.misread(field, text)
+            else:
+                cards.append(card)
+        return Hand(cards)
 
     def extract_bankrolls(self):
-        return {
-            "Hero": self.extract_single_value(BANK_HERO),
-            "Player 2": self.extract_single_value(BANK_PLAYER_2),
-            "Player 3": self.extract_single_value(BANK_PLAYER_3),
-            "Player 4": self.extract_single_value(BANK_PLAYER_4),
-            "Player 5": self.extract_single_value(BANK_PLAYER_5),
-            "Player 6": self.extract_single_value(BANK_PLAYER_6),
-            "Player 7": self.extract_single_value(BANK_PLAYER_7),
-        }
+        return {p: self.extract_field_value(field) for p, field in BANK_FIELDS.items()}
 
     def extract_vpips(self):
-        players = {
-            "Hero": VPIP_HERO,
-            "Player 2": VPIP_PLAYER_2,
-            "Player 3": VPIP_PLAYER_3,
-            "Player 4": VPIP_PLAYER_4,
-            "Player 5": VPIP_PLAYER_5,
-            "Player 6": VPIP_PLAYER_6,
-            "Player 7": VPIP_PLAYER_7,
-        }
-        return {p: self.extract_single_value(region) + "%" for p, region in players.items()}
+        return {p: self.extract_field_value(field) + "%" for p, field in VPIP_FIELDS.items()}
 
     def detect_dealer_position(self):
-        dealer_color = (99, 182, 231)
-        positions_regions = {
-            "Hero": POSITION_HERO,
-            "Player 2": POSITION_PLAYER_2,
-            "Player 3": POSITION_PLAYER_3,
-            "Player 4": POSITION_PLAYER_4,
-            "Player 5": POSITION_PLAYER_5,
-            "Player 6": POSITION_PLAYER_6,
-            "Player 7": POSITION_PLAYER_7,
-        }
-
-        def color_distance(c1, c2):
-            return np.sqrt(np.sum((np.array(c1) - np.array(c2)) ** 2))
-
-        distances = {}
-        for player, region in positions_regions.items():
-            img = self.capture_screen(region, color=True)
-            avg_color = np.mean(img.reshape(-1, 3), axis=0)
-            distances[player] = color_distance(avg_color, dealer_color)
+        if not self.dealer_distances:
+            self.classify_colors()
+        distances = {p: self.dealer_distances[field] for p, field in POSITION_FIELDS.items()}
 
         dealer_player = min(distances, key=distances.get)
-        player_order = ["Hero", "Player 2", "Player 3", "Player 4", "Player 5", "Player 6", "Player 7"]
+        player_order = PLAYERS
         dealer_index = player_order.index(dealer_player)
 
         position_labels = ["BTN", "SB", "BB", "UTG", "MP", "CO", "HJ"]
@@ -147,17 +253,8 @@ class OCR:
 
     def extract_player_actions(self):
         actions = {}
-        regions = {
-            "Hero": ACTION_HERO,
-            "Player 2": ACTION_2,
-            "Player 3": ACTION_3,
-            "Player 4": ACTION_4,
-            "Player 5": ACTION_5,
-            "Player 6": ACTION_6,
-            "Player 7": ACTION_7,
-        }
-        for player, region in regions.items():
-            text = self.extract_text(self.capture_screen(region))
+        for player, field in ACTION_FIELDS.items():
+            text = self.field_text(field)
             action = "Unknown"
             for word in text:
                 word = word.lower()
@@ -167,36 +264,45 @@ class OCR:
                     action = "Raise"
                 elif "fold" in word:
                     action = "Fold"
+                elif "check" in word:
+                    action = "Check"
             actions[player] = action
         return actions
 
     def extract_bet_sizes(self):
-        return {
-            "Hero": self.extract_single_value(BET_AMOUNT_HERO),
-            "Player 2": self.extract_single_value(BET_AMOUNT_2),
-            "Player 3": self.extract_single_value(BET_AMOUNT_3),
-            "Player 4": self.extract_single_value(BET_AMOUNT_4),
-            "Player 5": self.extract_single_value(BET_AMOUNT_5),
-            "Player 6": self.extract_single_value(BET_AMOUNT_6),
-            "Player 7": self.extract_single_value(BET_AMOUNT_7),
-        }
+        return {p: self.extract_field_value(field) for p, field in BET_FIELDS.items()}
 
-    def parse_text(self, pot_text):
+    def process_frame(self, frame):
+        # Recognize one captured frame into a state dict without touching game_state
+        with metrics.timer("ocr_stage_seconds", stage="frame"):
+            self.use_frame(frame)
+            self.read_fields()
+            with metrics.timer("ocr_stage_seconds", stage="parse"):
+                return self.build_state(self.field_text("POT_REGION"))
+
+    def misread(self, field, text):
+        # Text was recognized in the region but did not parse as the expected value
+        if text:
+            metrics.count("ocr_misreads", field=field)
+
+    def build_state(self, pot_text):
         pot_size = self.extract_pot_value(pot_text)
-        board_regions = [BOARD_CARD_1, BOARD_CARD_2, BOARD_CARD_3, BOARD_CARD_4, BOARD_CARD_5]
-        suit_regions = [SUIT_CARD_1, SUIT_CARD_2, SUIT_CARD_3, SUIT_CARD_4, SUIT_CARD_5]
+        if pot_size is None:
+            self.misread("POT_REGION", pot_text)
         board_cards = []
 
         for i in range(5):
-            text = self.extract_text(self.capture_screen(board_regions[i]))
-            card = self.extract_cards_with_suits(text, suit_regions[i])
-            if card:
-                board_cards.extend(card)
+            text = self.field_text(BOARD_CARD_FIELDS[i])
+            card = self.extract_card(text, SUIT_CARD_FIELDS[i])
+            if card is not None:
+                board_cards.append(card)
+            else:
+                self.misread(BOARD_CARD_FIELDS[i], text)
 
         if len(board_cards) < 3:
-            self.previous_board = []
-        elif len(board_cards) >= len(self.previous_board):
-            self.previous_board = board_cards[:5]
+            self.previous_board = EMPTY_BOARD
+        elif len(board_cards) >= len(self.previous_board) and tuple(board_cards[:5]) != self.previous_board.cards:
+            self.previous_board = Board(board_cards[:5])
 
         self.previous_pot = pot_size if pot_size else "N/A"
         hero_cards = self.extract_hero_cards()
@@ -206,31 +312,50 @@ class OCR:
         self.positions = self.detect_dealer_position()
         self.actions = self.extract_player_actions()
         self.bets = self.extract_bet_sizes()
+        state = {
+            "pot": self.previous_pot,
+            "board": self.previous_board,
+            "hero_cards": hero_cards,
+            "bankrolls": self.bankrolls,
+            "positions": self.positions,
+            "vpips": self.vpips,
+            "actions": self.actions,
+            "bets": self.bets,
+        }
+        self.scheduler.observe(state, self.frame.clock if self.frame is not None else None)
+        return state
 
-        self.game_state.update_pot(self.previous_pot)
-        self.game_state.update_board(self.previous_board)
-        self.game_state.update_hero_cards(hero_cards)
+    def publish(self, state, captured_at=None):
+        # The whole tick lands as one GameState version
+        self.game_state.apply_state(state, captured_at)
+
+    def parse_text(self, pot_text):
+        self.publish(self.build_state(pot_text), self.frame.timestamp if self.frame is not None else None)
+
+    def close(self):
+        # Keeps the warm recognition cache for the next run
+        if self.cache is not None:
+            self.cache.save()
 
     def display_game_state(self):
-        print(f"\n--- GAME STATE ---")
-        print(f"Pot: {self.game_state.pot}")
-        print(f"Board: {', '.join(self.game_state.board) if self.game_state.board else 'N/A'}")
-        print(f"Hero Cards: {', '.join(self.game_state.hero_cards) if self.game_state.hero_cards else 'N/A'}")
+        lines = ["--- GAME STATE ---",
+                 f"Pot: {self.game_state.pot}",
+                 f"Board: {', '.join(self.game_state.board.labels()) if self.game_state.board else 'N/A'}",
+                 f"Hero Cards: {', '.join(self.game_state.hero_cards.labels()) if self.game_state.hero_cards else 'N/A'}"]
         for player in self.bankrolls:
-            print(f"{player}:")
-            print(f"  Bankroll: {self.bankrolls[player]}")
-            print(f"  VPIP: {self.vpips.get(player, 'N/A')}")
-            print(f"  Position: {self.positions.get(player, 'Unknown')}")
-            print(f"  Action: {self.actions.get(player, 'Unknown')}")
-            print(f"  Bet: {self.bets.get(player, 'N/A')}")
+            lines += [f"{player}:",
+                      f"  Bankroll: {self.bankrolls[player]}",
+                      f"  VPIP: {self.vpips.get(player, 'N/A')}",
+                      f"  Position: {self.positions.get(player, 'Unknown')}",
+                      f"  Action: {self.actions.get(player, 'Unknown')}",
+                      f"  Bet: {self.bets.get(player, 'N/A')}"]
+        log_debug("\n".join(lines))
 
     def start(self):
-        print("Starting OCR loop...")
+        log_info("Starting OCR loop...")
         while True:
-            pot_img = self.capture_screen(POT_REGION)
-            pot_text = self.extract_text(pot_img)
-
-            self.parse_text(pot_text)
+            frame = self.grab_frame()
+            self.publish(self.process_frame(frame), frame.timestamp)
             self.display_game_state()
 
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from instrumentation import metrics
+from utlis import log_info
+from config import OCR_CACHE_SIZE, OCR_CACHE_PATH
+
+CACHE_VERSION = 1
+
+def crop_key(image, kind="crop"):
+    # Hash of the crop binarized with Otsu's threshold, text as set bits, so the same
+    # glyphs over a slightly different background or brightness share a key
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, bits = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if np.count_nonzero(bits) * 2 > bits.size:
+        # The background is the majority, whichever way the text is drawn
+        bits ^= 1
+    digest = hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16)
+    digest.update(np.array(bits.shape, dtype=np.int32).tobytes())
+    return f"{kind}:{digest.hexdigest()}"
+
+# Recognized text per crop key, so a crop seen before (a bankroll, "Fold", a VPIP, a rank
+# glyph) costs a hash and a lookup instead of an inference. Holds at most max_entries,
+# evicting the least recently used; shared by recognizer threads, hence the lock.
+class RecognitionCache:
+    def __init__(self, max_entries=OCR_CACHE_SIZE, path=OCR_CACHE_PATH):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def load(cls, path=OCR_CACHE_PATH, max_entries=OCR_CACHE_SIZE):
+        # A cache warmed from the file at path when there is one
+        cache = cls(max_entries, path)
+        if not path or not os.path.exists(path):
+            return cache
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log_info(f"Ignoring unreadable OCR cache '{path}': {e}")
+            return cache
+        if data.get("version") == CACHE_VERSION:
+            for key, texts in data["entries"][-max_entries:]:
+                cache.entries[key] = tuple(texts)
+        log_info(f"Loaded {len(cache)} cached OCR results from '{path}'")
+        return cache
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            entries = [[key, list(texts)] for key, texts in self.entries.items()]
+        # Written aside and renamed, so an interrupted save leaves the old file intact
+        with open(path + ".tmp", "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+        os.replace(path + ".tmp", path)
+
+    def get(self, key):
+        # The cached texts as a new list, or None
+        with self.lock:
+            texts = self.entries.get(key)
+            if texts is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+        metrics.count("ocr_result_cache_misses" if texts is None else "ocr_result_cache_hits")
+        return None if texts is None else list(texts)
+
+    def put(self, key, texts):
+        with self.lock:
+            self.entries[key] = tuple(texts)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
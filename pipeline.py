@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from instrumentation import metrics
+from utlis import log_info, log_error
+from config import CAPTURE_INTERVAL, PIPELINE_QUEUE_SIZE, PIPELINE_STATS_WINDOW, PIPELINE_REPORT_INTERVAL
+
+# Marks the end of a finite frame source as it passes down the stages
+END = object()
+
+# Bounded queue whose producer never blocks: when full, the oldest item is dropped
+class LatestQueue(queue.Queue):
+    def __init__(self, maxsize=PIPELINE_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item):
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+class StageStats:
+    def __init__(self, name, window=PIPELINE_STATS_WINDOW):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+        self.durations = deque(maxlen=window)
+
+    def record(self, duration):
+        metrics.observe("pipeline_stage_seconds", duration, stage=self.name)
+        self.items += 1
+        self.busy += duration
+        self.durations.append(duration)
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        durations = np.array(self.durations) * 1000 if self.durations else np.zeros(1)
+        return {
+            "items": self.items,
+            "rate": self.items / elapsed,
+            "utilization": self.busy / elapsed,
+            "mean_ms": float(durations.mean()),
+            "p95_ms": float(np.percentile(durations, 95)),
+        }
+
+# Capture, recognition and publication each run on their own thread. The queues between
+# them hold only the newest item, so a slow recognition pass skips stale frames instead
+# of falling further behind.
+class Pipeline:
+    def __init__(self, ocr, frame_source=None, interval=CAPTURE_INTERVAL, queue_size=PIPELINE_QUEUE_SIZE,
+                 report_interval=PIPELINE_REPORT_INTERVAL, on_publish=None):
+        self.ocr = ocr
+        self.frame_source = frame_source or ocr.frame_source
+        self.interval = interval
+        self.report_interval = report_interval
+        self.on_publish = on_publish
+        self.frames = LatestQueue(queue_size)
+        self.states = LatestQueue(queue_size)
+        self.stages = {name: StageStats(name) for name in ("capture", "recognize", "publish")}
+        self.latencies = deque(maxlen=PIPELINE_STATS_WINDOW)
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for name, target in (("capture", self._capture), ("recognize", self._recognize), ("publish", self._publish)):
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def _take(self, source):
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return END
+
+    def _finish(self, target):
+        # Unlike data items, END waits for room so it never displaces the last state
+        while not self.stop_event.is_set():
+            try:
+                target.put(END, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _capture(self):
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                frame = self.frame_source.grab()
+            except Exception as e:
+                log_error(f"Capture failed: {e}")
+                self.stop_event.wait(self.interval)
+                continue
+            if frame is None:
+                self._finish(self.frames)
+                return
+            self.frames.put_latest(frame)
+            elapsed = time.perf_counter() - started
+            self.stages["capture"].record(elapsed)
+            self.stop_event.wait(max(self.interval - elapsed, 0.0))
+
+    def _recognize(self):
+        while True:
+            frame = self._take(self.frames)
+            if frame is END:
+                self._finish(self.states)
+                return
+            started = time.perf_counter()
+            try:
+                state = self.ocr.process_frame(frame)
+            except Exception as e:
+                log_error(f"Recognition failed: {e}")
+                continue
+            self.states.put_latest((frame.timestamp, state))
+            self.stages["recognize"].record(time.perf_counter() - started)
+
+    def _publish(self):
+        last_report = time.perf_counter()
+        while True:
+            item = self._take(self.states)
+            if item is END:
+                return
+            captured_at, state = item
+            started = time.perf_counter()
+            self.ocr.publish(state, captured_at)
+            if self.on_publish is not None:
+                self.on_publish(state, captured_at)
+            self.stages["publish"].record(time.perf_counter() - started)
+            # Frame timestamps come from time.time(), so end-to-end latency uses the same clock
+            latency = time.time() - captured_at
+            self.latencies.append(latency)
+            metrics.observe("pipeline_latency_seconds", latency)
+            if self.report_interval and time.perf_counter() - last_report >= self.report_interval:
+                self.report()
+                last_report = time.perf_counter()
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "stages": {name: stage.summary() for name, stage in self.stages.items()},
+            "dropped": {"frames": self.frames.dropped, "states": self.states.dropped},
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "max": float(latencies.max()),
+            },
+        }
+
+    def report(self):
+        stats = self.stats()
+        for name, stage in stats["stages"].items():
+            log_info(f"{name}: {stage['rate']:.1f}/s, {stage['mean_ms']:.1f} ms mean, "
+                     f"{stage['p95_ms']:.1f} ms p95, {stage['utilization']:.0%} busy")
+        latency = stats["latency_ms"]
+        log_info(f"End-to-end latency: {latency['p50']:.0f} ms p50, {latency['p95']:.0f} ms p95; "
+                 f"dropped {stats['dropped']['frames']} frames, {stats['dropped']['states']} states")
+        if getattr(self.ocr, "scheduler", None) is not None:
+            self.ocr.scheduler.report()
+        if getattr(self.ocr, "cache", None) is not None:
+            cache = self.ocr.cache.stats()
+            log_info(f"OCR result cache: {cache['entries']} entries, {cache['hit_rate']:.0%} hits "
+                     f"({cache['hits']}/{cache['hits'] + cache['misses']}), {cache['evictions']} evicted")
@@ -0,0 +1,232 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config import PLAYER_STATS_PATH, STATS_BATCH_HANDS, STATS_CACHE_SIZE
+
+# Per-player counters; the percentages are derived from them on read
+COUNTERS = ["hands", "vpip", "pfr", "three_bet", "three_bet_opportunities", "aggressive", "passive"]
+
+def summarize_hand(events):
+    # Counter increments per player for one hand's events (see hand_history.HandTracker).
+    # A hand without a single action is no hand (e.g. a misread boundary) and counts nothing.
+    if not any(e["type"] == "action" for e in events):
+        return {}
+    start = next((e for e in events if e["type"] == "new_hand"), None)
+    players = start["players"] if start else sorted({e["player"] for e in events if e["type"] == "action"})
+    summary = {p: dict.fromkeys(COUNTERS, 0) for p in players}
+    raises = 0
+    for p in players:
+        summary[p]["hands"] = 1
+    for event in events:
+        if event["type"] != "action":
+            continue
+        counts = summary.setdefault(event["player"], dict.fromkeys(COUNTERS, 0))
+        action = event["action"]
+        if event["street"] == "preflop":
+            if raises == 1 and not counts["three_bet_opportunities"]:
+                counts["three_bet_opportunities"] = 1
+                if action == "Raise":
+                    counts["three_bet"] = 1
+            if action in ("Call", "Raise"):
+                counts["vpip"] = 1
+            if action == "Raise":
+                counts["pfr"] = 1
+                raises += 1
+        elif action == "Raise":
+            counts["aggressive"] += 1
+        elif action == "Call":
+            counts["passive"] += 1
+    return summary
+
+class PlayerStats:
+    def __init__(self, name, counts):
+        self.name = name
+        self.counts = counts
+
+    def ratio(self, part, whole):
+        return self.counts[part] / self.counts[whole] if self.counts[whole] else None
+
+    @property
+    def hands(self):
+        return self.counts["hands"]
+
+    @property
+    def vpip(self):
+        return self.ratio("vpip", "hands")
+
+    @property
+    def pfr(self):
+        return self.ratio("pfr", "hands")
+
+    @property
+    def three_bet(self):
+        return self.ratio("three_bet", "three_bet_opportunities")
+
+    @property
+    def aggression(self):
+        # Postflop raises per call
+        return self.ratio("aggressive", "passive")
+
+    def __repr__(self):
+        def pct(value):
+            return "--" if value is None else f"{value:.0%}"
+        return (f"{self.name}: {self.hands} hands, VPIP {pct(self.vpip)}, PFR {pct(self.pfr)}, "
+                f"3bet {pct(self.three_bet)}, AF {'--' if self.aggression is None else f'{self.aggression:.1f}'}")
+
+def new_session():
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+# SQLite (WAL) store of per-player counters. Finished hands are summed in memory and
+# written as one upsert batch every STATS_BATCH_HANDS hands; a small LRU of players
+# keeps per-tick lookups off the database.
+# OCR only sees seat labels ("Player 3"), and a seat holds different people from one
+# session to the next, so rows are keyed by session and seat and lookups only see the
+# current session.
+class PlayerStatsStore:
+    def __init__(self, path=PLAYER_STATS_PATH, batch_hands=STATS_BATCH_HANDS, cache_size=STATS_CACHE_SIZE,
+                 session=None):
+        self.session = session or new_session()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in COUNTERS)
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS seat_stats (session TEXT NOT NULL, name TEXT NOT NULL, "
+                        f"{columns}, last_seen REAL, PRIMARY KEY (session, name))")
+        self.db.commit()
+        self.lock = threading.Lock()
+        self.batch_hands = batch_hands
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.pending_hands = 0
+        self.current = {}
+        assignments = ", ".join(f"{c} = {c} + excluded.{c}" for c in COUNTERS)
+        self.upsert = (f"INSERT INTO seat_stats (session, name, {', '.join(COUNTERS)}, last_seen) "
+                       f"VALUES (?, ?, {', '.join('?' * len(COUNTERS))}, ?) "
+                       f"ON CONFLICT(session, name) DO UPDATE SET {assignments}, last_seen = excluded.last_seen")
+        self.hits = self.misses = 0
+
+    def on_event(self, event):
+        # HandTracker callback: a hand is summarized once the next one starts on its table.
+        # Seats of other tables are other people, so they are kept apart as "table/seat".
+        table = event.get("table")
+        if event["type"] == "new_hand":
+            previous = self.current.pop(table, None)
+            if previous:
+                summary = summarize_hand(previous)
+                if table is not None:
+                    summary = {f"{table}/{name}": counts for name, counts in summary.items()}
+                self.add_summary(summary)
+        self.current.setdefault(table, []).append(event)
+
+    def add_summary(self, summary, seen=None):
+        if not summary:
+            return
+        seen = time.time() if seen is None else seen
+        with self.lock:
+            for name, counts in summary.items():
+                pending = self.pending.get(name)
+                if pending is None:
+                    self.pending[name] = [dict(counts), seen]
+                else:
+                    for c in COUNTERS:
+                        pending[0][c] += counts[c]
+                    pending[1] = seen
+                cached = self.cache.get(name)
+                if cached is not None:
+                    for c in COUNTERS:
+                        cached[c] += counts[c]
+            self.pending_hands += 1
+            if self.pending_hands >= self.batch_hands:
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            rows = [(self.session, name, *(counts[c] for c in COUNTERS), seen)
+                    for name, (counts, seen) in self.pending.items()]
+            with self.db:
+                self.db.executemany(self.upsert, rows)
+        self.pending = {}
+        self.pending_hands = 0
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def get(self, name):
+        with self.lock:
+            counts = self.cache.get(name)
+            if counts is not None:
+                self.cache.move_to_end(name)
+                self.hits += 1
+                return PlayerStats(name, dict(counts))
+            self.misses += 1
+            row = self.db.execute(f"SELECT {', '.join(COUNTERS)} FROM seat_stats WHERE session = ? AND name = ?",
+                                  (self.session, name)).fetchone()
+            counts = dict(zip(COUNTERS, row)) if row else dict.fromkeys(COUNTERS, 0)
+            pending = self.pending.get(name)
+            if pending is not None:
+                for c in COUNTERS:
+                    counts[c] += pending[0][c]
+            self.cache[name] = counts
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return PlayerStats(name, dict(counts))
+
+    def __len__(self):
+        self.flush()
+        return self.db.execute("SELECT COUNT(*) FROM seat_stats WHERE session = ?", (self.session,)).fetchone()[0]
+
+    def close(self):
+        # The hand in progress is dropped: it never finished, so it would skew the ratios
+        self.current = {}
+        self.flush()
+        self.db.close()
+
+def benchmark(path, hands, players, seed=0):
+    # Synthetic 6-max hands over a player pool; lookups follow a skewed (Zipf) popularity
+    rng = np.random.default_rng(seed)
+    names = [f"player{i}" for i in range(players)]
+    seats = rng.integers(players, size=(hands, 6))
+    flags = rng.random((hands, 6, 4))
+    store = PlayerStatsStore(path)
+    started = time.perf_counter()
+    for h in range(hands):
+        summary = {}
+        for s in range(6):
+            vpip, pfr, agg, passive = flags[h, s]
+            summary[names[seats[h, s]]] = {
+                "hands": 1, "vpip": int(vpip < 0.25), "pfr": int(pfr < 0.15), "three_bet": int(pfr < 0.05),
+                "three_bet_opportunities": int(pfr < 0.4), "aggressive": int(agg < 0.3), "passive": int(passive < 0.3),
+            }
+        store.add_summary(summary, seen=float(h))
+    store.flush()
+    ingest = time.perf_counter() - started
+    print(f"Ingested {hands} hands in {ingest:.1f}s ({hands / ingest:,.0f} hands/s), {len(store)} players")
+
+    lookups = np.minimum(rng.zipf(1.3, size=100000) - 1, players - 1)
+    times = np.empty(len(lookups))
+    for i, p in enumerate(lookups):
+        t = time.perf_counter()
+        store.get(names[p])
+        times[i] = time.perf_counter() - t
+    times *= 1e6
+    print(f"Lookups: p50 {np.percentile(times, 50):.1f} us, p99 {np.percentile(times, 99):.1f} us, "
+          f"cache hit rate {store.hits / (store.hits + store.misses):.1%}")
+    print(store.get(names[0]))
+    store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the player stats store with synthetic hands")
+    parser.add_argument("--path", default="player_stats_bench.db")
+    parser.add_argument("--hands", type=int, default=1000000)
+    parser.add_argument("--players", type=int, default=20000)
+    args = parser.parse_args()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.path + suffix):
+            os.remove(args.path + suffix)
+    benchmark(args.path, args.hands, args.players)
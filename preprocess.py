@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+from capture import Frame
+from instrumentation import metrics
+from config import TEXT_FIELDS, OCR_SCALE, OCR_FIELD_SCALES, OCR_CANVAS_WIDTH
+
+CANVAS_PADDING = 4
+
+def field_scale(name, scales=OCR_FIELD_SCALES, default=OCR_SCALE):
+    # Upscale factor of a field, by the name prefix of its family (e.g. "BANK_")
+    return next((scale for prefix, scale in scales.items() if name.startswith(prefix)), default)
+
+def pack(sizes, width):
+    # Shelf packing of (w, h) slots into rows of at most `width`; returns the slot
+    # positions and the canvas size
+    x = y = row_height = 0
+    positions = []
+    for w, h in sizes:
+        if x and x + w > width:
+            x, y, row_height = 0, y + row_height + CANVAS_PADDING, 0
+        positions.append((x, y))
+        x += w + CANVAS_PADDING
+        row_height = max(row_height, h)
+    return positions, (max(width, max((w for w, _ in sizes), default=0)), y + row_height)
+
+# Converts each frame to grey once into a reused buffer, and upscales text regions into
+# fixed slots of one preallocated canvas, each at its family's scale. Extractors read
+# views of these buffers instead of converting and resizing their own crops. A field is
+# resized at most once per frame, and only when asked for (i.e. when it changed).
+class FramePreprocessor:
+    def __init__(self, regions, fields=TEXT_FIELDS, scales=OCR_FIELD_SCALES, default_scale=OCR_SCALE,
+                 canvas_width=OCR_CANVAS_WIDTH):
+        self.regions = regions
+        self.gray = None
+        self.frame = None
+        self.gray_frame = None
+        self.resized = set()
+        sizes, self.scales = [], {}
+        for name in fields:
+            x1, y1, x2, y2 = regions[name]
+            scale = field_scale(name, scales, default_scale)
+            self.scales[name] = scale
+            sizes.append((max(round((x2 - x1) * scale), 1), max(round((y2 - y1) * scale), 1)))
+        positions, (width, height) = pack(sizes, canvas_width)
+        self.canvas = np.zeros((height, width), dtype=np.uint8)
+        # Box per field in the canvas, as [x_min, x_max, y_min, y_max] like easyocr expects
+        self.boxes = {name: [x, x + w, y, y + h] for name, (x, y), (w, h) in zip(fields, positions, sizes)}
+
+    def use_frame(self, frame):
+        with metrics.timer("ocr_preprocess_seconds", step="gray"):
+            shape = frame.image.shape[:2]
+            if self.gray is None or self.gray.shape != shape:
+                self.gray = np.empty(shape, dtype=np.uint8)
+            if frame.image.ndim == 3:
+                cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY, dst=self.gray)
+            else:
+                self.gray[...] = frame.image
+        self.frame = frame
+        self.gray_frame = Frame(self.gray, frame.timestamp, frame.origin)
+        self.resized = set()
+        return self
+
+    def text_boxes(self, names):
+        # Upscales the named fields into their canvas slots; returns the canvas and
+        # each field's box in it
+        with metrics.timer("ocr_preprocess_seconds", step="upscale"):
+            for name in names:
+                if name in self.resized:
+                    continue
+                x_min, x_max, y_min, y_max = self.boxes[name]
+                cv2.resize(self.gray_frame.roi(self.regions[name]), (x_max - x_min, y_max - y_min),
+                           dst=self.canvas[y_min:y_max, x_min:x_max], interpolation=cv2.INTER_LINEAR)
+                self.resized.add(name)
+        return self.canvas, {name: self.boxes[name] for name in names}
+
+    def field_image(self, name):
+        # One field's upscaled grey crop, a view into the canvas
+        _, boxes = self.text_boxes([name])
+        x_min, x_max, y_min, y_max = boxes[name]
+        return self.canvas[y_min:y_max, x_min:x_max]
+
+    @classmethod
+    def for_frame(cls, frame, fields, default_scale=OCR_SCALE):
+        # One-off preprocessing of arbitrary regions (warm-up, benchmarks)
+        return cls(fields, list(fields), default_scale=default_scale).use_frame(frame)
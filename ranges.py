@@ -0,0 +1,196 @@
+import re
+import time
+from collections import OrderedDict
+from itertools import combinations
+import numpy as np
+from cards import RANKS, HOLE_COMBOS, card_rank, card_suit, parse_cards, combo_index, canonical_board, remap_combos
+from equity import COMBOS
+from hand_evaluator import evaluate_many
+from config import RANGE_CACHE_SIZE, RANGE_RUNOUT_SAMPLES
+
+N_COMBOS = len(HOLE_COMBOS)
+# Card sets as 52-bit masks: bit c is set when card c is in the set
+COMBO_MASKS = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+# DISJOINT[i, j]: combos i and j can be dealt together
+DISJOINT = (COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) == 0
+
+def card_mask(cards):
+    mask = 0
+    for c in cards:
+        mask |= 1 << c
+    return mask
+
+def live_combos(board):
+    # Combos that do not use a board card
+    return (COMBO_MASKS & np.uint64(card_mask(board))) == 0
+
+# ---------------------------------------------------------------------------#
+# Range notation
+
+HAND_PATTERN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)$")
+
+def class_combos(hi, lo, kind=""):
+    # Combo indices of one hand class: a pair, or hi/lo ranks suited ("s"), offsuit ("o") or both
+    combos = []
+    for c1, c2 in HOLE_COMBOS:
+        ranks = sorted((card_rank(c1), card_rank(c2)), reverse=True)
+        if ranks != [hi, lo]:
+            continue
+        suited = card_suit(c1) == card_suit(c2)
+        if hi == lo or not kind or suited == (kind == "s"):
+            combos.append(combo_index(c1, c2))
+    return combos
+
+def parse_hand_class(text):
+    match = HAND_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Bad hand class {text!r}")
+    hi, lo = sorted((RANKS.index(match.group(1)), RANKS.index(match.group(2))), reverse=True)
+    kind = match.group(3)
+    if hi == lo and kind:
+        raise ValueError(f"Bad hand class {text!r}")
+    return hi, lo, kind
+
+def expand_token(token):
+    # One comma separated range element as a list of combo indices
+    if token.lower() in ("random", "any"):
+        return list(range(N_COMBOS))
+    if "-" in token:
+        first, last = (parse_hand_class(part) for part in token.split("-"))
+        (hi1, lo1, kind1), (hi2, lo2, kind2) = first, last
+        if hi1 == lo1 and hi2 == lo2:
+            return [i for r in range(min(hi1, hi2), max(hi1, hi2) + 1) for i in class_combos(r, r)]
+        if kind1 == kind2 and hi1 == hi2:
+            return [i for r in range(min(lo1, lo2), max(lo1, lo2) + 1) for i in class_combos(hi1, r, kind1)]
+        # Connectors and gappers ("T9s-76s") keep the gap while both ranks step down
+        if kind1 == kind2 and hi1 - lo1 == hi2 - lo2:
+            gap = hi1 - lo1
+            return [i for r in range(min(hi1, hi2), max(hi1, hi2) + 1) for i in class_combos(r, r - gap, kind1)]
+        raise ValueError(f"Bad range {token!r}")
+    if token.endswith("+"):
+        hi, lo, kind = parse_hand_class(token[:-1])
+        if hi == lo:
+            return [i for r in range(hi, 13) for i in class_combos(r, r)]
+        return [i for r in range(lo, hi) for i in class_combos(hi, r, kind)]
+    if HAND_PATTERN.match(token):
+        return class_combos(*parse_hand_class(token))
+    try:
+        cards = parse_cards(token)
+    except ValueError:
+        cards = []
+    if len(cards) != 2 or cards[0] == cards[1]:
+        raise ValueError(f"Bad range element {token!r}")
+    return [combo_index(*cards)]
+
+def parse_range(text):
+    # Standard notation ("QQ+, AKs, AJo+, KQ, T9s-76s, AhKh, 22-55:0.5") to a 1326 weight
+    # vector; a later element overrides the weight an earlier one gave the same combo
+    weights = np.zeros(N_COMBOS)
+    for token in text.replace(" ", "").split(","):
+        if not token:
+            continue
+        token, _, weight = token.partition(":")
+        weights[expand_token(token)] = float(weight) if weight else 1.0
+    return weights
+
+# ---------------------------------------------------------------------------#
+# Range vs range
+
+def runout_boards(board, samples, seed=0):
+    # Every completion of the board, or `samples` of them drawn without replacement
+    # when there are more (the flop and preflop)
+    dead = card_mask(board)
+    deck = [c for c in range(52) if not dead >> c & 1]
+    missing = 5 - len(board)
+    runouts = list(combinations(deck, missing))
+    if len(runouts) > samples:
+        rng = np.random.default_rng(seed)
+        runouts = [runouts[i] for i in rng.choice(len(runouts), samples, replace=False)]
+    return [list(board) + list(r) for r in runouts]
+
+def equity_matrix(board, samples=RANGE_RUNOUT_SAMPLES):
+    # (1326, 1326) float32 equity of the row combo against the column combo, averaged over
+    # the runouts both can see; 0 for pairs that share a card or touch the board
+    boards = runout_boards(board, samples, seed=card_mask(board))
+    score = np.zeros((N_COMBOS, N_COMBOS), dtype=np.uint16)
+    seen = np.zeros((len(boards), N_COMBOS), dtype=np.float32)
+    for k, full in enumerate(boards):
+        live = live_combos(full)
+        values = np.full(N_COMBOS, -1, dtype=np.int64)
+        values[live] = evaluate_many(np.concatenate(
+            [COMBOS[live], np.broadcast_to(np.array(full, dtype=np.int8), (live.sum(), 5))], axis=1))
+        # 2 per win and 1 per tie, so the sum stays integral
+        ahead = (values[:, None] > values[None, :]).view(np.uint8) * np.uint8(2)
+        ahead += values[:, None] == values[None, :]
+        ahead[~live] = 0
+        ahead[:, ~live] = 0
+        score += ahead
+        seen[k] = live
+    if len(boards) == 1:
+        counts = np.outer(seen[0], seen[0])
+    else:
+        counts = seen.T @ seen
+    counts *= DISJOINT
+    return np.divide(score, 2 * counts, out=np.zeros(counts.shape, dtype=np.float32), where=counts > 0)
+
+class RangeResult:
+    def __init__(self, equity, combo_equities, weight):
+        self.equity = equity
+        self.combo_equities = combo_equities
+        self.weight = weight
+
+    def __repr__(self):
+        return f"RangeResult({self.equity:.4f}, weight={self.weight:.1f})"
+
+# Range-vs-range equity from per-board matrices. A matrix is built for the suit-canonical
+# board and relabelled for every isomorphic board, so e.g. all 4 monotone versions of
+# a flop share one cache entry.
+class RangeEngine:
+    def __init__(self, cache_size=RANGE_CACHE_SIZE, samples=RANGE_RUNOUT_SAMPLES):
+        self.cache_size = cache_size
+        self.samples = samples
+        self.cache = OrderedDict()
+
+    def matrix(self, board):
+        canonical, perm = canonical_board(board)
+        matrix = self.cache.get(canonical)
+        if matrix is None:
+            matrix = equity_matrix(canonical, self.samples)
+            self.cache[canonical] = matrix
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(canonical)
+        columns = remap_combos(perm)
+        return matrix[np.ix_(columns, columns)]
+
+    def equity(self, hero, villain, board):
+        # hero and villain are 1326 weight vectors (see parse_range). Each hero combo's
+        # equity is against the villain combos it does not block.
+        matrix = self.matrix(board)
+        live = live_combos(board)
+        hero = np.where(live, hero, 0.0)
+        villain = np.where(live, villain, 0.0)
+        possible = DISJOINT @ villain
+        wins = matrix @ villain
+        combo_equities = np.divide(wins, possible, out=np.full(N_COMBOS, np.nan), where=(possible > 0) & (hero > 0))
+        pair_weight = hero * possible
+        weight = pair_weight.sum()
+        equity = float((hero * wins).sum() / weight) if weight > 0 else float("nan")
+        return RangeResult(equity, combo_equities, float(weight))
+
+    def hand_equity(self, hand, villain, board):
+        # One hero hand (card ints) against a range
+        hero = np.zeros(N_COMBOS)
+        hero[combo_index(*hand)] = 1.0
+        return self.equity(hero, villain, board).equity
+
+if __name__ == "__main__":
+    engine = RangeEngine()
+    hero, villain = parse_range("random"), parse_range("random")
+    for text in ("As Kd 7h 2c 2d", "As Kd 7h 2c", "As Kd 7h"):
+        board = parse_cards(text)
+        for label in ("cold", "cached"):
+            started = time.perf_counter()
+            result = engine.equity(hero, villain, board)
+            print(f"{text:16s} {label:6s} {time.perf_counter() - started:.3f}s {result}")
@@ -0,0 +1,165 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import metrics
+from ocr_cache import crop_key
+from preprocess import FramePreprocessor
+from config import OCR_SCALE, OCR_BATCH_SIZE, RECOGNIZER_WORKERS
+
+MODEL_HEIGHT = 64  # easyocr's recognizer input height
+
+def _easyocr_internals():
+    # Imported on first use rather than with this module: easyocr pulls in torch
+    try:
+        from easyocr.recognition import get_text
+        from easyocr.utils import get_image_list
+    except ImportError:
+        return None, None
+    return get_text, get_image_list
+
+# Runs easyocr's recognizer over known boxes, skipping text detection entirely.
+# Reader.recognize() falls back to one box at a time on CPU, so when the
+# easyocr internals are importable the crops are batched here instead. With a
+# RecognitionCache (see ocr_cache.py), crops seen before are answered without inference.
+# One instance may serve several threads (see RecognizerPool): the reader's model runs
+# one batch at a time behind a lock, while cache lookups and preprocessing, which work
+# on each caller's own buffers, run concurrently.
+class BatchRecognizer:
+    def __init__(self, reader, scale=OCR_SCALE, batch_size=OCR_BATCH_SIZE, cache=None):
+        self.reader = reader
+        self.cache = cache
+        self.model_lock = threading.Lock()
+        self.scale = scale
+        self.batch_size = batch_size
+        self.ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        self.get_text, self.get_image_list = _easyocr_internals()
+
+    def _run(self, image, boxes):
+        if self.get_text is None:
+            return self.reader.recognize(image, horizontal_list=boxes, free_list=[],
+                                         batch_size=self.batch_size, detail=1)
+        # Similar aspect ratios share a batch so padding to the widest crop stays small
+        boxes = sorted(boxes, key=lambda b: (b[1] - b[0]) / max(b[3] - b[2], 1))
+        results = []
+        for i in range(0, len(boxes), self.batch_size):
+            image_list, max_width = self.get_image_list(boxes[i:i + self.batch_size], [], image,
+                                                        model_height=MODEL_HEIGHT, sort_output=False)
+            if not image_list:
+                continue
+            results += self.get_text(self.reader.character, MODEL_HEIGHT, int(max_width),
+                                     self.reader.recognizer, self.reader.converter, image_list,
+                                     self.ignore_char, 'greedy', 5, self.batch_size,
+                                     workers=0, device=self.reader.device)
+        return results
+
+    def recognize(self, frame, fields, use_cache=True):
+        # fields maps a field name to its screen region; returns name -> list of strings.
+        # frame is a Frame, or an OCR's FramePreprocessor already holding the tick's frame.
+        texts = {name: [] for name in fields}
+        if not fields:
+            return texts
+        if isinstance(frame, FramePreprocessor):
+            prepared = frame
+        else:
+            prepared = FramePreprocessor.for_frame(frame, fields, self.scale)
+        keys = {}
+        if use_cache and self.cache is not None:
+            # Keyed on the crop at capture resolution, so hits skip the upscale as well
+            with metrics.timer("ocr_result_cache_seconds"):
+                for name, region in fields.items():
+                    key = crop_key(prepared.gray_frame.roi(region))
+                    cached = self.cache.get(key)
+                    if cached is None:
+                        keys[name] = key
+                    else:
+                        texts[name] = cached
+            if not keys:
+                return texts
+        # Fields showing the same crop this tick (e.g. several "Fold" labels) are read once
+        firsts = {}
+        for name, key in keys.items():
+            firsts.setdefault(key, name)
+        image, boxes = prepared.text_boxes(list(firsts.values()) if keys else list(fields))
+        owners = {}
+        for name, box in boxes.items():
+            owners.setdefault((box[0], box[2]), []).append(name)
+        metrics.count("ocr_recognized_regions", len(boxes))
+        with metrics.timer("ocr_recognizer_lock_wait_seconds"):
+            self.model_lock.acquire()
+        try:
+            with metrics.timer("ocr_batch_recognize_seconds"):
+                results = self._run(image, list(boxes.values()))
+        finally:
+            self.model_lock.release()
+        for box, text, confidence in results:
+            text = text.strip()
+            if not text:
+                continue
+            for name in owners.get((box[0][0], box[0][1]), []):
+                texts[name].append(text)
+        for key, name in firsts.items():
+            self.cache.put(key, texts[name])
+        for name, key in keys.items():
+            if firsts[key] != name:
+                texts[name] = list(texts[firsts[key]])
+        return texts
+
+# One recognizer (and so one model copy) serving several tables from a few worker
+# threads. Each table's pipeline waits on its own request, so a table has at most one
+# request queued and the wait grows with tables / workers rather than without bound.
+# Inference is serialized inside the recognizer (torch already spreads one batch over
+# the cores); the workers overlap the rest: cropping, upscaling and cache lookups.
+# Each request carries its table's own FramePreprocessor, which that table's thread
+# leaves alone until the request completes.
+class RecognizerPool:
+    def __init__(self, reader, workers=RECOGNIZER_WORKERS, scale=OCR_SCALE, batch_size=OCR_BATCH_SIZE, cache=None):
+        self.reader = reader
+        self.recognizer = BatchRecognizer(reader, scale, batch_size, cache)
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recognizer")
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.completed = {}
+
+    def _recognize(self, table, frame, fields, use_cache):
+        try:
+            return self.recognizer.recognize(frame, fields, use_cache)
+        finally:
+            with self.lock:
+                self.pending[table] -= 1
+                self.completed[table] = self.completed.get(table, 0) + 1
+
+    def submit(self, table, frame, fields, use_cache=True):
+        with self.lock:
+            self.pending[table] = self.pending.get(table, 0) + 1
+        metrics.count("recognizer_pool_requests", table=table)
+        return self.executor.submit(self._recognize, table, frame, fields, use_cache)
+
+    def client(self, table):
+        return PooledRecognizer(self, table)
+
+    def queue_depth(self, table=None):
+        with self.lock:
+            return sum(self.pending.values()) if table is None else self.pending.get(table, 0)
+
+    def stats(self):
+        with self.lock:
+            return {"workers": self.workers, "queue_depth": sum(self.pending.values()),
+                    "pending": dict(self.pending), "completed": dict(self.completed)}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if self.recognizer.cache is not None:
+            self.recognizer.cache.save()
+
+# Drop-in for BatchRecognizer in one table's OCR that runs on a shared pool
+class PooledRecognizer:
+    def __init__(self, pool, table):
+        self.pool = pool
+        self.table = table
+        self.cache = pool.recognizer.cache
+
+    def recognize(self, frame, fields, use_cache=True):
+        if not fields:
+            return {}
+        with metrics.timer("recognizer_pool_wait_seconds", table=self.table):
+            return self.pool.submit(self.table, frame, fields, use_cache).result()
@@ -0,0 +1,65 @@
+import argparse
+import json
+import time
+from cards import CardSet
+from capture import FrameRecorder, ScreenFrameSource, open_frame_source
+from config import CAPTURE_INTERVAL
+
+# Record the live table once, then run the same OCR extractors over it offline:
+#   python replay.py record recordings/session1 --frames 300
+#   python replay.py run recordings/session1 --output states.jsonl
+#   python replay.py run debug_overlay.png
+
+def record(directory, frames=None, interval=CAPTURE_INTERVAL):
+    source = ScreenFrameSource()
+    with FrameRecorder(directory) as recorder:
+        try:
+            while frames is None or recorder.count < frames:
+                started = time.perf_counter()
+                recorder.write(source.grab())
+                time.sleep(max(interval - (time.perf_counter() - started), 0.0))
+        except KeyboardInterrupt:
+            pass
+    print(f"Recorded {recorder.count} frames ({recorder.files} distinct) to '{directory}'")
+
+def replay(paths, output, realtime=False, reader=None):
+    # One JSON line per frame with the parsed state, sorted keys so two runs diff cleanly;
+    # cards are written as their OCR labels. The scan scheduler runs on the recorded clock
+    # and without its CPU budget (which depends on this machine's speed), so the same
+    # recording always yields the same states.
+    from ocr import OCR
+    from game_state import GameState
+    from scheduler import ScanScheduler
+    source = open_frame_source(paths, realtime=realtime)
+    ocr = OCR(GameState(), frame_source=source, reader=reader, scheduler=ScanScheduler(budget_ms=float("inf")))
+    started = time.perf_counter()
+    count = 0
+    with open(output, "w", encoding="utf-8") as f:
+        while True:
+            frame = source.grab()
+            if frame is None:
+                break
+            state = ocr.process_frame(frame)
+            entry = {"frame": count, "recorded_at": frame.recorded_at, "state": state}
+            f.write(json.dumps(entry, sort_keys=True, ensure_ascii=False, default=CardSet.labels) + "\n")
+            count += 1
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {count} frames in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.1f} frames/s), "
+          f"states written to '{output}'")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record table frames or replay them through the OCR")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="save live screen frames to a directory")
+    record_parser.add_argument("directory")
+    record_parser.add_argument("--frames", type=int, default=None, help="stop after this many (default: Ctrl-C)")
+    record_parser.add_argument("--interval", type=float, default=CAPTURE_INTERVAL)
+    run_parser = commands.add_parser("run", help="parse a recording directory or image files")
+    run_parser.add_argument("source", nargs="*", default=["debug_overlay.png"])
+    run_parser.add_argument("--output", default="states.jsonl")
+    run_parser.add_argument("--realtime", action="store_true", help="replay at the recorded pace")
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.directory, args.frames, args.interval)
+    else:
+        replay(args.source, args.output, args.realtime)
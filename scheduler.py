@@ -0,0 +1,125 @@
+import time
+from instrumentation import metrics
+from utlis import log_info
+from config import (PLAYERS, SCAN_FAMILIES, SCAN_POLICIES, SCAN_BUDGET_MS, SCAN_DEFAULT_COST_MS, SCAN_HOT_SEATS,
+                    SCAN_HOT_SECONDS)
+
+COST_SMOOTHING = 0.2
+
+# Decides which text fields are worth reading on a tick. Every field family has a policy
+# (see SCAN_POLICIES): how often it is checked, faster while hero's turn is near, and for
+# cards, whether a read value holds until the next street or hand. Fields that changed
+# are then recognized in priority order while their estimated cost fits SCAN_BUDGET_MS;
+# the rest are skipped, counted, and stay due for the next tick.
+class ScanScheduler:
+    def __init__(self, families=SCAN_FAMILIES, policies=SCAN_POLICIES, budget_ms=SCAN_BUDGET_MS,
+                 default_cost_ms=SCAN_DEFAULT_COST_MS, hot_seats=SCAN_HOT_SEATS, hot_seconds=SCAN_HOT_SECONDS):
+        self.policies = policies
+        self.budget_ms = budget_ms
+        self.family = {field: family for family, fields in families.items() for field in fields}
+        order = sorted(families, key=lambda f: policies[f]["priority"])
+        self.order = [field for family in order for field in families[family]]
+        self.rank = {field: i for i, field in enumerate(self.order)}
+        self.costs = dict.fromkeys(self.family, default_cost_ms)
+        self.checked = dict.fromkeys(self.family, float("-inf"))
+        # Fields recognized at least once; until then a field is read whatever the budget,
+        # so the first states are complete and the cost estimates come from real reads
+        self.seen = set()
+        # Card fields holding a value until the next street or hand
+        self.locked = set()
+        # Seats acting just before hero (PLAYERS runs in table order from hero)
+        self.hot_seats = PLAYERS[-hot_seats:] if hot_seats else []
+        self.hot_seconds = hot_seconds
+        self.hot_until = float("-inf")
+        self.dealer = None
+        self.previous_actions = {}
+        self.skipped = {family: 0 for family in families}
+        self.reads = {family: 0 for family in families}
+        self.last_tick = {"due": 0, "read": 0, "skipped": 0, "estimated_ms": 0.0}
+
+    def hot(self, now):
+        return now < self.hot_until
+
+    def interval(self, field, now):
+        policy = self.policies[self.family[field]]
+        if field in self.locked:
+            return policy.get("recheck", float("inf"))
+        if self.hot(now) and "hot_interval" in policy:
+            return policy["hot_interval"]
+        return policy.get("interval", 0.0)
+
+    def due(self, now, fields=None):
+        # Fields whose policy wants them checked this tick, highest priority first
+        wanted = self.order if fields is None else sorted((f for f in fields if f in self.rank), key=self.rank.get)
+        return [f for f in wanted if now - self.checked[f] >= self.interval(f, now)]
+
+    def plan(self, due, dirty, now):
+        # Splits the changed fields into those read this tick and those over the budget.
+        # Unchanged due fields count as checked. `now` is the frame's clock (Frame.clock),
+        # so a replay schedules the same reads however fast it runs.
+        dirty = sorted(dirty, key=lambda f: self.rank.get(f, len(self.rank)))
+        selected, skipped, estimated = [], [], 0.0
+        for field in dirty:
+            cost = self.costs.get(field, SCAN_DEFAULT_COST_MS)
+            if selected and field in self.seen and estimated + cost > self.budget_ms:
+                skipped.append(field)
+                continue
+            selected.append(field)
+            estimated += cost
+        dirty = set(dirty)
+        for field in due:
+            if field not in dirty:
+                self.checked[field] = now
+        self.seen.update(selected)
+        for field in selected:
+            self.checked[field] = now
+            if field in self.family:
+                self.reads[self.family[field]] += 1
+        for field in skipped:
+            self.skipped[self.family[field]] += 1
+            metrics.count("scan_skipped_fields", family=self.family[field])
+        self.last_tick = {"due": len(due), "read": len(selected), "skipped": len(skipped), "estimated_ms": estimated}
+        return selected, skipped
+
+    def record(self, fields, seconds):
+        # Measured recognition time of a batch, spread evenly over its fields
+        if not fields:
+            return
+        per_field = seconds * 1000 / len(fields)
+        for field in fields:
+            previous = self.costs.get(field, per_field)
+            self.costs[field] = previous + COST_SMOOTHING * (per_field - previous)
+
+    def observe(self, state, now=None):
+        # Updates hand, street and turn signals from a parsed state (OCR.build_state);
+        # now is the clock of the frame it was read from
+        now = time.time() if now is None else now
+        dealer = next((p for p, label in state.get("positions", {}).items() if label == "BTN"), None)
+        new_hand = dealer != self.dealer
+        if new_hand:
+            # Every card slot is read afresh; this state's cards may still be last hand's
+            self.dealer = dealer
+            self.locked.clear()
+        counts = {} if new_hand else {"hero_cards": len(state.get("hero_cards", ())),
+                                      "board": len(state.get("board", ()))}
+        for family, count in counts.items():
+            fields = [f for f in self.order if self.family[f] == family]
+            if self.policies[family].get("until") == "hand" and count == len(fields):
+                self.locked.update(fields)
+            elif self.policies[family].get("until") == "street":
+                self.locked.update(fields[:count])
+        actions, bets = state.get("actions", {}), state.get("bets", {})
+        current = {p: (actions.get(p), bets.get(p)) for p in self.hot_seats}
+        if any(current[p] != self.previous_actions.get(p) for p in self.hot_seats if current[p][0] != "Unknown"):
+            self.hot_until = now + self.hot_seconds
+        self.previous_actions = current
+
+    def stats(self):
+        return {"budget_ms": self.budget_ms, "last_tick": dict(self.last_tick), "reads": dict(self.reads),
+                "skipped": dict(self.skipped), "locked": len(self.locked),
+                "cost_ms": {f: round(c, 2) for f, c in self.costs.items()}}
+
+    def report(self):
+        skipped = ", ".join(f"{family} {n}" for family, n in self.skipped.items() if n) or "nothing"
+        reads = ", ".join(f"{family} {n}" for family, n in self.reads.items())
+        log_info(f"Scan scheduler: reads {reads}; skipped over the {self.budget_ms} ms budget: {skipped}")
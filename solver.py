@@ -0,0 +1,351 @@
+import os
+import time
+import numpy as np
+from cards import card_str, combo_index
+from equity import COMBOS, CARD_COMBOS
+from hand_evaluator import evaluate_many
+from config import SOLVER_BET_SIZES, SOLVER_RAISE_SIZES, SOLVER_MAX_RAISES, SOLVER_ITERATIONS
+
+N_COMBOS = len(COMBOS)
+OOP, IP = 0, 1
+
+# Opponent reach summed over the combos that do not share a card with each hand.
+# Sums over every live combo are corrected per card; the hand itself sits in both of
+# its card groups and is added back once.
+class Blockers:
+    def __init__(self, board):
+        self.board = list(board)
+        self.live = ~np.isin(COMBOS, self.board).any(axis=1)
+        self.first, self.second = COMBOS[:, 0].astype(np.intp), COMBOS[:, 1].astype(np.intp)
+
+    def disjoint_totals(self, reach):
+        per_card = reach[CARD_COMBOS].sum(axis=1)
+        return (reach.sum() - per_card[self.first] - per_card[self.second] + reach) * self.live
+
+# Showdown utilities on a complete board, in O(n log n) instead of a 1326 x 1326 matrix
+class Showdown(Blockers):
+    def __init__(self, board):
+        super().__init__(board)
+        values = np.full(N_COMBOS, np.iinfo(np.int32).max, dtype=np.int64)
+        values[self.live] = evaluate_many(
+            np.concatenate([COMBOS[self.live], np.broadcast_to(np.array(board, dtype=np.int8), (self.live.sum(), 5))], axis=1))
+        self.order = np.argsort(values, kind="stable")
+        ordered = values[self.order]
+        self.below = np.searchsorted(ordered, values, side="left")
+        self.not_above = np.searchsorted(ordered, values, side="right")
+
+        # The same positions inside the 51 combos holding each card
+        self.card_order = np.take_along_axis(CARD_COMBOS, np.argsort(values[CARD_COMBOS], axis=1, kind="stable"), axis=1)
+        card_values = values[self.card_order]
+        width = card_values.shape[1]
+        offset = np.int64(1 << 40)
+        flat = (card_values + np.arange(52)[:, None] * offset).ravel()
+        self.card_below, self.card_not_above = [], []
+        for cards in (self.first, self.second):
+            query = values + cards * offset
+            self.card_below.append(np.searchsorted(flat, query, side="left") - cards * width)
+            self.card_not_above.append(np.searchsorted(flat, query, side="right") - cards * width)
+
+    def win_minus_lose(self, reach):
+        # For each hand: opponent reach it beats minus opponent reach it loses to
+        cumulative = np.concatenate([[0.0], np.cumsum(reach[self.order])])
+        card_cumulative = np.concatenate([np.zeros((52, 1)), np.cumsum(reach[self.card_order], axis=1)], axis=1)
+        total, card_total = cumulative[-1], card_cumulative[:, -1]
+        win = cumulative[self.below]
+        lose = total - cumulative[self.not_above]
+        for k, cards in enumerate((self.first, self.second)):
+            win -= card_cumulative[cards, self.card_below[k]]
+            lose -= card_total[cards] - card_cumulative[cards, self.card_not_above[k]]
+        return (win - lose) * self.live
+
+class Node:
+    def __init__(self, kind, history, invested, player=None, board=None):
+        self.kind = kind  # "action", "fold", "showdown" or "chance"
+        self.history = history
+        self.invested = invested
+        self.player = player
+        self.board = board
+        self.actions = []
+        self.children = []
+        self.row = None
+
+# Heads-up river or turn subgame solved with vectorized CFR+ (or discounted CFR).
+# Every action node owns a block of rows in self.regrets / self.strategy_sum, one row
+# per action and one column per combo, so whole ranges are updated at once.
+class SubgameSolver:
+    def __init__(self, board, pot, stack, ranges=None, bet_sizes=SOLVER_BET_SIZES,
+                 raise_sizes=SOLVER_RAISE_SIZES, max_raises=SOLVER_MAX_RAISES, algorithm="cfr+"):
+        if len(board) not in (4, 5):
+            raise ValueError("SubgameSolver handles turn and river subgames only")
+        if algorithm not in ("cfr+", "dcfr"):
+            raise ValueError(f"Unknown algorithm {algorithm!r}")
+        self.board = list(board)
+        self.pot = float(pot)
+        self.stack = float(stack)
+        self.bet_sizes = list(bet_sizes)
+        self.raise_sizes = list(raise_sizes)
+        self.max_raises = max_raises
+        self.algorithm = algorithm
+        self.blockers = {}
+        self.showdowns = {}
+        live = Blockers(self.board).live
+        if ranges is None:
+            ranges = (np.ones(N_COMBOS), np.ones(N_COMBOS))
+        self.ranges = [np.asarray(r, dtype=np.float64) * live for r in ranges]
+
+        self.nodes = []
+        self.rows = 0
+        self.root = self._build_round(self.board, (0.0, 0.0), OOP, 0, "")
+        self.regrets = np.zeros((self.rows, N_COMBOS))
+        self.strategy_sum = np.zeros((self.rows, N_COMBOS))
+        self.iteration = 0
+        self.exploitability = []
+
+    # -----------------------------------------------------------------------#
+    # Tree
+
+    def _blockers(self, board):
+        key = tuple(board)
+        if key not in self.blockers:
+            self.blockers[key] = Blockers(board)
+        return self.blockers[key]
+
+    def _showdown(self, board):
+        key = tuple(board)
+        if key not in self.showdowns:
+            self.showdowns[key] = Showdown(board)
+        return self.showdowns[key]
+
+    def _end_of_round(self, board, invested, history):
+        all_in = max(invested) >= self.stack
+        if len(board) == 5:
+            node = Node("showdown", history, invested, board=board)
+            node.evaluator = self._showdown(board)
+            return node
+        node = Node("chance", history, invested, board=board)
+        for card in range(52):
+            if card in board:
+                continue
+            river = board + [card]
+            child_history = f"{history}/{card_str(card)}:"
+            if all_in:
+                child = Node("showdown", child_history, invested, board=river)
+                child.evaluator = self._showdown(river)
+            else:
+                child = self._build_round(river, invested, OOP, 0, child_history)
+            node.actions.append(card)
+            node.children.append(child)
+        return node
+
+    def _sizes(self, fractions, base, to_call, remaining):
+        amounts = []
+        for fraction in fractions:
+            amount = min(to_call + fraction * base, remaining)
+            if amount > to_call and amount not in amounts:
+                amounts.append(amount)
+        if remaining > to_call and remaining not in amounts:
+            amounts.append(remaining)
+        return amounts
+
+    def _build_round(self, board, invested, player, raises, history, checked=False):
+        node = Node("action", history, invested, player=player, board=board)
+        node.blockers = self._blockers(board)
+        opponent = 1 - player
+        to_call = invested[opponent] - invested[player]
+        remaining = self.stack - invested[player]
+        pot_now = self.pot + sum(invested)
+
+        def add(label, child):
+            node.actions.append(label)
+            node.children.append(child)
+
+        def put_in(amount):
+            new = list(invested)
+            new[player] += amount
+            return tuple(new)
+
+        if to_call == 0:
+            if checked or player == IP:
+                add("Check", self._end_of_round(board, invested, history + "x"))
+            else:
+                add("Check", self._build_round(board, invested, opponent, raises, history + "x", checked=True))
+            for amount in self._sizes(self.bet_sizes, pot_now, 0, remaining):
+                label = "All-in" if amount >= remaining else f"Bet {round(100 * amount / pot_now)}%"
+                token = "a" if amount >= remaining else f"b{round(100 * amount / pot_now)}"
+                add(label, self._build_round(board, put_in(amount), opponent, raises + 1, history + token))
+        else:
+            fold = Node("fold", history + "f", invested, player=player, board=board)
+            fold.blockers = node.blockers
+            add("Fold", fold)
+            add("Call", self._end_of_round(board, put_in(min(to_call, remaining)), history + "c"))
+            if raises < self.max_raises and invested[opponent] < self.stack:
+                for amount in self._sizes(self.raise_sizes, pot_now + to_call, to_call, remaining):
+                    label = "All-in" if amount >= remaining else f"Raise {round(100 * (amount - to_call) / (pot_now + to_call))}%"
+                    token = "a" if amount >= remaining else f"r{round(100 * (amount - to_call) / (pot_now + to_call))}"
+                    add(label, self._build_round(board, put_in(amount), opponent, raises + 1, history + token))
+
+        node.row = self.rows
+        self.rows += len(node.actions)
+        self.nodes.append(node)
+        return node
+
+    # -----------------------------------------------------------------------#
+    # CFR
+
+    def _current_strategy(self, node):
+        positive = np.maximum(self.regrets[node.row:node.row + len(node.actions)], 0.0)
+        total = positive.sum(axis=0)
+        uniform = 1.0 / len(node.actions)
+        return np.where(total > 0, positive / np.where(total > 0, total, 1.0), uniform)
+
+    def _average_strategy(self, node):
+        strategy = self.strategy_sum[node.row:node.row + len(node.actions)]
+        total = strategy.sum(axis=0)
+        uniform = 1.0 / len(node.actions)
+        return np.where(total > 0, strategy / np.where(total > 0, total, 1.0), uniform)
+
+    def _terminal_value(self, node, traverser, opp_reach):
+        if node.kind == "fold":
+            # node.player folded and loses what it put in plus its half of the starting pot
+            amount = self.pot / 2 + node.invested[node.player]
+            payoff = -amount if node.player == traverser else amount
+            return payoff * node.blockers.disjoint_totals(opp_reach)
+        return (self.pot / 2 + node.invested[traverser]) * node.evaluator.win_minus_lose(opp_reach)
+
+    def _cfr(self, node, traverser, own_reach, opp_reach, weight):
+        if node.kind in ("fold", "showdown"):
+            return self._terminal_value(node, traverser, opp_reach)
+        if node.kind == "chance":
+            # Dealt a river card; a disjoint pair of hands leaves 44 possible cards
+            value = np.zeros(N_COMBOS)
+            for child in node.children:
+                live = child.blockers.live if child.kind == "action" else child.evaluator.live
+                value += self._cfr(child, traverser, own_reach * live, opp_reach * live, weight)
+            return value / (52 - len(node.board) - 4)
+
+        strategy = self._current_strategy(node)
+        rows = slice(node.row, node.row + len(node.actions))
+        if node.player != traverser:
+            value = np.zeros(N_COMBOS)
+            for a, child in enumerate(node.children):
+                value += self._cfr(child, traverser, own_reach, opp_reach * strategy[a], weight)
+            return value
+
+        values = np.stack([self._cfr(child, traverser, own_reach * strategy[a], opp_reach, weight)
+                           for a, child in enumerate(node.children)])
+        value = (strategy * values).sum(axis=0)
+        regrets = self.regrets[rows]
+        regrets += values - value
+        if self.algorithm == "cfr+":
+            np.maximum(regrets, 0.0, out=regrets)
+        self.strategy_sum[rows] += weight * own_reach * strategy
+        return value
+
+    def _discount(self):
+        # Discounted CFR with the usual alpha=1.5, beta=0, gamma=2
+        t = self.iteration
+        positive = t ** 1.5 / (t ** 1.5 + 1)
+        self.regrets *= np.where(self.regrets > 0, positive, 0.5)
+        self.strategy_sum *= (t / (t + 1)) ** 2
+
+    def iterate(self):
+        self.iteration += 1
+        if self.algorithm == "dcfr":
+            weight = 1.0
+        else:
+            weight = float(self.iteration)  # linear averaging, as in CFR+
+        for traverser in (OOP, IP):
+            self._cfr(self.root, traverser, self.ranges[traverser], self.ranges[1 - traverser], weight)
+        if self.algorithm == "dcfr":
+            self._discount()
+
+    # -----------------------------------------------------------------------#
+    # Exploitability
+
+    def _best_response(self, node, player, opp_reach):
+        if node.kind in ("fold", "showdown"):
+            return self._terminal_value(node, player, opp_reach)
+        if node.kind == "chance":
+            value = np.zeros(N_COMBOS)
+            for child in node.children:
+                live = child.blockers.live if child.kind == "action" else child.evaluator.live
+                value += self._best_response(child, player, opp_reach * live)
+            return value / (52 - len(node.board) - 4)
+        if node.player == player:
+            return np.max([self._best_response(child, player, opp_reach) for child in node.children], axis=0)
+        strategy = self._average_strategy(node)
+        value = np.zeros(N_COMBOS)
+        for a, child in enumerate(node.children):
+            value += self._best_response(child, player, opp_reach * strategy[a])
+        return value
+
+    def compute_exploitability(self):
+        # Average gain of a best response against each player, as a percentage of the pot
+        blockers = self._blockers(self.board)
+        pairs = (self.ranges[OOP] * blockers.disjoint_totals(self.ranges[IP])).sum()
+        gains = [(self.ranges[p] * self._best_response(self.root, p, self.ranges[1 - p])).sum() / pairs
+                 for p in (OOP, IP)]
+        return float(100.0 * sum(gains) / 2 / self.pot)
+
+    # -----------------------------------------------------------------------#
+    # Driving, checkpoints and queries
+
+    def solve(self, iterations=SOLVER_ITERATIONS, report_every=10, target=None,
+              checkpoint=None, checkpoint_every=100, verbose=False):
+        # Runs until `iterations` in total (a resumed checkpoint counts) or exploitability <= target
+        if checkpoint and os.path.exists(checkpoint):
+            self.load_checkpoint(checkpoint)
+        started = time.perf_counter()
+        while self.iteration < iterations:
+            self.iterate()
+            if self.iteration % report_every == 0 or self.iteration == iterations:
+                exploitability = self.compute_exploitability()
+                self.exploitability.append((self.iteration, exploitability))
+                if verbose:
+                    print(f"Iteration {self.iteration}: exploitability {exploitability:.3f}% of pot "
+                          f"({time.perf_counter() - started:.1f}s)")
+                if target is not None and exploitability <= target:
+                    break
+            if checkpoint and self.iteration % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint)
+        if checkpoint:
+            self.save_checkpoint(checkpoint)
+        return self.exploitability
+
+    def _signature(self):
+        return np.array(self.board + [self.pot, self.stack, self.max_raises, self.rows]
+                        + self.bet_sizes + [-1] + self.raise_sizes, dtype=np.float64)
+
+    def save_checkpoint(self, path):
+        np.savez(path, regrets=self.regrets, strategy_sum=self.strategy_sum, iteration=self.iteration,
+                 signature=self._signature(), exploitability=np.array(self.exploitability).reshape(-1, 2))
+
+    def load_checkpoint(self, path):
+        with np.load(path) as data:
+            if not np.array_equal(data["signature"], self._signature()):
+                raise ValueError(f"Checkpoint {path} was saved for a different subgame")
+            self.regrets = data["regrets"]
+            self.strategy_sum = data["strategy_sum"]
+            self.iteration = int(data["iteration"])
+            self.exploitability = [(int(i), float(e)) for i, e in data["exploitability"]]
+
+    def action_nodes(self):
+        return [node for node in self.nodes if node.kind == "action"]
+
+    def find(self, history=""):
+        for node in self.nodes:
+            if node.history == history:
+                return node
+        return None
+
+    def strategy(self, history=""):
+        # Average strategy at a node: (action labels, (actions, 1326) frequencies)
+        node = self.find(history)
+        if node is None:
+            raise KeyError(f"No action node with history {history!r}")
+        return node.actions, self._average_strategy(node)
+
+    def hand_strategy(self, hand, history=""):
+        actions, frequencies = self.strategy(history)
+        column = frequencies[:, combo_index(*hand)]
+        return dict(zip(actions, column.tolist()))
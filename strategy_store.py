@@ -0,0 +1,162 @@
+import argparse
+import bisect
+import hashlib
+import os
+import struct
+import numpy as np
+from cards import HOLE_COMBOS, COMBO_INDEX, canonical_runout, remap_suits, remap_combos, card_str, parse_cards
+from config import STRATEGY_STORE_PATH, STRATEGY_SPR_BUCKETS
+
+# File layout, little endian:
+#   header: magic (8) | quantization uint32 (0 = float16, 1 = uint8) | pad uint32
+#           | entries uint64 | index offset uint64
+#   records, each 8-byte aligned:
+#       key length uint16 | actions uint8 | labels length uint16 | key | labels (\x1f separated)
+#       | pad | frequencies[actions, 1326] as float16 or uint8 (frequency * 255)
+#   index: (key hash uint64, record offset uint64) sorted by hash
+# A spot key is the suit-canonical board, the SPR bucket of the subgame (its starting
+# stack over pot, see STRATEGY_SPR_BUCKETS), the player to act and the betting history
+# with dealt cards stripped; frequencies are stored in the canonical suit frame.
+MAGIC = b"PKSTRAT2"
+HEADER = struct.Struct("<8sIIQQ")
+RECORD = struct.Struct("<HBH")
+INDEX_DTYPE = np.dtype([("key", "<u8"), ("offset", "<u8")])
+N_COMBOS = len(HOLE_COMBOS)
+FREQ_DTYPES = {0: np.dtype("<f2"), 1: np.dtype("u1")}
+
+def spr_bucket(pot, stack, edges=STRATEGY_SPR_BUCKETS):
+    return bisect.bisect_right(edges, stack / pot)
+
+def spot_key(board, pot, stack, position, history):
+    # Returns (key string, suit permutation into the canonical frame)
+    canonical, perm = canonical_runout(board)
+    betting = "/".join(part.split(":")[-1] for part in history.split("/"))
+    cards = "".join(card_str(c) for c in canonical)
+    return f"{cards}|spr{spr_bucket(pot, stack)}|{position}|{betting}", perm
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+class StrategyStoreWriter:
+    def __init__(self, path, quantize="uint8"):
+        self.quantization = 1 if quantize == "uint8" else 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, self.quantization, 0, 0, 0))
+        self.entries = []
+
+    def add(self, board, pot, stack, position, history, actions, frequencies):
+        # pot and stack are the subgame's at its root, whatever node this is
+        key, perm = spot_key(board, pot, stack, position, history)
+        canonical = np.zeros((len(actions), N_COMBOS), dtype=np.float64)
+        canonical[:, remap_combos(perm)] = frequencies
+        if self.quantization:
+            data = np.round(np.clip(canonical, 0, 1) * 255).astype(FREQ_DTYPES[1])
+        else:
+            data = canonical.astype(FREQ_DTYPES[0])
+        key_bytes, labels = key.encode(), "\x1f".join(actions).encode()
+        offset = self.file.tell()
+        self.file.write(RECORD.pack(len(key_bytes), len(actions), len(labels)) + key_bytes + labels)
+        self.file.write(b"\0" * (-self.file.tell() % 8))
+        self.file.write(data.tobytes())
+        self.file.write(b"\0" * (-self.file.tell() % 8))
+        self.entries.append((key_hash(key), offset))
+
+    def add_solver(self, solver):
+        # Every action node of a solved SubgameSolver
+        for node in solver.action_nodes():
+            actions, frequencies = solver.strategy(node.history)
+            self.add(node.board, solver.pot, solver.stack, "IP" if node.player else "OOP", node.history,
+                     actions, frequencies)
+
+    def close(self):
+        index = np.array(sorted(self.entries), dtype=INDEX_DTYPE)
+        index_offset = self.file.tell()
+        self.file.write(index.tobytes())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.quantization, 0, len(index), index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Memory-mapped reader: a lookup binary-searches the index and decodes one record
+class StrategyStore:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, quantization, _, entries, index_offset = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a strategy store")
+        self.freq_dtype = FREQ_DTYPES[quantization]
+        self.scale = 255.0 if quantization else 1.0
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.index = np.memmap(path, dtype=INDEX_DTYPE, mode="r", offset=index_offset, shape=(entries,))
+        self.keys = self.index["key"]
+
+    @classmethod
+    def load(cls, path=STRATEGY_STORE_PATH):
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _record(self, key):
+        h = key_hash(key)
+        i = int(np.searchsorted(self.keys, h))
+        while i < len(self.keys) and self.keys[i] == h:
+            offset = int(self.index["offset"][i])
+            key_len, n_actions, labels_len = RECORD.unpack(self.data[offset:offset + RECORD.size].tobytes())
+            start = offset + RECORD.size
+            if self.data[start:start + key_len].tobytes().decode() == key:
+                labels = self.data[start + key_len:start + key_len + labels_len].tobytes().decode().split("\x1f")
+                freq_offset = start + key_len + labels_len
+                freq_offset += -freq_offset % 8
+                return labels, freq_offset
+            i += 1
+        return None
+
+    def lookup(self, board, pot, stack, position, history="", hand=None):
+        # With a hand: {action: frequency} for that hand; without: (actions, (actions, 1326) array).
+        # pot and stack are at the start of the subgame. Returns None when the spot, or one
+        # solved at a similar SPR, is not in the store.
+        key, perm = spot_key(board, pot, stack, position, history)
+        record = self._record(key)
+        if record is None:
+            return None
+        labels, freq_offset = record
+        itemsize = self.freq_dtype.itemsize
+        if hand is None:
+            size = len(labels) * N_COMBOS * itemsize
+            table = self.data[freq_offset:freq_offset + size].view(self.freq_dtype).reshape(len(labels), N_COMBOS)
+            return labels, table[:, remap_combos(perm)].astype(np.float64) / self.scale
+        column = COMBO_INDEX[tuple(sorted(remap_suits(hand, perm)))]
+        positions = freq_offset + (np.arange(len(labels)) * N_COMBOS + column) * itemsize
+        raw = self.data[positions[:, None] + np.arange(itemsize)].view(self.freq_dtype).ravel()
+        freqs = raw.astype(np.float64) / self.scale
+        total = freqs.sum()
+        if total > 0:
+            freqs /= total
+        return dict(zip(labels, freqs.tolist()))
+
+if __name__ == "__main__":
+    from solver import SubgameSolver
+    from config import SOLVER_ITERATIONS
+    parser = argparse.ArgumentParser(description="Solve turn/river spots and write them to a strategy store")
+    parser.add_argument("boards", nargs="+", help="boards such as AsKd7h2c9s")
+    parser.add_argument("--output", default=STRATEGY_STORE_PATH)
+    parser.add_argument("--pot", type=float, default=100)
+    parser.add_argument("--stack", type=float, default=200)
+    parser.add_argument("--iterations", type=int, default=SOLVER_ITERATIONS)
+    parser.add_argument("--float16", action="store_true", help="store float16 instead of 8-bit frequencies")
+    args = parser.parse_args()
+    with StrategyStoreWriter(args.output, "float16" if args.float16 else "uint8") as writer:
+        for board in args.boards:
+            solver = SubgameSolver(parse_cards(board), args.pot, args.stack)
+            solver.solve(args.iterations, report_every=args.iterations)
+            writer.add_solver(solver)
+            print(f"{board}: exploitability {solver.exploitability[-1][1]:.3f}% of pot")
+    print(f"Saved {len(writer.entries)} spots to '{args.output}'")
@@ -0,0 +1,79 @@
+import time
+from capture import ScreenFrameSource
+from game_state import GameState
+from layout import TableLayout
+from ocr import OCR, load_reader
+from pipeline import Pipeline
+from ocr_cache import RecognitionCache
+from recognizer import RecognizerPool
+from utlis import log_info
+from config import TABLES, RECOGNIZER_WORKERS, PIPELINE_REPORT_INTERVAL
+
+# One monitored table: its own window layout, GameState, OCR state and pipeline
+class Table:
+    def __init__(self, name, layout, pool, frame_source=None):
+        self.name = name
+        self.layout = layout
+        self.game_state = GameState()
+        self.frame_source = frame_source or ScreenFrameSource(layout.screen_region())
+        self.ocr = OCR(self.game_state, frame_source=self.frame_source, reader=pool.reader,
+                       recognizer=pool.client(name), regions=layout.regions())
+        self.pipeline = Pipeline(self.ocr, report_interval=0)
+
+    def stats(self, pool):
+        stats = self.pipeline.stats()
+        return {
+            "rate": stats["stages"]["publish"]["rate"],
+            "recognize_ms": stats["stages"]["recognize"]["mean_ms"],
+            "latency_ms": stats["latency_ms"],
+            "dropped_frames": stats["dropped"]["frames"],
+            "queue_depth": pool.queue_depth(self.name) + self.pipeline.frames.qsize(),
+        }
+
+# Monitors several tables at once with one shared recognizer pool
+class MultiTableMonitor:
+    def __init__(self, tables=TABLES, reader=None, workers=RECOGNIZER_WORKERS, frame_sources=None):
+        # tables maps a name to {"offset": (x, y), "scale": s}; frame_sources optionally
+        # maps a name to a frame source other than the screen (e.g. a replay)
+        self.pool = RecognizerPool(reader or load_reader(), workers, cache=RecognitionCache.load())
+        frame_sources = frame_sources or {}
+        self.tables = {
+            name: Table(name, TableLayout(spec.get("offset", (0, 0)), spec.get("scale", 1.0)), self.pool,
+                        frame_sources.get(name))
+            for name, spec in tables.items()
+        }
+
+    def start(self):
+        for table in self.tables.values():
+            table.pipeline.start()
+        return self
+
+    def stop(self):
+        for table in self.tables.values():
+            table.pipeline.stop()
+        self.pool.close()
+
+    def game_state(self, name):
+        return self.tables[name].game_state
+
+    def stats(self):
+        return {"pool": self.pool.stats(),
+                "tables": {name: table.stats(self.pool) for name, table in self.tables.items()}}
+
+    def report(self):
+        stats = self.stats()
+        log_info(f"Recognizer pool: {stats['pool']['workers']} workers, queue depth {stats['pool']['queue_depth']}")
+        for name, table in stats["tables"].items():
+            log_info(f"{name}: {table['rate']:.1f} states/s, recognize {table['recognize_ms']:.0f} ms, "
+                     f"latency p95 {table['latency_ms']['p95']:.0f} ms, queue depth {table['queue_depth']}, "
+                     f"dropped {table['dropped_frames']} frames")
+
+if __name__ == "__main__":
+    monitor = MultiTableMonitor().start()
+    log_info(f"Monitoring {len(monitor.tables)} tables: {', '.join(monitor.tables)}")
+    try:
+        while True:
+            time.sleep(PIPELINE_REPORT_INTERVAL)
+            monitor.report()
+    except KeyboardInterrupt:
+        monitor.stop()
@@ -0,0 +1,37 @@
+from itertools import combinations
+import numpy as np
+from cards import combo_index, parse_cards
+from equity import EquityEngine, river_equities
+from hand_evaluator import evaluate_many
+
+def enumerate_equity(hero, board):
+    # Hero's pot share against every opponent hand and every runout, one hand at a time
+    deck = [c for c in range(52) if c not in hero + board]
+    hands = []
+    for runout in combinations(deck, 5 - len(board)):
+        rest = [c for c in deck if c not in runout]
+        for villain in combinations(rest, 2):
+            hands.append((list(runout), list(villain)))
+    full = np.array([board + runout for runout, _ in hands])
+    hero_values = evaluate_many(np.concatenate([np.tile(hero, (len(hands), 1)), full], axis=1))
+    villain_values = evaluate_many(np.concatenate([np.array([v for _, v in hands]), full], axis=1))
+    return float(np.mean((hero_values > villain_values) + 0.5 * (hero_values == villain_values)))
+
+def test_river_equities_match_enumeration():
+    board = parse_cards("AsKd7h2c2d")
+    equities = river_equities(board)
+    for hand in ("QsJs", "AcKc", "7d7s", "3h4h", "2s2h"):
+        hero = parse_cards(hand)
+        assert np.isclose(equities[combo_index(*hero)], enumerate_equity(hero, board))
+    blocked = combo_index(*parse_cards("AsQd"))
+    assert np.isnan(equities[blocked])
+
+def test_monte_carlo_covers_enumeration():
+    engine = EquityEngine(workers=1, samples=20000, time_budget=None)
+    for hand, board in (("QsJs", "AsKd7hTc"), ("7d7s", "AsKd7h2c9s")):
+        hero, board = parse_cards(hand), parse_cards(board)
+        exact = enumerate_equity(hero, board)
+        result = engine.equity(hero, board, 1, seed=0)
+        assert result.samples == 20000
+        assert result.low <= exact <= result.high
+        assert result.high - result.low < 0.02
@@ -0,0 +1,35 @@
+import numpy as np
+from cards import Board, Hand, canonical_board
+from equity_tables import EquityTables, N_CLASSES, N_COMBOS, write
+from ranges import parse_range
+
+AA = Hand.from_labels(["A♠", "A♦"]).cards
+KK = Hand.from_labels(["K♠", "K♦"]).cards
+FLOP = Board.from_labels(["2♣", "7♦", "J♥"]).cards
+
+def tables(tmp_path):
+    # Every simulated entry 0.6 +- 0.02, the one flop exactly 0.25 for every combo
+    vs_random = np.full((1, N_CLASSES), 0.6, dtype=np.float32)
+    vs_hand = np.full((N_CLASSES, N_CLASSES), 0.6, dtype=np.float32)
+    ci = np.full_like(vs_hand, 0.02)
+    flop_rows = np.full((1, N_COMBOS), 0.25, dtype=np.float32)
+    path = str(tmp_path / "tables.bin")
+    write(path, vs_random, ci[:1], vs_hand, ci, [canonical_board(FLOP)[0]], flop_rows, 1000, 4000)
+    return EquityTables(path)
+
+def test_simulated_entries_carry_their_interval(tmp_path):
+    result = tables(tmp_path).lookup(AA, [], 1)
+    assert not result.exact and result.samples == 1000
+    assert np.isclose(result.low, 0.58) and np.isclose(result.high, 0.62)
+
+def test_flop_entries_are_exact(tmp_path):
+    result = tables(tmp_path).lookup(AA, FLOP, 1)
+    assert result.exact and np.isclose(result.equity, 0.25)
+
+def test_preflop_range_equity_skips_blocked_combos(tmp_path):
+    t = tables(tmp_path)
+    result = t.preflop_range_equity(AA, parse_range("KK"))
+    assert np.isclose(result.equity, 0.6) and result.samples == 4000 and not result.exact
+    # The only villain combo is hero's own hand
+    assert t.preflop_range_equity(AA, parse_range("AsAd")) is None
+    assert t.preflop_range_equity(KK, parse_range("AsAd")) is not None
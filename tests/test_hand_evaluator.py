@@ -0,0 +1,58 @@
+from collections import Counter
+from itertools import combinations
+import numpy as np
+from cards import card_rank, card_suit, parse_cards
+from hand_evaluator import HAND_CATEGORIES, evaluate, evaluate_many, hand_category
+
+def brute_force5(cards):
+    # (category, tie-break ranks) of five cards, comparable as tuples
+    ranks = sorted((card_rank(c) for c in cards), reverse=True)
+    flush = len({card_suit(c) for c in cards}) == 1
+    distinct = sorted(set(ranks), reverse=True)
+    straight = None
+    if len(distinct) == 5 and distinct[0] - distinct[4] == 4:
+        straight = distinct[0]
+    elif distinct == [12, 3, 2, 1, 0]:
+        straight = 3
+    if straight is not None:
+        return (8 if flush else 4, [straight])
+    # Ranks by count, then by rank: quads before the kicker, trips before the pair
+    groups = sorted(Counter(ranks).items(), key=lambda g: (g[1], g[0]), reverse=True)
+    shape = [count for _, count in groups]
+    order = [rank for rank, _ in groups]
+    if flush:
+        return (5, ranks)
+    category = {(4, 1): 7, (3, 2): 6, (3, 1, 1): 3, (2, 2, 1): 2, (2, 1, 1, 1): 1}.get(tuple(shape), 0)
+    return (category, order)
+
+def brute_force(cards):
+    return max(brute_force5(five) for five in combinations(cards, 5))
+
+def test_seven_card_values_order_like_brute_force():
+    rng = np.random.default_rng(0)
+    hands = np.array([rng.choice(52, 7, replace=False) for _ in range(1500)])
+    values = evaluate_many(hands)
+    reference = [brute_force(h.tolist()) for h in hands]
+    order = sorted(range(len(hands)), key=lambda i: reference[i])
+    for a, b in zip(order, order[1:]):
+        if reference[a] == reference[b]:
+            assert values[a] == values[b]
+        else:
+            assert values[a] < values[b]
+    for value, (category, _) in zip(values, reference):
+        assert hand_category(value) == HAND_CATEGORIES[category]
+
+def test_single_and_smaller_hands_agree():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        cards = rng.choice(52, 7, replace=False).tolist()
+        best = max(evaluate(five) for five in combinations(cards, 5))
+        assert evaluate(cards) == best == evaluate_many(np.array([cards]))[0]
+        assert evaluate(cards[:6]) == max(evaluate(five) for five in combinations(cards[:6], 5))
+
+def test_edge_hands():
+    assert evaluate(parse_cards("AsKsQsJsTs")) == 7462
+    assert evaluate(parse_cards("7d5c4h3s2d")) == 1
+    # The wheel is the lowest straight, below six high
+    assert hand_category(evaluate(parse_cards("Ad2c3h4s5d"))) == "Straight"
+    assert evaluate(parse_cards("Ad2c3h4s5d")) < evaluate(parse_cards("2c3h4s5d6c"))
@@ -0,0 +1,84 @@
+import os
+from cards import Board, Hand, EMPTY_BOARD, EMPTY_HAND
+from hand_history import HandHistoryLog, HandTracker
+from config import PLAYERS
+
+def frame(board=(), hero=(), dealer="Player 3", actions=None):
+    actions = actions or {}
+    return {
+        "pot": "$1.50",
+        "board": Board.from_labels(board) if board else EMPTY_BOARD,
+        "hero_cards": Hand.from_labels(hero) if hero else EMPTY_HAND,
+        "bankrolls": {p: "$100" for p in PLAYERS},
+        "positions": {p: ("BTN" if p == dealer else "") for p in PLAYERS if dealer},
+        "actions": {p: actions.get(p, "Unknown") for p in PLAYERS},
+        "bets": {p: "N/A" for p in PLAYERS},
+    }
+
+def feed(tracker, frames, repeat=3):
+    # Every frame is held for a few ticks, as the screen is between changes
+    return [e for f in frames for _ in range(repeat) for e in tracker.observe(f)]
+
+RIVER = ["A♠", "K♦", "2♣", "7♥", "9♠"]
+
+def play_hand(tracker, dealer, hero):
+    return feed(tracker, [
+        frame(hero=hero, dealer=dealer),
+        frame(hero=hero, dealer=dealer, actions={"Player 2": "Call"}),
+        frame(board=RIVER[:3], hero=hero, dealer=dealer),
+        frame(board=RIVER[:3], hero=hero, dealer=dealer, actions={"Player 2": "Check"}),
+        frame(board=RIVER, hero=hero, dealer=dealer),
+    ])
+
+def test_staggered_hand_boundary_starts_one_hand():
+    tracker = HandTracker()
+    play_hand(tracker, "Player 3", ["Q♣", "Q♦"])
+    # The board clears first, the button moves a few frames later, the new hero
+    # cards arrive last; the old action labels are still showing throughout
+    events = feed(tracker, [
+        frame(hero=["Q♣", "Q♦"], dealer="Player 3", actions={"Player 2": "Check"}),
+        frame(dealer="Player 3", actions={"Player 2": "Check"}),
+        frame(dealer="Player 4", actions={"Player 2": "Check"}),
+        frame(hero=["J♥", "10♥"], dealer="Player 4", actions={"Player 2": "Check"}),
+        frame(hero=["J♥", "10♥"], dealer="Player 4"),
+    ])
+    assert [e["type"] for e in events].count("new_hand") == 1
+    start = next(e for e in events if e["type"] == "new_hand")
+    assert start["dealer"] == "Player 4"
+    dealt = [e for e in events if e["type"] == "hero_cards"]
+    assert [e["hero_cards"] for e in dealt] == [["J♥", "10♥"]]
+    assert all(e["hand"] == start["hand"] for e in dealt)
+
+def test_hero_cards_start_the_hand_when_the_button_is_unreadable():
+    tracker = HandTracker()
+    play_hand(tracker, None, ["Q♣", "Q♦"])
+    events = feed(tracker, [
+        frame(dealer=None),
+        frame(hero=["J♥", "10♥"], dealer=None),
+        frame(hero=["J♥", "10♥"], dealer=None, actions={"Player 2": "Raise"}),
+    ])
+    assert [e["type"] for e in events].count("new_hand") == 1
+
+def test_no_second_hand_before_the_first_progressed():
+    tracker = HandTracker()
+    events = feed(tracker, [frame(dealer="Player 3"), frame(dealer="Player 4"), frame(dealer="Player 5")])
+    assert [e["type"] for e in events].count("new_hand") == 1
+
+def test_index_entries_past_the_log_are_trimmed_on_disk(tmp_path):
+    path = str(tmp_path / "hands.jsonl")
+    log = HandHistoryLog(path)
+    tracker = HandTracker(log)
+    play_hand(tracker, "Player 3", ["Q♣", "Q♦"])
+    feed(tracker, [frame(dealer="Player 4"), frame(dealer="Player 4", actions={"Player 2": "Fold"})])
+    tracker.close()
+    # A crash after the index write but before the log write: truncate the log
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size // 2)
+    before = os.path.getsize(path + ".idx")
+    assert len(HandHistoryLog(path)) < len(log)
+    after = os.path.getsize(path + ".idx")
+    assert after < before
+    reopened = HandHistoryLog(path)
+    assert os.path.getsize(path + ".idx") == after
+    assert reopened.hand_ids() == HandHistoryLog(path).hand_ids()
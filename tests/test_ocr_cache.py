@@ -0,0 +1,73 @@
+import json
+import cv2
+import numpy as np
+from capture import Frame
+from ocr_cache import RecognitionCache, crop_key
+from recognizer import BatchRecognizer
+
+def glyph(text, ink=20, paper=230):
+    image = np.full((20, 60), paper, dtype=np.uint8)
+    cv2.putText(image, text, (2, 16), cv2.FONT_HERSHEY_SIMPLEX, 0.5, ink, 1)
+    return image
+
+# Stands in for easyocr.Reader on its fallback path; counts the crops it is asked to read
+class CountingReader:
+    character = "0123456789"
+    lang_char = "0123456789"
+
+    def __init__(self):
+        self.boxes = 0
+
+    def recognize(self, image, horizontal_list, free_list, batch_size, detail):
+        self.boxes += len(horizontal_list)
+        return [([[b[0], b[2]], [b[1], b[2]], [b[1], b[3]], [b[0], b[3]]], "42", 0.9) for b in horizontal_list]
+
+def test_key_ignores_polarity_and_brightness():
+    key = crop_key(glyph("1.50"))
+    assert crop_key(glyph("1.50", ink=230, paper=20)) == key
+    assert crop_key(glyph("1.50", ink=60, paper=180)) == key
+    assert crop_key(cv2.cvtColor(glyph("1.50"), cv2.COLOR_GRAY2BGR)) == key
+    assert crop_key(glyph("1.80")) != key
+    assert crop_key(glyph("1.50"), kind="rank") != key
+
+def test_least_recently_used_is_evicted():
+    cache = RecognitionCache(max_entries=2, path=None)
+    cache.put("a", ["Fold"])
+    cache.put("b", ["Call"])
+    assert cache.get("a") == ["Fold"]
+    cache.put("c", ["Check"])
+    assert cache.get("b") is None and cache.get("c") == ["Check"]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["hits"] == 2
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = RecognitionCache(path=path)
+    for i in range(5):
+        cache.put(f"crop:{i}", [str(i)])
+    cache.save()
+    loaded = RecognitionCache.load(path, max_entries=3)
+    # The most recently used entries are kept
+    assert [loaded.get(f"crop:{i}") for i in range(5)] == [None, None, ["2"], ["3"], ["4"]]
+    with open(path, "w") as f:
+        json.dump({"version": 0, "entries": [["crop:0", ["0"]]]}, f)
+    assert len(RecognitionCache.load(path)) == 0
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert len(RecognitionCache.load(path)) == 0
+
+def test_recognizer_reads_each_crop_once():
+    image = np.full((40, 200), 230, dtype=np.uint8)
+    for x in (0, 70, 140):
+        image[10:30, x:x + 60] = glyph("Fold" if x < 140 else "2.50")
+    frame = Frame(cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), 0.0)
+    fields = {"ACTION_2": (0, 10, 60, 30), "ACTION_3": (70, 10, 130, 30), "BET_2": (140, 10, 200, 30)}
+    reader = CountingReader()
+    recognizer = BatchRecognizer(reader, cache=RecognitionCache(path=None))
+    expected = {name: ["42"] for name in fields}
+    # The two "Fold" labels share one crop, read once
+    assert recognizer.recognize(frame, fields) == expected
+    assert reader.boxes == 2
+    assert recognizer.recognize(frame, fields) == expected
+    assert reader.boxes == 2
+    recognizer.recognize(frame, fields, use_cache=False)
+    assert reader.boxes == 5
@@ -0,0 +1,39 @@
+from player_stats import PlayerStatsStore
+
+def new_hand(hand, players=("Player 2", "Player 3")):
+    return {"type": "new_hand", "hand": hand, "time": float(hand), "players": list(players)}
+
+def action(hand, player, name, street="preflop"):
+    return {"type": "action", "hand": hand, "time": float(hand), "street": street, "player": player,
+            "action": name, "amount": None}
+
+def test_only_hands_with_actions_count(tmp_path):
+    store = PlayerStatsStore(str(tmp_path / "stats.db"), batch_hands=1)
+    for event in [new_hand(1), action(1, "Player 2", "Raise"), action(1, "Player 3", "Fold"),
+                  new_hand(2), new_hand(3), action(3, "Player 2", "Fold"), new_hand(4)]:
+        store.on_event(event)
+    stats = store.get("Player 2")
+    assert stats.hands == 2
+    assert stats.vpip == 0.5
+    store.close()
+
+def test_close_drops_the_unfinished_hand(tmp_path):
+    path = str(tmp_path / "stats.db")
+    store = PlayerStatsStore(path, session="a")
+    for event in [new_hand(1), action(1, "Player 2", "Call"), new_hand(2), action(2, "Player 2", "Call")]:
+        store.on_event(event)
+    store.close()
+    assert PlayerStatsStore(path, session="a").get("Player 2").hands == 1
+
+def test_sessions_and_tables_are_kept_apart(tmp_path):
+    path = str(tmp_path / "stats.db")
+    for session in ("a", "b"):
+        store = PlayerStatsStore(path, session=session)
+        for event in [new_hand(1), action(1, "Player 2", "Call"), new_hand(2)]:
+            store.on_event(event)
+        store.on_event({**new_hand(1), "table": "t2"})
+        store.on_event({**action(1, "Player 2", "Fold"), "table": "t2"})
+        store.on_event({**new_hand(2), "table": "t2"})
+        assert store.get("Player 2").hands == 1
+        assert store.get("t2/Player 2").vpip == 0
+        store.close()
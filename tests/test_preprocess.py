@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+from capture import Frame
+from preprocess import FramePreprocessor, pack
+
+REGIONS = {
+    "POT_REGION": (110, 20, 190, 44),
+    "BANK_1": (20, 80, 95, 98),
+    "BOARD_CARD_1": (120, 60, 150, 106),
+    "BOARD_CARD_2": (155, 60, 185, 106),
+}
+SCALES = {"BOARD_CARD_": 1.5}
+
+def frame(seed, origin=(10, 10)):
+    image = np.random.default_rng(seed).integers(0, 256, (120, 200, 3), dtype=np.uint8)
+    return Frame(image, 0.0, origin)
+
+def per_roi(frame, region, scale):
+    # What each extractor did before: convert and resize its own crop
+    gray = cv2.cvtColor(np.ascontiguousarray(frame.roi(region)), cv2.COLOR_BGR2GRAY)
+    x1, y1, x2, y2 = region
+    size = (max(round((x2 - x1) * scale), 1), max(round((y2 - y1) * scale), 1))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_LINEAR)
+
+def test_fields_match_per_roi_preprocessing():
+    preprocessor = FramePreprocessor(REGIONS, list(REGIONS), scales=SCALES, default_scale=2)
+    f = frame(0)
+    preprocessor.use_frame(f)
+    for name, region in REGIONS.items():
+        scale = 1.5 if name.startswith("BOARD_CARD_") else 2
+        assert np.array_equal(preprocessor.field_image(name), per_roi(f, region, scale))
+
+def test_slots_do_not_overlap():
+    preprocessor = FramePreprocessor(REGIONS, list(REGIONS), scales=SCALES, default_scale=2, canvas_width=200)
+    height, width = preprocessor.canvas.shape
+    taken = np.zeros((height, width), dtype=int)
+    for x_min, x_max, y_min, y_max in preprocessor.boxes.values():
+        assert 0 <= x_min < x_max <= width and 0 <= y_min < y_max <= height
+        taken[y_min:y_max, x_min:x_max] += 1
+    assert taken.max() == 1
+    positions, (w, h) = pack([(50, 10), (50, 20), (120, 5)], 110)
+    assert positions == [(0, 0), (54, 0), (0, 24)] and (w, h) == (120, 29)
+
+def test_only_requested_fields_are_redrawn_per_frame():
+    preprocessor = FramePreprocessor(REGIONS, list(REGIONS), scales=SCALES, default_scale=2)
+    preprocessor.use_frame(frame(0))
+    canvas, boxes = preprocessor.text_boxes(["POT_REGION"])
+    assert list(boxes) == ["POT_REGION"] and preprocessor.resized == {"POT_REGION"}
+    old_bank = preprocessor.field_image("BANK_1").copy()
+    # A new frame: the pot is redrawn when asked for, the bank slot keeps the old pixels
+    second = frame(1)
+    preprocessor.use_frame(second)
+    assert preprocessor.resized == set()
+    preprocessor.text_boxes(["POT_REGION"])
+    x_min, x_max, y_min, y_max = boxes["POT_REGION"]
+    assert np.array_equal(canvas[y_min:y_max, x_min:x_max], per_roi(second, REGIONS["POT_REGION"], 2))
+    x_min, x_max, y_min, y_max = preprocessor.boxes["BANK_1"]
+    assert np.array_equal(preprocessor.canvas[y_min:y_max, x_min:x_max], old_bank)
@@ -0,0 +1,43 @@
+import numpy as np
+from cards import combo_index, parse_cards
+from equity import river_equities
+from ranges import DISJOINT, RangeEngine, equity_matrix, live_combos, parse_range
+
+BOARD = parse_cards("AsKd7h2c2d")
+# The same board with spades and hearts swapped
+MIRROR = parse_cards("AhKd7s2c2d")
+
+def test_parse_range_counts():
+    assert parse_range("AKs").sum() == 4
+    assert parse_range("AKo").sum() == 12
+    assert parse_range("QQ+").sum() == 18
+    assert parse_range("T9s-76s").sum() == 16
+    assert parse_range("random").sum() == 1326
+    weights = parse_range("22-55, 33:0.5")
+    assert weights.sum() == 4 * 6 - 6 * 0.5
+    assert weights[combo_index(*parse_cards("AhKh"))] == 0
+
+def test_river_matrix_is_a_zero_sum_showdown():
+    matrix = equity_matrix(BOARD)
+    live = live_combos(BOARD)
+    pairs = DISJOINT & live[:, None] & live[None, :]
+    assert np.allclose((matrix + matrix.T)[pairs], 1.0)
+    assert not matrix[~pairs].any()
+
+def test_range_equity_against_random_matches_exact_river_equity():
+    engine = RangeEngine()
+    result = engine.equity(parse_range("random"), parse_range("random"), BOARD)
+    exact = river_equities(BOARD)
+    live = ~np.isnan(exact)
+    assert np.allclose(result.combo_equities[live], exact[live], atol=1e-6)
+    assert np.isclose(result.equity, 0.5)
+
+def test_isomorphic_boards_share_one_matrix():
+    engine = RangeEngine()
+    hero, villain = parse_range("AK, 77, 22"), parse_range("QQ+, AJs+, KQ")
+    direct = equity_matrix(MIRROR)
+    engine.matrix(BOARD)
+    assert np.allclose(engine.matrix(MIRROR), direct)
+    assert len(engine.cache) == 1
+    mirrored = engine.equity(hero, villain, MIRROR).equity
+    assert np.isclose(mirrored, engine.equity(hero, villain, BOARD).equity)
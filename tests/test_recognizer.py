@@ -0,0 +1,34 @@
+import threading
+import time
+import numpy as np
+from capture import Frame
+from recognizer import RecognizerPool
+
+# Stands in for easyocr.Reader on its fallback path (Reader.recognize over known boxes)
+class FakeReader:
+    character = "0123456789"
+    lang_char = "0123456789"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def recognize(self, image, horizontal_list, free_list, batch_size, detail):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.005)
+        with self.lock:
+            self.active -= 1
+        return [([[b[0], b[2]], [b[1], b[2]], [b[1], b[3]], [b[0], b[3]]], "42", 0.9) for b in horizontal_list]
+
+def test_pool_runs_one_inference_at_a_time():
+    reader = FakeReader()
+    pool = RecognizerPool(reader, workers=4)
+    frame = Frame(np.zeros((60, 200, 3), dtype=np.uint8), 0.0)
+    futures = [pool.submit(f"table{i}", frame, {"BET": (0, 0, 80, 20), "POT": (100, 0, 180, 20)}) for i in range(8)]
+    results = [f.result() for f in futures]
+    pool.close()
+    assert reader.peak == 1
+    assert all(r == {"BET": ["42"], "POT": ["42"]} for r in results)
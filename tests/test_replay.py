@@ -0,0 +1,48 @@
+import json
+import time
+import numpy as np
+from capture import Frame, FrameRecorder
+from replay import replay
+from config import SCREEN_REGION
+
+# Stands in for easyocr.Reader: the text of a box depends only on its pixels. Each call
+# moves the clocks on by `lag` seconds, as a slow machine would, without changing what
+# it reads.
+class FakeReader:
+    character = "0123456789"
+    lang_char = "0123456789"
+
+    def __init__(self, monkeypatch, lag=0.0):
+        self.lag = lag
+        self.offset = 0.0
+        monotonic, wall = time.monotonic, time.time
+        monkeypatch.setattr(time, "monotonic", lambda: monotonic() + self.offset)
+        monkeypatch.setattr(time, "time", lambda: wall() + self.offset)
+
+    def recognize(self, image, horizontal_list, free_list, batch_size, detail):
+        self.offset += self.lag
+        return [([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], str(int(image[y1:y2, x1:x2].mean())), 0.9)
+                for x1, x2, y1, y2 in horizontal_list]
+
+    def readtext(self, image, detail=0):
+        self.offset += self.lag
+        return [str(int(image.mean()))]
+
+def record(directory, frames=12, step=0.25):
+    # A table whose every region changes on every frame, captured every `step` seconds
+    x1, y1, x2, y2 = SCREEN_REGION
+    rng = np.random.default_rng(0)
+    with FrameRecorder(str(directory)) as recorder:
+        for i in range(frames):
+            image = rng.integers(0, 255, (y2 - y1, x2 - x1, 3), dtype=np.uint8)
+            recorder.write(Frame(image, 1000.0 + i * step, origin=(x1, y1)))
+
+def test_replaying_a_recording_twice_gives_the_same_states(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    record(tmp_path / "recording")
+    replay([str(tmp_path / "recording")], "fast.jsonl", reader=FakeReader(monkeypatch))
+    replay([str(tmp_path / "recording")], "slow.jsonl", reader=FakeReader(monkeypatch, lag=10.0))
+    fast = [json.loads(line) for line in open("fast.jsonl", encoding="utf-8")]
+    slow = [json.loads(line) for line in open("slow.jsonl", encoding="utf-8")]
+    assert len(fast) == 12
+    assert fast == slow
@@ -0,0 +1,70 @@
+from scheduler import ScanScheduler
+from config import PLAYERS
+
+def test_first_read_ignores_the_budget():
+    scheduler = ScanScheduler(budget_ms=20, default_cost_ms=10)
+    due = scheduler.due(0.0)
+    assert due == scheduler.order
+    selected, skipped = scheduler.plan(due, due, 0.0)
+    assert selected == scheduler.order and skipped == []
+    # Every field read once: from now on the budget decides
+    selected, skipped = scheduler.plan(due, due, 100.0)
+    assert len(selected) == 2 and len(skipped) == len(due) - 2
+
+def state(dealer="Player 3", hero=(), board=(), actions=None):
+    actions = actions or {}
+    return {
+        "positions": {dealer: "BTN"},
+        "hero_cards": list(hero),
+        "board": list(board),
+        "actions": {p: actions.get(p, "Unknown") for p in PLAYERS},
+        "bets": {p: "N/A" for p in PLAYERS},
+    }
+
+def tick(scheduler, now, dirty=()):
+    # One tick at an injected time: every due field is read, the ones in dirty as changed
+    due = scheduler.due(now)
+    scheduler.plan(due, [f for f in due if f in dirty], now)
+    return due
+
+def test_fields_come_due_on_their_intervals():
+    scheduler = ScanScheduler(budget_ms=float("inf"))
+    assert tick(scheduler, 0.0) == scheduler.order
+    assert "POT_REGION" not in tick(scheduler, 0.2)
+    due = tick(scheduler, 0.5)
+    assert "POT_REGION" in due and "BANK_HERO" not in due and "HERO_CARD_1" in due
+    assert "BANK_HERO" in tick(scheduler, 5.0)
+    assert "VPIP_HERO" not in tick(scheduler, 29.0)
+    assert "VPIP_HERO" in tick(scheduler, 30.0)
+
+def test_action_before_hero_makes_the_betting_fields_hot():
+    scheduler = ScanScheduler(budget_ms=float("inf"))
+    scheduler.observe(state(), 0.0)
+    tick(scheduler, 0.0)
+    assert "POT_REGION" not in tick(scheduler, 0.1)
+    scheduler.observe(state(actions={"Player 7": "Call"}), 0.1)
+    assert "POT_REGION" in tick(scheduler, 0.2)
+    assert {"POT_REGION", "BET_AMOUNT_HERO", "ACTION_7"} <= set(scheduler.due(0.3))
+    # Cooled down SCAN_HOT_SECONDS after the action
+    tick(scheduler, 3.2)
+    assert "POT_REGION" not in scheduler.due(3.3)
+
+def test_cards_hold_until_the_street_or_hand_changes():
+    scheduler = ScanScheduler(budget_ms=float("inf"))
+    scheduler.observe(state(), 0.0)
+    scheduler.observe(state(hero=[1, 2], board=[3, 4, 5]), 0.0)
+    tick(scheduler, 0.0)
+    due = tick(scheduler, 1.0)
+    assert "HERO_CARD_1" not in due and "BOARD_CARD_3" not in due and "BOARD_CARD_4" in due
+    # Rechecked for pixel changes every `recheck` seconds
+    assert "HERO_CARD_1" in scheduler.due(2.0)
+    # The button moved: a new hand, every card read afresh
+    scheduler.observe(state(dealer="Player 4", hero=[1, 2], board=[3, 4, 5]), 1.1)
+    assert {"HERO_CARD_1", "BOARD_CARD_1"} <= set(scheduler.due(1.1))
+
+def test_costs_follow_measured_reads():
+    scheduler = ScanScheduler(default_cost_ms=10)
+    scheduler.record(["POT_REGION", "BANK_HERO"], 0.1)
+    assert scheduler.costs["POT_REGION"] == 10 + 0.2 * (50 - 10)
+    scheduler.record([], 1.0)
+    assert scheduler.costs["VPIP_HERO"] == 10
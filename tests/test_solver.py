@@ -0,0 +1,30 @@
+import numpy as np
+from cards import parse_cards
+from ranges import parse_range
+from solver import SubgameSolver
+
+def toy_river():
+    # A bluff catcher (top pair) out of position against sets and busted draws, with a
+    # pot-sized all-in as the only bet. At equilibrium IP shoves every set and half as
+    # many air combos (3 sets, 16 air: 1.5 / 16 of the air), and OOP calls half the time.
+    board = parse_cards("Qs8d5h3c2s")
+    ranges = parse_range("QJ"), parse_range("88, 76")
+    solver = SubgameSolver(board, 100, 100, ranges=ranges, bet_sizes=[1.0], raise_sizes=[])
+    solver.solve(500, report_every=100)
+    return solver
+
+def test_toy_river_converges_to_the_equilibrium():
+    solver = toy_river()
+    exploitability = [e for _, e in solver.exploitability]
+    assert exploitability[-1] < 0.05 and exploitability[-1] < exploitability[0]
+    assert solver.hand_strategy(parse_cards("QhJh"), "")["Check"] > 0.99
+    assert solver.hand_strategy(parse_cards("8s8h"), "x")["All-in"] > 0.99
+    assert np.isclose(solver.hand_strategy(parse_cards("7h6h"), "x")["All-in"], 1.5 / 16, atol=0.01)
+    assert np.isclose(solver.hand_strategy(parse_cards("QhJh"), "xa")["Call"], 0.5, atol=0.02)
+
+def test_dcfr_converges_too():
+    board = parse_cards("Qs8d5h3c2s")
+    solver = SubgameSolver(board, 100, 100, ranges=(parse_range("QJ"), parse_range("88, 76")), bet_sizes=[1.0],
+                           raise_sizes=[], algorithm="dcfr")
+    solver.solve(500, report_every=500)
+    assert solver.exploitability[-1][1] < 0.1
@@ -0,0 +1,47 @@
+import numpy as np
+from cards import Board, Hand, combo_index
+from strategy_store import StrategyStore, StrategyStoreWriter
+
+BOARD = Board.from_labels(["A♠", "K♦", "7♥", "2♣", "9♠"]).cards
+# The same board with spades and hearts swapped
+MIRROR = Board.from_labels(["A♥", "K♦", "7♠", "2♣", "9♥"]).cards
+ACTIONS = ["Check", "Bet 50%", "Bet 100%"]
+
+def frequencies(seed=0):
+    freqs = np.random.default_rng(seed).random((len(ACTIONS), 1326))
+    return freqs / freqs.sum(axis=0)
+
+def store(tmp_path, quantize="float16"):
+    path = str(tmp_path / "strategies.bin")
+    with StrategyStoreWriter(path, quantize) as writer:
+        writer.add(BOARD, 100, 200, "OOP", "", ACTIONS, frequencies())
+        writer.add(BOARD, 100, 200, "IP", "x", ACTIONS, frequencies(1))
+    return StrategyStore(path)
+
+def test_round_trip(tmp_path):
+    s = store(tmp_path)
+    assert len(s) == 2
+    labels, table = s.lookup(BOARD, 100, 200, "OOP")
+    assert labels == ACTIONS
+    assert np.allclose(table, frequencies(), atol=1e-3)
+    hand = Hand.from_labels(["Q♠", "J♠"]).cards
+    advice = s.lookup(BOARD, 100, 200, "IP", "x", hand)
+    assert np.allclose(list(advice.values()), frequencies(1)[:, combo_index(*hand)], atol=1e-3)
+
+def test_quantized_round_trip(tmp_path):
+    _, table = store(tmp_path, "uint8").lookup(BOARD, 100, 200, "OOP")
+    assert np.abs(table - frequencies()).max() <= 0.5 / 255 + 1e-9
+
+def test_isomorphic_board_maps_the_suits(tmp_path):
+    s = store(tmp_path)
+    spades = Hand.from_labels(["Q♠", "J♠"]).cards
+    hearts = Hand.from_labels(["Q♥", "J♥"]).cards
+    assert s.lookup(MIRROR, 100, 200, "OOP", "", hearts) == s.lookup(BOARD, 100, 200, "OOP", "", spades)
+
+def test_other_spots_miss(tmp_path):
+    s = store(tmp_path)
+    # A similar SPR shares the bucket; a deep or a short stack does not
+    assert s.lookup(BOARD, 120, 250, "OOP") is not None
+    assert s.lookup(BOARD, 100, 1000, "OOP") is None
+    assert s.lookup(BOARD, 100, 40, "OOP") is None
+    assert s.lookup(BOARD, 100, 200, "IP", "b50") is None
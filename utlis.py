@@ -3,6 +3,9 @@ import logging
 # Logger setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def log_debug(message):
+    logging.debug(message)
+
 def log_info(message):
     logging.info(message)
 